@@ -0,0 +1,207 @@
+"""
+Multi-account posting for Motivation Bot
+Each account gets its own session, posting schedule, quote history and rate
+limits under accounts/<name>/, while quotes and renders come from pools shared
+by every account, so one process can serve dozens of accounts.
+"""
+
+import os
+import re
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from quote_history import QuoteHistory
+from scheduler import Cadence, PostScheduler, SkipSlot, SlotStore, SystemClock
+from uploader import InstabotUploader, UploadClient
+
+ACCOUNTS_FOLDER = 'accounts'
+DEFAULT_HASHTAGS = '#motivation #inspiration #success #mindset'
+
+def load_accounts(config):
+    """Account settings from config.json.
+
+    {"accounts": [{"name": "fitness", "username": "...", "password": "...",
+                   "schedule": {"cron": "0 9,18 * * *"}, "hashtags": "#fitness",
+                   "max_posts_per_day": 3, "min_interval_minutes": 120}]}
+    A config with only the original "instagram" block becomes one account
+    named "default".
+    """
+    accounts = (config or {}).get('accounts')
+    if accounts is None:
+        instagram = (config or {}).get('instagram')
+        if not instagram:
+            return []
+        accounts = [dict(instagram, name='default', schedule=config.get('schedule', {}))]
+
+    names = set()
+    for account in accounts:
+        name = account.get('name') or account.get('username')
+        if not name or not re.fullmatch(r'[A-Za-z0-9_.-]+', name):
+            raise ValueError(f"Account name {name!r} must be letters, digits, '.', '_' or '-'")
+        if name in names:
+            raise ValueError(f"Duplicate account name {name!r}")
+        if not account.get('username') or not account.get('password'):
+            raise ValueError(f"Account {name!r} needs a username and password")
+        account['name'] = name
+        names.add(name)
+    return accounts
+
+class RateLimiter:
+    """At most max_per_day posts in any 24 hours, and min_interval seconds between posts"""
+
+    def __init__(self, max_per_day=None, min_interval=0):
+        self.max_per_day = max_per_day
+        self.min_interval = min_interval
+        self._posts = deque()
+        self._lock = threading.Lock()
+
+    def seed(self, timestamps):
+        with self._lock:
+            self._posts.extend(sorted(timestamps))
+
+    def check(self, now):
+        """None if a post is allowed now, otherwise the reason it is not"""
+        with self._lock:
+            while self._posts and self._posts[0] <= now - 86400:
+                self._posts.popleft()
+            if self.max_per_day is not None and len(self._posts) >= self.max_per_day:
+                return f"{self.max_per_day} posts in the last 24 hours"
+            if self._posts and now - self._posts[-1] < self.min_interval:
+                return f"last post was {int(now - self._posts[-1])} s ago"
+            return None
+
+    def record(self, now):
+        with self._lock:
+            self._posts.append(now)
+
+class AccountWorker:
+    def __init__(self, account, bot, render_pool, quote_source, uploader=None, clock=None,
+                 folder=ACCOUNTS_FOLDER):
+        self.name = account['name']
+        self.account = account
+        self.bot = bot
+        self.render_pool = render_pool
+        self.quote_source = quote_source
+        self.clock = clock or SystemClock()
+        self.folder = os.path.join(folder, self.name)
+        os.makedirs(self.folder, exist_ok=True)
+
+        # Per-account namespaces: what this account posted, and its slot queue
+        self.history = QuoteHistory(os.path.join(self.folder, 'history.db'))
+        self.store = SlotStore(os.path.join(self.folder, 'schedule.db'))
+        # Keep this account's ready videos out of the shared render cache's eviction
+        bot.slot_stores.append(self.store)
+        self.hashtags = account.get('hashtags', DEFAULT_HASHTAGS)
+        self.limiter = RateLimiter(account.get('max_posts_per_day'), account.get('min_interval_minutes', 0) * 60)
+        self.limiter.seed(self.store.posted_times(self.clock.now() - 86400))
+        self.uploader = uploader or UploadClient(
+            InstabotUploader(account['username'], account['password'], os.path.join(self.folder, 'session'))
+        )
+
+        schedule = account.get('schedule', {})
+        self.scheduler = PostScheduler(
+            self.store, Cadence(schedule.get('cron', '0 * * * *'), schedule.get('windows')),
+            self.prepare, self.publish, clock=self.clock, lead_time=schedule.get('lead_minutes', 10) * 60
+        )
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def next_quote(self, attempts=10):
+        """A quote from the shared pool that this account has not used"""
+        for _ in range(attempts):
+            quote = self.quote_source()
+            if quote and not self.history.contains(quote) and not self.store.has_quote(quote):
+                return quote
+        return None
+
+    def prepare(self, slot_time):
+        # Over the limit at the slot's time: skip it before spending a render on it
+        reason = self.limiter.check(slot_time)
+        if reason:
+            raise SkipSlot(f"rate limited: {reason}")
+        quote = self.next_quote()
+        if not quote:
+            return None
+        # Shared render pool: identical quotes across accounts hit the render cache
+        video_path = self.render_pool.submit(self.bot.create_video, quote).result()
+        return (quote, video_path) if video_path else None
+
+    def publish(self, quote, video_path):
+        now = self.clock.now()
+        reason = self.limiter.check(now)
+        if reason:
+            raise SkipSlot(f"rate limited: {reason}")
+        caption = f"💪 {quote}\n\n{self.hashtags}"
+        
+        def verified(media_id, ok):
+            if not ok:
+                self.store.mark_unverified(video_path, self.clock.now())
+        
+        posted = self.uploader.upload(video_path, caption, on_verified=verified) is not None
+        self.history.add(quote, 'Ollama LLM', posted)
+        if posted:
+            self.limiter.record(now)
+        return posted
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.scheduler.run, args=(self.stop_event,),
+                                       name=f'account-{self.name}', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def status(self):
+        upcoming = self.scheduler.upcoming(3)
+        return {
+            'running': bool(self.thread and self.thread.is_alive()),
+            'username': self.account['username'],
+            'stage': self.scheduler.stage,
+            'queue_depth': self.store.open_count(self.clock.now()),
+            'next_post': upcoming[0]['time'] if upcoming else None,
+            'last_error': self.scheduler.last_error,
+            'upcoming': upcoming,
+            'posted': self.history.count()
+        }
+
+class AccountManager:
+    def __init__(self, bot, accounts, render_workers=2, quote_source=None, uploader_factory=None,
+                 clock=None, folder=ACCOUNTS_FOLDER):
+        """uploader_factory(account) lets tests and benchmarks swap in a fake uploader"""
+        if quote_source is None:
+            from quote_client import get_quote_client
+            quote_source = lambda: get_quote_client().get_quote()
+        self.render_pool = ThreadPoolExecutor(max_workers=render_workers, thread_name_prefix='render')
+        self.workers = {
+            account['name']: AccountWorker(
+                account, bot, self.render_pool, quote_source,
+                uploader=uploader_factory(account) if uploader_factory else None,
+                clock=clock, folder=folder
+            )
+            for account in accounts
+        }
+
+    def start(self):
+        for worker in self.workers.values():
+            worker.start()
+
+    def stop(self, timeout=5):
+        for worker in self.workers.values():
+            worker.stop()
+        for worker in self.workers.values():
+            if worker.thread:
+                worker.thread.join(timeout)
+
+    def status(self):
+        return {name: worker.status() for name, worker in self.workers.items()}
+
+    def close(self):
+        self.stop()
+        self.render_pool.shutdown(wait=False)
+        for worker in self.workers.values():
+            if worker.store in worker.bot.slot_stores:
+                worker.bot.slot_stores.remove(worker.store)
@@ -1,12 +1,14 @@
-from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for
+from flask import Flask, render_template, request, jsonify, send_file, send_from_directory, redirect, url_for, Response, stream_with_context, g
 import os
 import json
-import time
 from datetime import datetime
-import threading
-from motivation_bot import MotivationBot
-import tempfile
-import zipfile
+from motivation_bot import MotivationBot, get_quote_client
+from bot_controller import BotController
+from jobs import JobQueue, QueueFullError
+from zip_stream import stream_zip
+from thumbnails import ensure_thumbnail
+from metrics import REGISTRY, configure_logging
+from profiling import get_profiler
 from werkzeug.utils import secure_filename
 
 app = Flask(__name__)
@@ -19,8 +21,24 @@ os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
 # Global bot instance
 bot = MotivationBot()
-bot_running = False
-bot_thread = None
+# Video generation runs here instead of in the request thread
+jobs = JobQueue(max_workers=2)
+# Owns the posting loop; only one process at a time holds its lease and posts
+controller = BotController(bot)
+
+@app.before_request
+def start_profile():
+    """Profile a PROFILE_RATE sample of requests, or any request with ?profile=1 while profiling is on"""
+    profiler = get_profiler()
+    if profiler.enabled:
+        g.profile = profiler.sample(force=request.args.get('profile') == '1')
+
+@app.teardown_request
+def save_profile(error=None):
+    session = g.pop('profile', None)
+    if session is not None:
+        session.stop()
+        session.save(get_profiler().request_path(request.endpoint))
 
 @app.route('/')
 def index():
@@ -29,35 +47,44 @@ def index():
 
 @app.route('/generate_video', methods=['POST'])
 def generate_video():
-    """Generate a single video with custom quote or random quote"""
+    """Queue a single video with custom quote or random quote"""
     try:
         data = request.get_json()
         custom_quote = data.get('quote', '').strip()
+        # ?profile=1 also profiles the render itself, which runs on a job thread
+        profile_render = get_profiler().enabled and request.args.get('profile') == '1'
         
-        if custom_quote:
-            quote = custom_quote
-        else:
-            # Generate random quote using Ollama
-            from motivation_bot import generate_quote_ollama
-            quote = generate_quote_ollama()
-        
-        # Create video
-        video_path = bot.create_video(quote)
-        
-        if video_path and os.path.exists(video_path):
-            return jsonify({
-                'success': True,
+        def render(progress):
+            if custom_quote:
+                quote = custom_quote
+            else:
+                # Take a prefetched Ollama quote if one is ready
+                progress(0, 'Fetching quote')
+                quote_client = get_quote_client()
+                quote_client.start_prefetch()
+                quote = quote_client.get_quote()
+            
+            progress(0, 'Rendering video')
+            video_path = bot.create_video(quote, profile=profile_render)
+            if not video_path or not os.path.exists(video_path):
+                raise RuntimeError('Failed to generate video')
+            
+            return {
                 'message': 'Video generated successfully!',
                 'quote': quote,
                 'video_path': video_path,
                 'filename': os.path.basename(video_path)
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'message': 'Failed to generate video'
-            })
+            }
+        
+        job = jobs.submit('generate_video', render)
+        return jsonify({
+            'success': True,
+            'message': 'Video generation started',
+            'job_id': job.id
+        }), 202
     
+    except QueueFullError as e:
+        return jsonify({'success': False, 'message': f'Too many jobs queued: {e}'}), 429
     except Exception as e:
         return jsonify({
             'success': False,
@@ -66,7 +93,7 @@ def generate_video():
 
 @app.route('/generate_multiple', methods=['POST'])
 def generate_multiple():
-    """Generate multiple videos"""
+    """Queue multiple videos"""
     try:
         data = request.get_json()
         num_videos = int(data.get('count', 5))
@@ -74,110 +101,212 @@ def generate_multiple():
         if num_videos > 20:  # Limit to prevent abuse
             num_videos = 20
         
-        videos = bot.generate_videos_only(num_videos)
+        def render(progress):
+            def on_result(result):
+                status = 'done' if result['success'] else 'failed'
+                progress(result['index'] + 1, f"Video {result['index'] + 1}/{num_videos} {status}")
+            
+            videos = bot.generate_videos_only(num_videos, on_result=on_result)
+            return {
+                'message': f'Generated {len(videos)} videos successfully!',
+                'videos': videos
+            }
         
+        job = jobs.submit('generate_multiple', render, total=num_videos)
         return jsonify({
             'success': True,
-            'message': f'Generated {len(videos)} videos successfully!',
-            'videos': videos
-        })
+            'message': f'Generating {num_videos} videos',
+            'job_id': job.id
+        }), 202
     
+    except QueueFullError as e:
+        return jsonify({'success': False, 'message': f'Too many jobs queued: {e}'}), 429
     except Exception as e:
         return jsonify({
             'success': False,
             'message': f'Error: {str(e)}'
         })
 
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Get the status and result of a queued job"""
+    job = jobs.snapshot(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    """Stream job progress as server-sent events until it finishes"""
+    if jobs.snapshot(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    def stream():
+        version = -1
+        while True:
+            previous = version
+            version, job = jobs.wait_for_change(job_id, version)
+            if job is None:
+                break
+            if version == previous:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"data: {json.dumps(job)}\n\n"
+            if job['status'] in ('done', 'failed'):
+                break
+    
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/download_video/<filename>')
 def download_video(filename):
     """Download a specific video file"""
     try:
         video_path = os.path.join(bot.videos_folder, filename)
         if os.path.exists(video_path):
-            return send_file(video_path, as_attachment=True)
+            # send_from_directory rejects path traversal and answers Range/conditional requests
+            return send_from_directory(bot.videos_folder, filename, as_attachment=True)
         else:
             return jsonify({'error': 'Video not found'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/video/<filename>')
+def stream_video(filename):
+    """Serve a video inline with Range support so <video> can seek without a full download"""
+    try:
+        video_path = os.path.join(bot.videos_folder, filename)
+        if not filename.endswith('.mp4') or not os.path.exists(video_path):
+            return jsonify({'error': 'Video not found'}), 404
+        return send_from_directory(bot.videos_folder, filename, mimetype='video/mp4',
+                                   conditional=True, max_age=3600)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/thumbnail/<filename>')
+def video_thumbnail(filename):
+    """Serve the cached JPEG poster for a video"""
+    try:
+        if not filename.endswith('.mp4') or filename != os.path.basename(filename):
+            return jsonify({'error': 'Video not found'}), 404
+        path = ensure_thumbnail(bot.videos_folder, filename)
+        if not path:
+            return jsonify({'error': 'Video not found'}), 404
+        # Posters never change for a given video, so let browsers keep them for a day
+        return send_file(path, mimetype='image/jpeg', conditional=True, max_age=86400)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/download_all')
 def download_all():
-    """Download all generated videos as a zip file"""
+    """Stream generated videos as a zip file.
+    
+    Optional filters: ?files=a.mp4&files=b.mp4 and/or ?since=YYYY-MM-DD&until=YYYY-MM-DD
+    (inclusive, by file modification date).
+    """
     try:
-        # Create a temporary zip file
-        temp_zip = tempfile.NamedTemporaryFile(delete=False, suffix='.zip')
+        wanted = set(request.args.getlist('files'))
+        since = request.args.get('since')
+        until = request.args.get('until')
+        since = datetime.strptime(since, '%Y-%m-%d') if since else None
+        until = datetime.strptime(until, '%Y-%m-%d') if until else None
         
-        with zipfile.ZipFile(temp_zip.name, 'w') as zipf:
-            for filename in os.listdir(bot.videos_folder):
-                if filename.endswith('.mp4'):
-                    file_path = os.path.join(bot.videos_folder, filename)
-                    zipf.write(file_path, filename)
+        files = []
+        for filename in sorted(os.listdir(bot.videos_folder)):
+            if not filename.endswith('.mp4'):
+                continue
+            if wanted and filename not in wanted:
+                continue
+            file_path = os.path.join(bot.videos_folder, filename)
+            modified = datetime.fromtimestamp(os.path.getmtime(file_path))
+            if since and modified.date() < since.date():
+                continue
+            if until and modified.date() > until.date():
+                continue
+            files.append((file_path, filename))
         
-        return send_file(
-            temp_zip.name,
-            as_attachment=True,
-            download_name=f'motivation_videos_{datetime.now().strftime("%Y%m%d_%H%M%S")}.zip'
+        download_name = f'motivation_videos_{datetime.now().strftime("%Y%m%d_%H%M%S")}.zip'
+        return Response(
+            stream_with_context(stream_zip(files)),
+            mimetype='application/zip',
+            headers={'Content-Disposition': f'attachment; filename={download_name}'}
         )
     
+    except ValueError as e:
+        return jsonify({'error': f'Invalid date filter: {e}'}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/get_videos')
 def get_videos():
-    """Get list of all generated videos"""
+    """Get a page of generated videos.
+    
+    Query parameters: sort (created|size|filename), order (asc|desc), page,
+    per_page (max 200), since/until (YYYY-MM-DD) and q (quote or filename search).
+    Responses carry an ETag so unchanged lists come back as 304.
+    """
     try:
-        videos = []
-        if os.path.exists(bot.videos_folder):
-            for filename in os.listdir(bot.videos_folder):
-                if filename.endswith('.mp4'):
-                    file_path = os.path.join(bot.videos_folder, filename)
-                    file_size = os.path.getsize(file_path) / (1024 * 1024)  # MB
-                    videos.append({
-                        'filename': filename,
-                        'size_mb': round(file_size, 2),
-                        'created': datetime.fromtimestamp(os.path.getctime(file_path)).strftime('%Y-%m-%d %H:%M:%S')
-                    })
+        catalog = bot.get_video_catalog()
+        catalog.reconcile()
         
-        return jsonify({'videos': videos})
+        etag = f"{catalog.version()}-{request.query_string.decode()}"
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+        
+        page = max(1, int(request.args.get('page', 1)))
+        per_page = min(200, max(1, int(request.args.get('per_page', 50))))
+        since = request.args.get('since')
+        until = request.args.get('until')
+        videos, total = catalog.query(
+            sort=request.args.get('sort', 'created'),
+            order=request.args.get('order', 'desc'),
+            page=page,
+            per_page=per_page,
+            since=datetime.strptime(since, '%Y-%m-%d') if since else None,
+            until=datetime.strptime(until, '%Y-%m-%d') if until else None,
+            search=request.args.get('q')
+        )
+        
+        response = jsonify({
+            'videos': videos,
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'pages': (total + per_page - 1) // per_page
+        })
+        response.set_etag(etag)
+        return response
     
+    except ValueError as e:
+        return jsonify({'error': f'Invalid parameter: {e}'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/cache_stats')
+def cache_stats():
+    """Get render cache hit/miss counters"""
+    try:
+        return jsonify(bot.get_render_cache().stats())
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/start_bot', methods=['POST'])
 def start_bot():
     """Start the Instagram posting bot"""
-    global bot_running, bot_thread
-    
     try:
-        if bot_running:
-            return jsonify({'success': False, 'message': 'Bot is already running'})
-        
-        # Check if config exists
-        config = bot.load_config()
-        if not config or 'instagram' not in config:
-            return jsonify({
-                'success': False, 
-                'message': 'Instagram credentials not found. Please check your config.json file.'
-            })
-        
-        bot_running = True
-        bot_thread = threading.Thread(target=run_bot_background)
-        bot_thread.daemon = True
-        bot_thread.start()
-        
-        return jsonify({'success': True, 'message': 'Bot started successfully!'})
+        started, message = controller.start()
+        return jsonify({'success': started, 'message': message})
     
     except Exception as e:
-        bot_running = False
         return jsonify({'success': False, 'message': f'Error starting bot: {str(e)}'})
 
 @app.route('/stop_bot', methods=['POST'])
 def stop_bot():
     """Stop the Instagram posting bot"""
-    global bot_running
-    
     try:
-        bot_running = False
+        controller.stop()
         return jsonify({'success': True, 'message': 'Bot stopped successfully!'})
     
     except Exception as e:
@@ -186,7 +315,15 @@ def stop_bot():
 @app.route('/bot_status')
 def bot_status():
     """Get current bot status"""
-    return jsonify({'running': bot_running})
+    try:
+        return jsonify(controller.status())
+    except Exception as e:
+        return jsonify({'running': False, 'state': 'unknown', 'last_error': str(e)})
+
+@app.route('/metrics')
+def metrics():
+    """Stage timings and counters in the Prometheus text format"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/upload_music', methods=['POST'])
 def upload_music():
@@ -217,46 +354,9 @@ def upload_music():
     except Exception as e:
         return jsonify({'success': False, 'message': f'Error uploading file: {str(e)}'})
 
-def run_bot_background():
-    """Run the bot in background thread"""
-    global bot_running
-    
-    try:
-        while bot_running:
-            # Get trending quotes
-            quotes = bot.get_trending_quotes()
-            
-            for quote in quotes:
-                if not bot_running:
-                    break
-                
-                # Check if quote already exists in CSV
-                if not bot.is_quote_posted(quote):
-                    # Create video
-                    video_path = bot.create_video(quote)
-                    if video_path:
-                        # Post to Instagram
-                        caption = f"💪 {quote}\n\n#motivation #inspiration #success #mindset"
-                        posted = bot.post_to_instagram(video_path, caption)
-                        
-                        # Update CSV
-                        bot.update_csv(quote, 'Ollama LLM', posted)
-                        
-                        # Wait for 1 hour before next post
-                        for _ in range(3600):  # 3600 seconds = 1 hour
-                            if not bot_running:
-                                break
-                            time.sleep(1)
-            
-            # Wait for 6 hours before checking for new trends
-            for _ in range(21600):  # 21600 seconds = 6 hours
-                if not bot_running:
-                    break
-                time.sleep(1)
-    
-    except Exception as e:
-        print(f"Error in bot background thread: {e}")
-        bot_running = False
-
 if __name__ == '__main__':
+    # One JSON line per span, tagged with the job it belongs to
+    configure_logging()
+    # Have quotes ready before the first /generate_video request
+    get_quote_client().start_prefetch()
     app.run(debug=True, host='0.0.0.0', port=5000) 
\ No newline at end of file
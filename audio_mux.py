@@ -0,0 +1,88 @@
+"""
+Background music for Motivation Bot videos
+Trims or loops a track to the video length with a fade-out, encodes it to AAC
+once per (track, duration, fade) and muxes it in with stream copy, so neither
+the MP3 nor the video is decoded again on later renders.
+"""
+
+import os
+import hashlib
+import subprocess
+import threading
+
+AUDIO_CACHE_FOLDER = '.audio_cache'
+
+class AudioCache:
+    def __init__(self, music_folder, ffmpeg, bitrate='128k'):
+        self.music_folder = music_folder
+        self.folder = os.path.join(music_folder, AUDIO_CACHE_FOLDER)
+        self.ffmpeg = ffmpeg
+        self.bitrate = bitrate
+        self._lock = threading.Lock()
+        os.makedirs(self.folder, exist_ok=True)
+
+    def segment_key(self, track_path, duration, fade):
+        """Changes when the track file is replaced or the timing changes"""
+        stat = os.stat(track_path)
+        payload = f'{os.path.abspath(track_path)}|{stat.st_size}|{stat.st_mtime_ns}|{duration}|{fade}|{self.bitrate}'
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def prepare(self, track_path, duration, fade=2.0):
+        """Return an AAC segment exactly `duration` seconds long, encoding it on first use"""
+        segment_path = os.path.join(self.folder, self.segment_key(track_path, duration, fade) + '.m4a')
+        if os.path.exists(segment_path):
+            return segment_path
+
+        # One encode per segment even when several renders ask at once
+        with self._lock:
+            if os.path.exists(segment_path):
+                return segment_path
+            fade = min(fade, duration)
+            part_path = segment_path + f'.{os.getpid()}.part'
+            command = [
+                self.ffmpeg, '-y', '-loglevel', 'error',
+                # Short tracks loop until the cut, long ones are simply cut
+                '-stream_loop', '-1', '-i', track_path,
+                '-t', str(duration), '-vn',
+                '-af', f'afade=t=out:st={duration - fade}:d={fade}',
+                '-c:a', 'aac', '-b:a', self.bitrate, '-f', 'mp4',
+                part_path
+            ]
+            try:
+                result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+                if result.returncode != 0:
+                    print(f"ffmpeg audio encode failed: {result.stderr.decode(errors='ignore').strip()}")
+                    return None
+                # Atomic, so worker processes never see a half-written segment
+                os.replace(part_path, segment_path)
+            except OSError as e:
+                print(f"Error running ffmpeg: {e}")
+                return None
+            finally:
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+        return segment_path
+
+def mux_audio(ffmpeg, video_path, audio_path):
+    """Add an audio track to video_path in place, copying both streams"""
+    muxed_path = video_path + '.mux.part'
+    command = [
+        ffmpeg, '-y', '-loglevel', 'error',
+        '-i', video_path, '-i', audio_path,
+        '-map', '0:v:0', '-map', '1:a:0',
+        '-c', 'copy', '-shortest', '-movflags', '+faststart', '-f', 'mp4',
+        muxed_path
+    ]
+    try:
+        result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if result.returncode != 0:
+            print(f"ffmpeg mux failed: {result.stderr.decode(errors='ignore').strip()}")
+            return False
+        os.replace(muxed_path, video_path)
+        return True
+    except OSError as e:
+        print(f"Error running ffmpeg: {e}")
+        return False
+    finally:
+        if os.path.exists(muxed_path):
+            os.remove(muxed_path)
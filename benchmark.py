@@ -0,0 +1,714 @@
+#!/usr/bin/env python3
+"""
+Benchmark script for Motivation Bot
+This script measures layout, rendering, encoding, batch generation, posting and
+the web endpoints offline (Ollama and Instagram are replaced by local stubs)
+and writes the results to JSON so runs from different commits can be compared.
+
+    python benchmark.py --output bench.json
+    python benchmark.py --quick --only layout,create_video --compare bench.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import platform
+import tempfile
+import threading
+import subprocess
+from datetime import datetime
+
+SAMPLE_QUOTE = "Believe in the fire that fuels your soul, not just the flame that flickers on the outside."
+
+def benchmark_still_encoding(runs=3):
+    """Compare the still-frame x264 path against the mp4v frame loop"""
+    print("🎬 Benchmarking create_video encoding modes...")
+    
+    from motivation_bot import MotivationBot, find_ffmpeg
+    
+    if not find_ffmpeg():
+        print("⚠️  ffmpeg not found - only the OpenCV loop can be measured")
+    
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        bot = MotivationBot()
+        bot.videos_folder = temp_dir
+        
+        for mode, codec in (('opencv_loop', 'mp4v'), ('still_frame', 'x264')):
+            bot.codec = codec
+            timings = []
+            sizes = []
+            for run in range(runs):
+                # A distinct quote per run keeps the render cache out of the measurement
+                start = time.perf_counter()
+                video_path = bot.create_video(f"{SAMPLE_QUOTE} #{mode} {run}")
+                timings.append(time.perf_counter() - start)
+                if video_path:
+                    sizes.append(os.path.getsize(video_path))
+                    os.remove(video_path)
+            
+            results[mode] = {
+                'seconds_per_video': min(timings),
+                'size_bytes': sizes[0] if sizes else None
+            }
+            size = f"{sizes[0] / 1024:.1f} KB" if sizes else "n/a"
+            print(f"  {mode:12s} {min(timings):6.3f} s/video  {size}")
+    
+    baseline = results['opencv_loop']['seconds_per_video']
+    fast = results['still_frame']['seconds_per_video']
+    if fast:
+        print(f"  speedup: {baseline / fast:.1f}x")
+    return results
+
+def render_sample_frame(width=1080, height=1920):
+    """The SAMPLE_QUOTE frame as create_video draws it, in BGR"""
+    import numpy as np
+    from PIL import Image, ImageDraw
+    from text_layout import layout_text
+    
+    img = Image.new('RGB', (width, height))
+    draw = ImageDraw.Draw(img)
+    layout = layout_text(SAMPLE_QUOTE, width, height, 'arial.ttf', 60)
+    for line, x, y in layout['lines']:
+        draw.text((x, y), line, font=layout['font'], fill=(255, 255, 255))
+    return np.ascontiguousarray(np.array(img)[:, :, ::-1])
+
+def moving_frames(frame, count):
+    """Yield count frames with a bar sweeping down, reusing one buffer"""
+    buffer = frame.copy()
+    height = frame.shape[0]
+    band = max(1, height // count)
+    for i in range(count):
+        y = i * band
+        buffer[y:y + band] = 255 - frame[y:y + band]
+        yield buffer
+        buffer[y:y + band] = frame[y:y + band]
+
+def benchmark_codecs(duration=2, fps=24, presets=None):
+    """Encode fps, CPU seconds and bytes per video for each backend and x264 preset"""
+    print("\n🎞️  Benchmarking codec backends...")
+    
+    from video_encoders import H264_PRESETS, OpenCVEncoder, FFmpegEncoder, RawPipeEncoder, find_ffmpeg
+    
+    frame = render_sample_frame()
+    height, width = frame.shape[:2]
+    count = fps * duration
+    
+    backends = [('mp4v', OpenCVEncoder(), False), ('raw', RawPipeEncoder(), False)]
+    if find_ffmpeg():
+        for preset in presets or H264_PRESETS:
+            backends.append((f'x264 {preset}', FFmpegEncoder(preset=preset, still_gop=False), False))
+        backends.append(('x264 gop', FFmpegEncoder(still_gop=True), True))
+    else:
+        print("⚠️  ffmpeg not found - only OpenCV and raw backends are measured")
+    
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for label, encoder, still in backends:
+            output_path = os.path.join(temp_dir, f"{label.replace(' ', '_')}.mp4")
+            before = os.times()
+            start = time.perf_counter()
+            if still:
+                # The still-frame shortcut only applies to static frames
+                ok = encoder.encode_still(frame, output_path, fps, duration)
+            else:
+                ok = encoder.encode_frames(moving_frames(frame, count), output_path, width, height, fps)
+            elapsed = time.perf_counter() - start
+            after = os.times()
+            if not ok:
+                print(f"  {label:16s} failed")
+                continue
+            
+            # Includes the ffmpeg child process, not just this one
+            cpu = sum(after[i] - before[i] for i in range(4))
+            size = os.path.getsize(output_path)
+            os.remove(output_path)
+            results[label] = {
+                'encode_fps': count / elapsed,
+                'cpu_seconds': cpu,
+                'bytes': size
+            }
+            print(f"  {label:16s} {count / elapsed:8.1f} fps  {cpu:6.2f} cpu s  {size / 1024:10.1f} KB")
+    return results
+
+def benchmark_templates(duration=2, fps=24):
+    """Compositing frames per second for each animated template (encoding excluded)"""
+    print("\n🌈 Benchmarking video templates...")
+    
+    from video_templates import TEMPLATES, TemplateRenderer
+    
+    results = {}
+    for name in TEMPLATES:
+        start = time.perf_counter()
+        renderer = TemplateRenderer.from_template(name, SAMPLE_QUOTE, 1080, 1920, fps, duration, 'arial.ttf', 60)
+        setup = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        for _ in renderer.frames():
+            pass
+        elapsed = time.perf_counter() - start
+        
+        frames = renderer.frame_count
+        results[name] = {'setup_seconds': setup, 'fps': frames / elapsed}
+        print(f"  {name:12s} {frames / elapsed:8.1f} fps  (setup {setup * 1000:.0f} ms)")
+    return results
+
+def benchmark_quote_dedup(history_size=20000, lookups=500):
+    """Measure near-duplicate lookup latency against a large quote history"""
+    print("\n🧹 Benchmarking quote deduplication...")
+    
+    import random
+    from quote_dedup import MinHashIndex
+    
+    words = ("believe dream rise work hard never give up success failure courage journey "
+             "mind heart soul fire light path step today tomorrow future strength grow learn "
+             "focus goal win lose try again brave fear doubt hope faith action change").split()
+    rng = random.Random(0)
+    index = MinHashIndex()
+    
+    start = time.perf_counter()
+    for i in range(history_size):
+        index.add(i, ' '.join(rng.choice(words) for _ in range(rng.randint(8, 20))))
+    build = time.perf_counter() - start
+    
+    probes = [' '.join(rng.choice(words) for _ in range(12)) for _ in range(lookups)]
+    start = time.perf_counter()
+    for probe in probes:
+        index.query(probe)
+    per_lookup = (time.perf_counter() - start) / lookups
+    
+    print(f"  indexed {history_size} quotes in {build:.2f} s")
+    print(f"  {per_lookup * 1000:.3f} ms per lookup")
+    return {'history_size': history_size, 'build_seconds': build, 'ms_per_lookup': per_lookup * 1000}
+
+def load_quote_corpus():
+    """Quotes from the tracking CSV plus a long one to expose quadratic wrapping"""
+    import csv
+    from quote_dedup import canonicalize_quote
+    
+    quotes = []
+    if os.path.exists('motivation_ideas.csv'):
+        with open('motivation_ideas.csv', 'r', newline='') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            quotes = [canonicalize_quote(row[1]) for row in reader if len(row) > 1 and row[1]]
+    quotes.append(SAMPLE_QUOTE)
+    quotes.append(' '.join([SAMPLE_QUOTE] * 12))
+    return quotes
+
+def legacy_wrap(draw, font, quote, width):
+    """The original per-word textbbox wrap, kept for comparison"""
+    lines = []
+    current_line = []
+    for word in quote.split():
+        current_line.append(word)
+        bbox = draw.textbbox((0, 0), ' '.join(current_line), font=font)
+        if bbox[2] > width - 100:
+            current_line.pop()
+            lines.append(' '.join(current_line))
+            current_line = [word]
+    if current_line:
+        lines.append(' '.join(current_line))
+    return lines
+
+def benchmark_layout(repeats=20):
+    """Measure text layout time per quote over the quote corpus"""
+    print("\n🔤 Benchmarking text layout...")
+    
+    from PIL import Image, ImageDraw
+    from text_layout import layout_text, get_font
+    
+    quotes = load_quote_corpus()
+    width, height = 1080, 1920
+    draw = ImageDraw.Draw(Image.new('RGB', (width, height)))
+    font = get_font('arial.ttf', 60)
+    
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for quote in quotes:
+            legacy_wrap(draw, font, quote, width)
+    legacy = (time.perf_counter() - start) / (repeats * len(quotes))
+    
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for quote in quotes:
+            layout_text(quote, width, height, 'arial.ttf', 60)
+    current = (time.perf_counter() - start) / (repeats * len(quotes))
+    
+    print(f"  {len(quotes)} quotes")
+    print(f"  legacy wrap   {legacy * 1000:7.3f} ms/quote")
+    print(f"  layout_text   {current * 1000:7.3f} ms/quote (includes font fitting)")
+    return {'quotes': len(quotes), 'legacy_ms_per_quote': legacy * 1000, 'ms_per_quote': current * 1000}
+
+class OllamaStub:
+    """Local stand-in for Ollama's /api/generate.
+
+    Like a single loaded model it answers one request at a time, costing
+    `latency` seconds per request (prompt processing) plus `per_quote` seconds
+    per quote generated. Requests with format "json" get {"quotes": [...]}
+    with as many quotes as the prompt asks for. Quotes are deterministic and
+    distinct, so runs are reproducible and never hit the render cache. Inside
+    the with-block the shared quote client talks to the stub.
+    """
+    
+    WORDS = ("courage patience discipline kindness focus gratitude effort curiosity "
+             "resilience honesty vision grit humility purpose balance growth").split()
+    
+    def __init__(self, latency=0.05, per_quote=0.0, seed=0):
+        self.latency = latency
+        self.per_quote = per_quote
+        self.rng = random.Random(seed)
+        self.count = 0
+        self.requests = []
+        self.lock = threading.Lock()
+        self.model_lock = threading.Lock()
+        self.server = None
+        self.previous = None
+    
+    def next_quote(self):
+        with self.lock:
+            self.count += 1
+            words = self.rng.sample(self.WORDS, 4)
+            return f"{words[0].title()} and {words[1]} turn {words[2]} into {words[3]}, one day at a time ({self.count})."
+    
+    def answer(self, body):
+        import re
+        with self.lock:
+            self.requests.append(body)
+        if body.get('format') == 'json':
+            asked = re.search(r'(\d+)', body.get('prompt', ''))
+            count = int(asked.group(1)) if asked else 1
+            with self.model_lock:
+                time.sleep(self.latency + self.per_quote * count)
+            return json.dumps({'quotes': [self.next_quote() for _ in range(count)]})
+        with self.model_lock:
+            time.sleep(self.latency + self.per_quote)
+        return self.next_quote()
+    
+    def __enter__(self):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        import quote_client
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+            
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                body = json.dumps({'response': stub.answer(request), 'done': True}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+        
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self.previous = (os.environ.get('OLLAMA_URL'), quote_client._default_client)
+        os.environ['OLLAMA_URL'] = self.url
+        quote_client._default_client = None
+        return self
+    
+    def __exit__(self, *exc):
+        import quote_client
+        previous_url, previous_client = self.previous
+        if quote_client._default_client is not None:
+            quote_client._default_client.close()
+        quote_client._default_client = previous_client
+        if previous_url is None:
+            os.environ.pop('OLLAMA_URL', None)
+        else:
+            os.environ['OLLAMA_URL'] = previous_url
+        self.server.shutdown()
+        self.server.server_close()
+
+class FakeUploader:
+    """Instagram stand-in for UploadClient: sleeps latency seconds per upload"""
+    
+    def __init__(self, latency=0.2):
+        self.latency = latency
+        self.uploads = 0
+    
+    def upload(self, video_path, caption):
+        time.sleep(self.latency)
+        self.uploads += 1
+        return f'media{self.uploads}'
+    
+    def verify(self, media_id):
+        return True
+
+def benchmark_bot(temp_dir):
+    """A bot that renders into temp_dir, without music so timings are comparable"""
+    from motivation_bot import MotivationBot
+    bot = MotivationBot()
+    bot.videos_folder = temp_dir
+    bot.add_music = False
+    return bot
+
+def summarize(timings):
+    """min / median / p95 / max of a list of seconds, in milliseconds"""
+    ordered = sorted(timings)
+    return {
+        'runs': len(ordered),
+        'min_ms': ordered[0] * 1000,
+        'median_ms': ordered[len(ordered) // 2] * 1000,
+        'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        'max_ms': ordered[-1] * 1000
+    }
+
+def benchmark_render_frame(sizes=((360, 640), (1080, 1350), (1080, 1920)), repeats=10):
+    """Time to draw one static frame and one animated template frame per resolution"""
+    print("\n🖼️  Benchmarking single-frame render...")
+    
+    import numpy as np
+    from video_templates import TemplateRenderer
+    
+    results = {}
+    for width, height in sizes:
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            render_sample_frame(width, height)
+            timings.append(time.perf_counter() - start)
+        
+        renderer = TemplateRenderer.from_template('ken_burns', SAMPLE_QUOTE, width, height, 24, 2, 'arial.ttf', 60)
+        out = np.empty((height, width, 3), dtype=np.uint8)
+        template_timings = []
+        for index in range(repeats):
+            start = time.perf_counter()
+            renderer.render_into(index, out)
+            template_timings.append(time.perf_counter() - start)
+        
+        label = f'{width}x{height}'
+        results[label] = {'static': summarize(timings), 'ken_burns': summarize(template_timings)}
+        print(f"  {label:10s} static {results[label]['static']['median_ms']:7.2f} ms"
+              f"  ken_burns {results[label]['ken_burns']['median_ms']:7.2f} ms")
+    return results
+
+def benchmark_create_video(sizes=((360, 640), (1080, 1350), (1080, 1920)), durations=(1, 5), runs=2):
+    """Full create_video wall time and file size per resolution and duration"""
+    print("\n🎬 Benchmarking create_video...")
+    
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        bot = benchmark_bot(temp_dir)
+        for width, height in sizes:
+            for duration in durations:
+                bot.video_size = (width, height)
+                bot.duration = duration
+                label = f'{width}x{height}_{duration}s'
+                timings = []
+                size = None
+                for run in range(runs):
+                    # A distinct quote per run keeps the render cache out of the measurement
+                    start = time.perf_counter()
+                    video_path = bot.create_video(f"{SAMPLE_QUOTE} #{label} {run}")
+                    timings.append(time.perf_counter() - start)
+                    if video_path:
+                        size = os.path.getsize(video_path)
+                results[label] = {'seconds_per_video': min(timings), 'bytes': size}
+                print(f"  {label:16s} {min(timings):6.3f} s/video  {(size or 0) / 1024:8.1f} KB")
+    return results
+
+def benchmark_batch(num_videos=8, workers=None, latency=0.05):
+    """generate_videos_only throughput for 1..N render processes against the Ollama stub"""
+    print("\n📦 Benchmarking batch generation...")
+    
+    from render_pool import BatchRenderer
+    
+    workers = workers or sorted({1, 2, os.cpu_count() or 1})
+    results = {}
+    with OllamaStub(latency) as stub, tempfile.TemporaryDirectory() as temp_dir:
+        for count in workers:
+            bot = benchmark_bot(os.path.join(temp_dir, f'workers_{count}'))
+            bot.duration = 2
+            bot.batch_renderer = BatchRenderer(bot, max_workers=count)
+            try:
+                # Start the pool outside the timed region
+                bot.batch_renderer._get_executor()
+                start = time.perf_counter()
+                videos = bot.generate_videos_only(num_videos)
+                elapsed = time.perf_counter() - start
+            finally:
+                bot.batch_renderer.shutdown()
+            results[f'workers_{count}'] = {
+                'videos': len(videos),
+                'seconds': elapsed,
+                'videos_per_second': len(videos) / elapsed
+            }
+            print(f"  {count:2d} workers  {len(videos)}/{num_videos} videos  {len(videos) / elapsed:6.2f} videos/s")
+        results['ollama_requests'] = len(stub.requests)
+    return results
+
+def benchmark_quote_generation(count=5, latency=0.3, per_quote=0.1, rounds=3):
+    """Quotes per second: sequential calls vs concurrent calls vs one batched call"""
+    print("\n💬 Benchmarking quote generation...")
+    
+    from quote_client import QuoteClient
+    
+    modes = (
+        ('sequential', {'batch_size': 0}, lambda client: [client.generate_quote() for _ in range(count)]),
+        ('concurrent', {'batch_size': 0}, lambda client: client.generate_quotes(count)),
+        ('batched', {'batch_size': count}, lambda client: client.generate_quotes(count)),
+    )
+    results = {}
+    with OllamaStub(latency, per_quote) as stub:
+        for name, settings, generate in modes:
+            client = QuoteClient(base_url=stub.url, **settings)
+            try:
+                timings = []
+                requests_before = len(stub.requests)
+                for _ in range(rounds):
+                    start = time.perf_counter()
+                    quotes = generate(client)
+                    timings.append(time.perf_counter() - start)
+            finally:
+                client.close()
+            best = min(timings)
+            results[name] = {
+                'quotes': len(quotes),
+                'requests_per_round': (len(stub.requests) - requests_before) / rounds,
+                'seconds': best,
+                'quotes_per_second': len(quotes) / best
+            }
+            print(f"  {name:10s} {len(quotes) / best:6.2f} quotes/s"
+                  f"  ({results[name]['requests_per_round']:.0f} requests per {count} quotes)")
+    results['speedup_vs_sequential'] = results['batched']['quotes_per_second'] / results['sequential']['quotes_per_second']
+    print(f"  batched speedup: {results['speedup_vs_sequential']:.1f}x")
+    return results
+
+def benchmark_post_cycle(posts=3, upload_latency=0.2, latency=0.05):
+    """Render-ahead take plus upload per posting slot, with a fake uploader"""
+    print("\n📤 Benchmarking post cycle...")
+    
+    from uploader import UploadClient
+    from quote_history import QuoteHistory
+    from motivation_bot import get_quote_client
+    
+    with OllamaStub(latency), tempfile.TemporaryDirectory() as temp_dir:
+        bot = benchmark_bot(temp_dir)
+        bot.duration = 2
+        bot.csv_file = os.path.join(temp_dir, 'ideas.csv')
+        bot.schedule_db = os.path.join(temp_dir, 'schedule.db')
+        bot.history = QuoteHistory(os.path.join(temp_dir, 'history.db'))
+        bot.upload_client = UploadClient(FakeUploader(upload_latency), verify_delays=(0,))
+        quotes = get_quote_client()
+        bot.get_trending_quotes = lambda: [quotes.generate_quote() for _ in range(3)]
+        
+        prepare, publish = [], []
+        buffer = bot.get_render_ahead()
+        buffer.start()
+        try:
+            for _ in range(posts):
+                # Give the buffer time to refill, as the gap between slots would
+                deadline = time.time() + 60
+                while buffer.ready_count() < 1 and time.time() < deadline:
+                    time.sleep(0.01)
+                start = time.perf_counter()
+                quote, video_path = bot.prepare_post(0)
+                prepare.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                bot.publish_post(quote, video_path)
+                publish.append(time.perf_counter() - start)
+        finally:
+            buffer.stop(timeout=30)
+            bot.upload_client.close()
+    
+    results = {'prepare': summarize(prepare), 'publish': summarize(publish)}
+    print(f"  prepare {results['prepare']['median_ms']:8.2f} ms  publish {results['publish']['median_ms']:8.2f} ms"
+          f"  (upload stub {upload_latency * 1000:.0f} ms)")
+    return results
+
+def benchmark_endpoints(concurrency=8, requests_per_endpoint=80):
+    """Latency and throughput of the read endpoints under concurrent clients"""
+    print("\n🌐 Benchmarking web endpoints...")
+    
+    import requests
+    from werkzeug.serving import WSGIRequestHandler, make_server
+    import app as web
+    
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+    
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        original_folder = web.bot.videos_folder
+        web.bot.videos_folder = temp_dir
+        bot = benchmark_bot(temp_dir)
+        bot.duration = 1
+        videos = [bot.create_video(f"{SAMPLE_QUOTE} #endpoint {i}") for i in range(5)]
+        server = make_server('127.0.0.1', 0, web.app, threaded=True, request_handler=QuietHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f'http://127.0.0.1:{server.server_port}'
+        try:
+            endpoints = ['/get_videos', '/bot_status', '/metrics', f'/video/{os.path.basename(videos[0])}']
+            for endpoint in endpoints:
+                timings = []
+                errors = [0]
+                lock = threading.Lock()
+                
+                def client(n):
+                    session = requests.Session()
+                    for _ in range(n):
+                        start = time.perf_counter()
+                        response = session.get(base_url + endpoint)
+                        elapsed = time.perf_counter() - start
+                        with lock:
+                            timings.append(elapsed)
+                            if response.status_code != 200:
+                                errors[0] += 1
+                    session.close()
+                
+                threads = [threading.Thread(target=client, args=(requests_per_endpoint // concurrency,))
+                           for _ in range(concurrency)]
+                start = time.perf_counter()
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                elapsed = time.perf_counter() - start
+                
+                name = endpoint if not endpoint.startswith('/video/') else '/video/<filename>'
+                results[name] = dict(summarize(timings), requests_per_second=len(timings) / elapsed, errors=errors[0])
+                print(f"  {name:18s} {len(timings) / elapsed:8.1f} req/s  p50 {results[name]['median_ms']:6.2f} ms"
+                      f"  p95 {results[name]['p95_ms']:6.2f} ms  errors {errors[0]}")
+        finally:
+            server.shutdown()
+            web.bot.videos_folder = original_folder
+    return results
+
+BENCHMARKS = {
+    'layout': benchmark_layout,
+    'render_frame': benchmark_render_frame,
+    'create_video': benchmark_create_video,
+    'still_encoding': benchmark_still_encoding,
+    'codecs': benchmark_codecs,
+    'templates': benchmark_templates,
+    'quote_generation': benchmark_quote_generation,
+    'batch': benchmark_batch,
+    'post_cycle': benchmark_post_cycle,
+    'endpoints': benchmark_endpoints,
+    'quote_dedup': benchmark_quote_dedup,
+}
+
+# Smaller workloads for --quick runs
+QUICK_ARGS = {
+    'layout': {'repeats': 3},
+    'render_frame': {'sizes': ((360, 640), (1080, 1920)), 'repeats': 3},
+    'create_video': {'sizes': ((360, 640), (1080, 1920)), 'durations': (1,), 'runs': 1},
+    'still_encoding': {'runs': 1},
+    'codecs': {'duration': 1, 'presets': ('veryfast',)},
+    'templates': {'duration': 1},
+    'quote_generation': {'latency': 0.05, 'per_quote': 0.02, 'rounds': 1},
+    'batch': {'num_videos': 2, 'workers': (1, 2)},
+    'post_cycle': {'posts': 2, 'upload_latency': 0.05},
+    'endpoints': {'concurrency': 4, 'requests_per_endpoint': 20},
+    'quote_dedup': {'history_size': 2000, 'lookups': 100},
+}
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+def run_benchmarks(names=None, quick=False):
+    """Run the named benchmarks (all by default); returns the JSON-ready report"""
+    random.seed(0)
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'quick': quick,
+        'results': {}
+    }
+    for name in names or BENCHMARKS:
+        try:
+            report['results'][name] = BENCHMARKS[name](**(QUICK_ARGS.get(name, {}) if quick else {}))
+        except Exception as e:
+            print(f"❌ {name} benchmark failed: {e}")
+            report['results'][name] = {'error': str(e)}
+    return report
+
+def flatten(results, prefix=''):
+    """{'a': {'b': 1}} -> {'a.b': 1}, numbers only"""
+    flat = {}
+    for key, value in results.items():
+        path = f'{prefix}{key}'
+        if isinstance(value, dict):
+            flat.update(flatten(value, path + '.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+def higher_is_better(path):
+    name = path.rsplit('.', 1)[-1]
+    return 'fps' in name or 'per_second' in name
+
+def compare_results(old, new, threshold=0.10):
+    """Metrics that got more than threshold worse from old to new report"""
+    before = flatten(old.get('results', {}))
+    after = flatten(new.get('results', {}))
+    regressions = []
+    for path, old_value in before.items():
+        name = path.rsplit('.', 1)[-1]
+        timed = higher_is_better(path) or name.endswith(('_ms', 'seconds', 'seconds_per_video', 'ms_per_quote', 'ms_per_lookup'))
+        if path not in after or not timed or not old_value:
+            continue
+        change = (after[path] - old_value) / old_value
+        if higher_is_better(path):
+            change = -change
+        if change > threshold:
+            regressions.append({'metric': path, 'before': old_value, 'after': after[path], 'worse_by': change})
+    return regressions
+
+def main(argv=None):
+    """Run the benchmarks and optionally write JSON / compare against an earlier run"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Motivation Bot benchmarks")
+    parser.add_argument('--output', help="write results to this JSON file")
+    parser.add_argument('--only', help=f"comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument('--quick', action='store_true', help="smaller workloads for a fast smoke run")
+    parser.add_argument('--compare', help="earlier JSON results to check for regressions")
+    parser.add_argument('--threshold', type=float, default=0.10, help="regression threshold (default 0.10 = 10%%)")
+    args = parser.parse_args(argv)
+    
+    names = [name.strip() for name in args.only.split(',')] if args.only else None
+    unknown = set(names or ()) - set(BENCHMARKS)
+    if unknown:
+        print(f"❌ Unknown benchmarks: {', '.join(sorted(unknown))}")
+        return False
+    
+    print("⏱️  Motivation Bot Benchmarks")
+    print("=" * 40)
+    report = run_benchmarks(names, args.quick)
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+    
+    success = not any('error' in result for result in report['results'].values())
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare_results(baseline, report, args.threshold)
+        print(f"\n📉 Compared with {baseline.get('commit') or args.compare}: {len(regressions)} regression(s)")
+        for regression in regressions:
+            print(f"  {regression['metric']}: {regression['before']:.4g} -> {regression['after']:.4g}"
+                  f" ({regression['worse_by'] * 100:.0f}% worse)")
+        success = success and not regressions
+    return success
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,245 @@
+"""
+Bot controller for Motivation Bot
+Owns the posting loop's lifecycle behind a lock, so concurrent /start_bot
+requests cannot start two loops. A lease row in SQLite elects one leader
+among processes (several gunicorn workers, a second container on the same
+volume), and the leader publishes its status in that row so every process
+reports the same, real state.
+"""
+
+import os
+import json
+import time
+import uuid
+import socket
+import threading
+
+from accounts import AccountManager, load_accounts
+from sqlite_store import SQLiteStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    holder TEXT,
+    expires REAL NOT NULL DEFAULT 0,
+    desired TEXT NOT NULL DEFAULT 'stopped',
+    info TEXT,
+    updated REAL NOT NULL DEFAULT 0
+);
+"""
+
+# stopped -> starting -> running | standby -> stopping -> stopped
+# standby: started here, but another process holds the lease
+# failed: the posting loop crashed; last_error says why
+STATES = ('stopped', 'starting', 'standby', 'running', 'stopping', 'failed')
+
+# Most active first, to summarise several account loops in one stage
+STAGE_ORDER = ('posting', 'rendering', 'waiting', 'stopped')
+
+class LeaderLease(SQLiteStore):
+    """A named lease that at most one holder owns until it expires"""
+
+    def __init__(self, db_path, name='bot', ttl=30):
+        super().__init__(db_path)
+        self.name = name
+        self.ttl = ttl
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            conn.execute('INSERT OR IGNORE INTO leases (name) VALUES (?)', (name,))
+
+    def acquire(self, holder, now):
+        """Take or renew the lease; False while another holder's lease is live"""
+        conn = self._connect()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            cursor = conn.execute(
+                'UPDATE leases SET holder = ?, expires = ?, updated = ? '
+                'WHERE name = ? AND (holder = ? OR holder IS NULL OR expires < ?)',
+                (holder, now + self.ttl, now, self.name, holder, now)
+            )
+            return cursor.rowcount == 1
+
+    def release(self, holder, now):
+        with self._connect() as conn:
+            conn.execute(
+                'UPDATE leases SET holder = NULL, expires = 0, info = NULL, updated = ? '
+                'WHERE name = ? AND holder = ?',
+                (now, self.name, holder)
+            )
+
+    def publish(self, holder, info, now):
+        """Store the leader's status for the other processes"""
+        with self._connect() as conn:
+            conn.execute('UPDATE leases SET info = ?, updated = ? WHERE name = ? AND holder = ?',
+                         (json.dumps(info, default=str), now, self.name, holder))
+
+    def set_desired(self, desired, now):
+        """'running' or 'stopped'; every process's controller follows it"""
+        with self._connect() as conn:
+            conn.execute('UPDATE leases SET desired = ?, updated = ? WHERE name = ?', (desired, now, self.name))
+
+    def read(self):
+        row = self._connect().execute(
+            'SELECT holder, expires, desired, info, updated FROM leases WHERE name = ?', (self.name,)
+        ).fetchone()
+        lease = dict(zip(('holder', 'expires', 'desired', 'info', 'updated'), row))
+        lease['info'] = json.loads(lease['info']) if lease['info'] else None
+        return lease
+
+class BotController:
+    def __init__(self, bot, lease_path='bot_lease.db', ttl=30, holder=None):
+        """Only the process holding the lease posts; the others wait on standby to take over"""
+        self.bot = bot
+        self.lease = LeaderLease(lease_path, ttl=ttl)
+        self.holder = holder or f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        # Renew well before the lease runs out
+        self.heartbeat = ttl / 3
+        self.state = 'stopped'
+        self.last_error = None
+        self.account_manager = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the control loop; returns (started, message)"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return False, f'Bot is already {self.state}'
+            config = self.bot.load_config() or {}
+            if config.get('accounts'):
+                # Raise config mistakes to the caller instead of inside the thread
+                load_accounts(config)
+            elif 'instagram' not in config:
+                return False, 'Instagram credentials not found. Please check your config.json file.'
+            now = time.time()
+            self.lease.set_desired('running', now)
+            lease = self.lease.read()
+            elsewhere = lease['holder'] not in (None, self.holder) and lease['expires'] >= now
+            self.state = 'starting'
+            self.last_error = None
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._control, args=(self._stop,),
+                                            name='bot-controller', daemon=True)
+            self._thread.start()
+        if elsewhere:
+            return True, 'Bot is running in another process; this one is on standby'
+        return True, 'Bot started successfully!'
+
+    def stop(self, timeout=10):
+        """Stop the loop here and in whichever process leads"""
+        self.lease.set_desired('stopped', time.time())
+        with self._lock:
+            thread = self._thread
+            if thread and thread.is_alive():
+                self.state = 'stopping'
+                self._stop.set()
+        if thread:
+            thread.join(timeout)
+
+    def _control(self, stop_event):
+        worker = None
+        worker_stop = None
+        try:
+            while not stop_event.is_set():
+                now = time.time()
+                if self.lease.read()['desired'] != 'running':
+                    break
+                if self.lease.acquire(self.holder, now):
+                    if worker is not None and not worker.is_alive():
+                        # The posting loop died on its own
+                        self.state = 'failed'
+                        worker = None
+                        return
+                    if worker is None:
+                        worker_stop = threading.Event()
+                        worker = threading.Thread(target=self._serve, args=(worker_stop,),
+                                                  name='bot-worker', daemon=True)
+                        worker.start()
+                        self.state = 'running'
+                    self.lease.publish(self.holder, self.local_status(), now)
+                else:
+                    if worker is not None:
+                        print("Lost the bot lease to another process; stopping here")
+                        self._stop_worker(worker, worker_stop)
+                        worker = None
+                    self.state = 'standby'
+                stop_event.wait(self.heartbeat)
+            self.state = 'stopping'
+        finally:
+            if worker is not None:
+                self._stop_worker(worker, worker_stop)
+            self.lease.release(self.holder, time.time())
+            if self.state != 'failed':
+                self.state = 'stopped'
+
+    def _stop_worker(self, worker, worker_stop):
+        """Stop the posting loop, waiting at most one heartbeat so the lease keeps being handled"""
+        worker_stop.set()
+        worker.join(self.heartbeat)
+        if worker.is_alive():
+            # Mid-upload: it stops after the current step, the scheduler never posts a slot twice
+            print(f"Posting loop still busy after {self.heartbeat:g}s; it will stop after its current step")
+
+    def _serve(self, stop_event):
+        """The posting loop itself: one scheduler, or one per configured account"""
+        try:
+            config = self.bot.load_config() or {}
+            if config.get('accounts'):
+                manager = AccountManager(self.bot, load_accounts(config))
+                self.account_manager = manager
+                manager.start()
+                try:
+                    stop_event.wait()
+                finally:
+                    self.account_manager = None
+                    manager.close()
+            else:
+                self.bot.run(stop_event)
+        except Exception as e:
+            print(f"Error in bot background thread: {e}")
+            self.last_error = str(e)
+
+    def local_status(self):
+        """Stage, queue depth, next post and last error of this process's loop"""
+        manager = self.account_manager
+        if manager is None:
+            info = self.bot.status()
+        else:
+            accounts = manager.status()
+            stages = {account['stage'] for account in accounts.values()}
+            next_posts = [account['next_post'] for account in accounts.values() if account['next_post']]
+            errors = [account['last_error'] for account in accounts.values() if account['last_error']]
+            info = {
+                'stage': next((stage for stage in STAGE_ORDER if stage in stages), 'stopped'),
+                'queue_depth': sum(account['queue_depth'] for account in accounts.values()),
+                'next_post': min(next_posts) if next_posts else None,
+                'last_error': errors[0] if errors else None,
+                'accounts': accounts
+            }
+        if self.last_error:
+            info['last_error'] = self.last_error
+        return info
+
+    def status(self):
+        """The bot's real state, whichever process is running it"""
+        now = time.time()
+        lease = self.lease.read()
+        leader = lease['holder'] if lease['holder'] and lease['expires'] >= now else None
+        if leader is not None and leader != self.holder:
+            info = dict(lease['info'] or {})
+        else:
+            try:
+                info = self.local_status()
+            except Exception as e:
+                print(f"Error reading bot status: {e}")
+                info = {}
+        info.update({
+            'running': leader is not None,
+            'state': self.state,
+            'leader': leader,
+            'is_leader': leader == self.holder
+        })
+        if self.last_error:
+            info['last_error'] = self.last_error
+        return info
@@ -73,18 +73,6 @@ def create_directories():
         else:
             print(f"✅ {directory}/ already exists")
 
-def download_nltk_data():
-    """Download required NLTK data"""
-    print("\n📚 Downloading NLTK data...")
-    try:
-        import nltk
-        nltk.download('punkt', quiet=True)
-        print("✅ NLTK data downloaded successfully")
-        return True
-    except Exception as e:
-        print(f"❌ Failed to download NLTK data: {e}")
-        return False
-
 def check_ollama():
     """Check if Ollama is available"""
     print("\n🤖 Checking Ollama availability...")
@@ -118,9 +106,6 @@ def main():
     # Create directories
     create_directories()
     
-    # Download NLTK data
-    download_nltk_data()
-    
     # Check Ollama
     check_ollama()
     
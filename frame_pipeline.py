@@ -0,0 +1,90 @@
+"""
+Streaming frame pipeline for Motivation Bot videos
+A producer thread fills frames from a source and runs in-place effects on a
+small pool of preallocated buffers; the encoder consumes them through a
+bounded queue and hands each buffer back once written. Memory is a fixed
+number of frames, whatever the duration or fps.
+"""
+
+import queue
+import threading
+import contextvars
+
+from profiling import profile_thread
+
+class FramePipeline:
+    def __init__(self, source, width, height, frame_count, effects=(), buffers=3):
+        """source(index, out) fills out in place; each effect(index, frame) edits it in place"""
+        import numpy as np
+        self.source = source
+        self.effects = list(effects)
+        self.frame_count = frame_count
+        self.buffers = [np.zeros((height, width, 3), dtype=np.uint8) for _ in range(buffers)]
+
+    def _produce(self, free, ready, stop, errors):
+        try:
+            with profile_thread():
+                self._fill(free, ready, stop)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            ready.put(None)
+
+    def _fill(self, free, ready, stop):
+        for index in range(self.frame_count):
+            buffer = free.get()
+            if buffer is None or stop.is_set():
+                return
+            self.source(index, buffer)
+            for effect in self.effects:
+                effect(index, buffer)
+            ready.put(buffer)
+
+    def frames(self):
+        """Yield filled frames in order.
+
+        A frame is only valid until the next one is requested: the buffer is
+        then recycled to the producer.
+        """
+        free = queue.Queue()
+        for buffer in self.buffers:
+            free.put(buffer)
+        # Room for every buffer plus the end marker, so the producer never blocks on it
+        ready = queue.Queue(maxsize=len(self.buffers) + 1)
+        stop = threading.Event()
+        errors = []
+        # The producer runs in this context: same job id, same profile session
+        producer = threading.Thread(target=contextvars.copy_context().run,
+                                    args=(self._produce, free, ready, stop, errors), daemon=True)
+        producer.start()
+
+        current = None
+        try:
+            while True:
+                # The consumer is done with the previous frame once it asks for the next
+                if current is not None:
+                    free.put(current)
+                    current = None
+                buffer = ready.get()
+                if buffer is None:
+                    break
+                current = buffer
+                yield buffer
+        finally:
+            # Consumer gave up early (or finished): release a producer waiting for a buffer
+            stop.set()
+            free.put(None)
+            producer.join()
+        if errors:
+            raise errors[0]
+
+def fade(frame_count, fade_frames):
+    """Effect: fade in from and out to black over fade_frames at each end"""
+    import numpy as np
+
+    def apply(index, frame):
+        distance = min(index, frame_count - 1 - index)
+        if distance < fade_frames:
+            # In-place scaling; the ufunc works in small chunks, not a float copy of the frame
+            np.multiply(frame, (distance + 1) / (fade_frames + 1), out=frame, casting='unsafe')
+    return apply
@@ -0,0 +1,122 @@
+"""
+Background job queue for Motivation Bot
+In-process, bounded worker pool so long renders never hold a Flask request thread.
+"""
+
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from metrics import count, job_context, span
+
+class QueueFullError(Exception):
+    """Raised when too many jobs are already waiting"""
+
+class Job:
+    def __init__(self, kind, total=1):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = 'queued'
+        self.completed = 0
+        self.total = total
+        self.message = 'Waiting for a worker'
+        self.result = None
+        self.error = None
+        self.created = datetime.now()
+        self.updated = self.created
+        # Bumped on every change so event streams know when to send
+        self.version = 0
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'failed')
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'completed': self.completed,
+            'total': self.total,
+            'message': self.message,
+            'result': self.result,
+            'error': self.error,
+            'created': self.created.strftime('%Y-%m-%d %H:%M:%S'),
+            'updated': self.updated.strftime('%Y-%m-%d %H:%M:%S')
+        }
+
+class JobQueue:
+    def __init__(self, max_workers=2, max_pending=20, max_history=200):
+        self.max_pending = max_pending
+        self.max_history = max_history
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._jobs = OrderedDict()
+        self._changed = threading.Condition()
+
+    def submit(self, kind, func, total=1):
+        """Queue func(progress) and return the Job right away.
+
+        func receives a progress(completed, message=None) callback and its
+        return value becomes the job result.
+        """
+        with self._changed:
+            pending = sum(1 for job in self._jobs.values() if not job.finished)
+            if pending >= self.max_pending:
+                raise QueueFullError(f"{pending} jobs are already queued")
+            job = Job(kind, total)
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job, func)
+        return job
+
+    def snapshot(self, job_id):
+        """Thread-safe dict copy of a job, or None"""
+        with self._changed:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def pending_count(self):
+        with self._changed:
+            return sum(1 for job in self._jobs.values() if not job.finished)
+
+    def wait_for_change(self, job_id, seen_version, timeout=15):
+        """Block until the job changes past seen_version; returns (version, dict)"""
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return seen_version, None
+            self._changed.wait_for(lambda: job.version != seen_version, timeout=timeout)
+            return job.version, job.to_dict()
+
+    def _update(self, job, **changes):
+        with self._changed:
+            for name, value in changes.items():
+                setattr(job, name, value)
+            job.updated = datetime.now()
+            job.version += 1
+            self._changed.notify_all()
+
+    def _run(self, job, func):
+        self._update(job, status='running', message='Started')
+
+        def progress(completed, message=None):
+            self._update(job, completed=completed, message=message or job.message)
+
+        # Spans and log lines from this job carry its id
+        with job_context(job.id):
+            try:
+                with span('job', kind=job.kind):
+                    result = func(progress)
+                message = result.get('message', 'Finished') if isinstance(result, dict) else 'Finished'
+                self._update(job, status='done', completed=job.total, result=result, message=message)
+            except Exception as e:
+                print(f"Error in {job.kind} job {job.id}: {e}")
+                self._update(job, status='failed', error=str(e), message=f'Error: {e}')
+            count('motivation_bot_jobs_total', kind=job.kind, status=job.status)
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond max_history"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(self._jobs) - self.max_history)]:
+            del self._jobs[job_id]
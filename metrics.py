@@ -0,0 +1,226 @@
+"""
+Metrics for Motivation Bot
+Timing spans, counters and histograms kept in memory and rendered in the
+Prometheus text format for /metrics. Every span also writes a JSON log line
+tagged with the current job id, so one job's Ollama, layout, render, encode
+and upload times can be followed through the log.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+import contextvars
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Seconds: from a CSV append up to a slow upload
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+SPAN_SECONDS = 'motivation_bot_span_seconds'
+SPAN_ERRORS = 'motivation_bot_span_errors_total'
+
+logger = logging.getLogger('motivation_bot')
+# Job id of the web job or posting slot the current thread works for
+current_job = contextvars.ContextVar('current_job', default=None)
+# Spans and counts collected in a render worker process, to be replayed in the parent
+current_recording = contextvars.ContextVar('current_recording', default=None)
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.counts[index] += 1
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+class Registry:
+    """Counters and histograms keyed by metric name and label values"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._descriptions = {}
+        self._counters = {}
+        self._histograms = {}
+
+    def describe(self, name, kind, help_text):
+        self._descriptions[name] = (kind, help_text)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def counter_value(self, name, **labels):
+        with self._lock:
+            return self._counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def histogram_count(self, name, **labels):
+        with self._lock:
+            histogram = self._histograms.get((name, tuple(sorted(labels.items()))))
+            return histogram.count if histogram else 0
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        described = set()
+
+        def header(name, kind):
+            if name not in described:
+                described.add(name)
+                help_text = self._descriptions.get(name, (kind, name))[1]
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                header(name, 'counter')
+                lines.append(f'{name}{format_labels(labels)} {value}')
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                header(name, 'histogram')
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{format_labels(labels + (("le", bound),))} {cumulative}')
+                lines.append(f'{name}_bucket{format_labels(labels + (("le", "+Inf"),))} {histogram.count}')
+                lines.append(f'{name}_sum{format_labels(labels)} {histogram.sum:.6f}')
+                lines.append(f'{name}_count{format_labels(labels)} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = Registry()
+REGISTRY.describe(SPAN_SECONDS, 'histogram', 'Seconds spent per stage (ollama, layout, render, encode, upload, history)')
+REGISTRY.describe(SPAN_ERRORS, 'counter', 'Stages that raised an exception')
+REGISTRY.describe('motivation_bot_videos_rendered_total', 'counter', 'Videos encoded')
+REGISTRY.describe('motivation_bot_render_cache_hits_total', 'counter', 'Renders served from the render cache')
+REGISTRY.describe('motivation_bot_posts_total', 'counter', 'Instagram uploads by result')
+REGISTRY.describe('motivation_bot_jobs_total', 'counter', 'Web jobs by kind and final status')
+
+def _record(kind, name, value, fields):
+    events = current_recording.get()
+    if events is not None:
+        events.append((kind, name, value, fields))
+
+def count(name, amount=1, **labels):
+    REGISTRY.inc(name, amount, **labels)
+    _record('count', name, amount, labels)
+
+def observe(span_name, seconds, **fields):
+    """Record a stage whose time was measured elsewhere (e.g. summed over frames)"""
+    REGISTRY.observe(SPAN_SECONDS, seconds, span=span_name)
+    log_event('span', span=span_name, seconds=round(seconds, 6), **fields)
+    _record('span', span_name, seconds, fields)
+
+@contextmanager
+def span(span_name, **fields):
+    """Time the block into the span histogram and log it as JSON"""
+    started = time.perf_counter()
+    error = None
+    try:
+        yield
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        REGISTRY.observe(SPAN_SECONDS, elapsed, span=span_name)
+        if error is not None:
+            REGISTRY.inc(SPAN_ERRORS, span=span_name)
+        error = str(error) if error is not None else None
+        log_event('span', span=span_name, seconds=round(elapsed, 6), error=error, **fields)
+        _record('span', span_name, elapsed, dict(fields, error=error))
+
+@contextmanager
+def job_context(job_id):
+    """Tag spans and log lines in this thread with job_id"""
+    token = current_job.set(job_id)
+    try:
+        yield
+    finally:
+        current_job.reset(token)
+
+@contextmanager
+def recording():
+    """Collect the spans and counts made in this context, e.g. a render in a worker process"""
+    events = []
+    token = current_recording.set(events)
+    try:
+        yield events
+    finally:
+        current_recording.reset(token)
+
+def replay(events):
+    """Record spans and counts collected by recording() in another process here,
+    under this thread's job id"""
+    for kind, name, value, fields in events:
+        if kind == 'count':
+            count(name, value, **fields)
+            continue
+        if fields.get('error') is not None:
+            REGISTRY.inc(SPAN_ERRORS, span=name)
+        observe(name, value, **fields)
+
+def log_event(event, **fields):
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    entry = {'event': event, 'job_id': current_job.get()}
+    entry.update((name, value) for name, value in fields.items() if value is not None)
+    logger.info(entry)
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; dict messages are merged into it"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'thread': record.threadName
+        }
+        if isinstance(record.msg, dict):
+            entry.update(record.msg)
+        else:
+            entry['message'] = record.getMessage()
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+def configure_logging(stream=None, level=None):
+    """Send JSON log lines to stderr (or stream) at LOG_LEVEL (default INFO)"""
+    for handler in logger.handlers:
+        if isinstance(handler.formatter, JsonFormatter):
+            return handler
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter())
+    logger.addHandler(handler)
+    logger.setLevel(level or os.getenv('LOG_LEVEL', 'INFO').upper())
+    logger.propagate = False
+    return handler
@@ -1,45 +1,96 @@
 import os
 import csv
-import requests
-from bs4 import BeautifulSoup
 import random
 from datetime import datetime
-from PIL import Image, ImageDraw, ImageFont
-import cv2
-import numpy as np
-from instabot import Bot
-import nltk
-from nltk.tokenize import sent_tokenize
 import time
 import json
+import shlex
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from quote_history import QuoteHistory
+from render_cache import RenderCache, render_key
+from text_layout import layout_text, scale_layout
+from video_catalog import VideoCatalog
+from thumbnails import save_thumbnail, thumbnail_path
+from audio_mux import AudioCache, mux_audio
+from video_encoders import find_ffmpeg, get_encoder, OpenCVEncoder
+from video_templates import TemplateRenderer
+from frame_pipeline import FramePipeline
+from scheduler import Cadence, PostScheduler, SlotStore
+from render_ahead import RenderAheadBuffer
+from uploader import InstabotUploader, UploadClient
+from metrics import count, observe, span
+from profiling import get_profiler, profiled
 
-# Download required NLTK data
-nltk.download('punkt')
+# OpenCV, NumPy, PIL, instabot and requests are imported where they are used:
+# app.py imports this module at startup and must boot fast and offline.
+
+def get_quote_client():
+    """Get the shared pooled Ollama client"""
+    from quote_client import get_quote_client as shared_client
+    return shared_client()
 
 def generate_quote_ollama():
-    prompt = "Generate a short, original motivational quote."
-    response = requests.post(
-        "http://localhost:11434/api/generate",
-        json={"model": "llama3", "prompt": prompt, "stream": False}
-    )
-    if response.status_code == 200:
-        try:
-            return response.json()['response'].strip()
-        except (KeyError, json.JSONDecodeError) as e:
-            print(f"Error parsing Ollama response: {e}")
-            return "Success is not final, failure is not fatal: it is the courage to continue that counts."
-    else:
-        print(f"Error from Ollama API: {response.status_code}")
-        return "Success is not final, failure is not fatal: it is the courage to continue that counts."
+    """Generate one quote through the shared pooled Ollama client"""
+    return get_quote_client().generate_quote()
+
+# Output profiles for create_video(quote, profiles=[...]): name -> (width, height)
+OUTPUT_PROFILES = {
+    'reel': (1080, 1920),      # 9:16
+    'portrait': (1080, 1350),  # 4:5 feed
+    'square': (1080, 1080),    # 1:1 feed
+    'preview': (360, 640),     # low-res 9:16
+}
 
 class MotivationBot:
+    # Serialises CSV appends from the web and bot threads
+    csv_lock = threading.Lock()
+
     def __init__(self):
         self.csv_file = 'motivation_ideas.csv'
+        self.xlsx_file = 'motivation_ideas.xlsx'
         self.config_file = 'config.json'
         self.videos_folder = 'generated_videos'
         self.initialize_csv()
-        self.bot = None
+        self.history = QuoteHistory('motivation_history.db')
+        self.import_legacy_history()
+        self.upload_client = None
         self.music_folder = 'music'
+        # Video settings
+        self.video_size = (1080, 1920)
+        self.fps = 24
+        self.duration = 10  # seconds
+        self.font_path = 'arial.ttf'
+        self.font_size = 60
+        # Encoder backend: 'x264' (ffmpeg pipe), 'mp4v' (OpenCV) or 'raw' (frames
+        # piped to codec_command, which must write {output}; VIDEO_CODEC_COMMAND)
+        self.codec = os.environ.get('VIDEO_CODEC', 'x264')
+        self.codec_preset = os.environ.get('VIDEO_PRESET', 'veryfast')
+        self.codec_crf = int(os.environ.get('VIDEO_CRF', 23))
+        self.codec_command = shlex.split(os.environ['VIDEO_CODEC_COMMAND']) if os.environ.get('VIDEO_CODEC_COMMAND') else None
+        # With x264, encode the single rendered frame as a repeated one-second
+        # GOP instead of pushing the same frame through fps * duration times
+        self.still_encoding = True
+        self.render_cache_max_mb = int(os.environ.get('RENDER_CACHE_MAX_MB', 2048))
+        # Look of the video: 'static', 'gradient', 'ken_burns' or 'word_reveal'
+        self.template = os.environ.get('VIDEO_TEMPLATE', 'static')
+        self.background_image = None  # Ken Burns source; a generated glow when unset
+        # Mux a random track from music_folder, faded out over the last seconds
+        self.add_music = True
+        self.music_fade = 2.0
+        self.render_cache = None
+        self.audio_cache = None
+        self.video_catalog = None
+        self.batch_renderer = None
+        # Posting slots survive restarts here
+        self.schedule_db = 'posting_schedule.db'
+        self.scheduler = None
+        # Videos kept rendered ahead of the next posting slots
+        self.render_ahead_size = int(os.environ.get('RENDER_AHEAD', 2))
+        self.render_ahead = None
+        # Slot queues whose ready videos the render cache must not evict (accounts add theirs)
+        self.slot_stores = []
         os.makedirs(self.music_folder, exist_ok=True)
         os.makedirs(self.videos_folder, exist_ok=True)
         
@@ -64,10 +115,16 @@ class MotivationBot:
         else:
             # Just verify the file exists
             pass
+    
+    def import_legacy_history(self):
+        """One-time import of the CSV/Excel tracking files into the history store"""
+        imported = self.history.import_csv(self.csv_file) + self.history.import_xlsx(self.xlsx_file)
+        if imported:
+            print(f"Imported {imported} quotes into {self.history.db_path}")
             
     def get_trending_quotes(self):
         """Generate motivational quotes using Ollama LLM"""
-        return [generate_quote_ollama() for _ in range(5)]
+        return get_quote_client().generate_quotes(5)
     
     def get_random_music(self):
         """Get a random music file from the music folder"""
@@ -76,111 +133,272 @@ class MotivationBot:
             return None
         return os.path.join(self.music_folder, random.choice(music_files))
     
-    def create_video(self, quote):
-        """Create a video with the motivational quote using PIL and OpenCV"""
+    def get_render_cache(self):
+        """Get the render cache for the current videos folder"""
+        if self.render_cache is None or self.render_cache.folder != self.videos_folder:
+            os.makedirs(self.videos_folder, exist_ok=True)
+            self.render_cache = RenderCache(self.videos_folder, self.render_cache_max_mb * 1024 * 1024,
+                                            in_use=self.videos_in_use)
+        return self.render_cache
+    
+    def videos_in_use(self):
+        """Rendered videos a ready slot or the render-ahead buffer still points at"""
+        paths = self.render_ahead.video_paths() if self.render_ahead else set()
+        for store in list(self.slot_stores):
+            paths |= store.video_paths()
+        return paths
+    
+    def get_audio_cache(self, ffmpeg):
+        """Get the prepared-segment cache for the current music folder"""
+        if self.audio_cache is None or self.audio_cache.music_folder != self.music_folder:
+            self.audio_cache = AudioCache(self.music_folder, ffmpeg)
+        return self.audio_cache
+    
+    def add_background_music(self, video_path, track):
+        """Mux a trimmed/looped, faded copy of track into video_path without re-encoding the video"""
+        ffmpeg = find_ffmpeg()
+        if not ffmpeg:
+            print("ffmpeg not found - video stays silent")
+            return False
+        with span('audio', track=os.path.basename(track)):
+            segment = self.get_audio_cache(ffmpeg).prepare(track, self.duration, self.music_fade)
+            return bool(segment) and mux_audio(ffmpeg, video_path, segment)
+    
+    def get_encoder(self):
+        """Build the configured encoder backend; a raw codec without a command falls back to OpenCV"""
+        if self.codec == 'raw' and not self.codec_command:
+            print("VIDEO_CODEC=raw needs VIDEO_CODEC_COMMAND - encoding with OpenCV instead")
+            return OpenCVEncoder()
+        return get_encoder(self.codec, preset=self.codec_preset, crf=self.codec_crf,
+                           still_gop=self.still_encoding, command=self.codec_command)
+    
+    def get_video_catalog(self):
+        """Get the video catalog for the current videos folder"""
+        if self.video_catalog is None or self.video_catalog.folder != self.videos_folder:
+            os.makedirs(self.videos_folder, exist_ok=True)
+            self.video_catalog = VideoCatalog(self.videos_folder)
+        return self.video_catalog
+    
+    def get_render_key(self, quote, track=None, size=None, layout_box=None):
+        """Cache key covering the quote and every setting that changes the output"""
+        width, height = size or self.video_size
+        music = None
+        if track:
+            stat = os.stat(track)
+            music = [os.path.basename(track), stat.st_size, stat.st_mtime_ns, self.music_fade]
+        return render_key(
+            quote,
+            width=width, height=height, fps=self.fps, duration=self.duration,
+            font=self.font_path, font_size=self.font_size, music=music,
+            template=self.template, background_image=self.background_image, layout_box=layout_box,
+            encoder=self.get_encoder().cache_tag()
+        )
+    
+    def create_video(self, quote, profiles=None, profile=False):
+        """Create a video with the motivational quote using PIL and OpenCV.
+        
+        With profiles (names from OUTPUT_PROFILES or (name, width, height)
+        tuples) every output is rendered from one shared layout and encoded
+        concurrently, and a manifest is returned instead of a single path.
+        
+        profile=True, or a PROFILE_RATE sample, saves a profile of the render
+        next to the video.
+        """
+        session = get_profiler().sample(force=profile)
+        if session is None:
+            return self._create_video(quote, profiles)
+        result = None
         try:
-            # Video settings
-            width, height = 1080, 1920
-            fps = 24
-            duration = 10  # seconds
-            
-            # Create a black background
-            background = np.zeros((height, width, 3), dtype=np.uint8)
-            
-            # Create PIL image for text
-            img = Image.fromarray(background)
-            draw = ImageDraw.Draw(img)
-            
-            # Load font (use default if custom font not available)
-            try:
-                font = ImageFont.truetype("arial.ttf", 60)
-            except:
-                font = ImageFont.load_default()
-            
-            # Wrap text to fit width
-            words = quote.split()
-            lines = []
-            current_line = []
-            for word in words:
-                current_line.append(word)
-                test_line = ' '.join(current_line)
-                bbox = draw.textbbox((0, 0), test_line, font=font)
-                if bbox[2] > width - 100:  # Leave some margin
-                    current_line.pop()
-                    lines.append(' '.join(current_line))
-                    current_line = [word]
-            if current_line:
-                lines.append(' '.join(current_line))
-            
-            # Calculate text position
-            text_height = len(lines) * 70  # Approximate line height
-            y = (height - text_height) // 2
-            
-            # Draw text
-            for line in lines:
-                bbox = draw.textbbox((0, 0), line, font=font)
-                text_width = bbox[2] - bbox[0]
-                x = (width - text_width) // 2
-                draw.text((x, y), line, font=font, fill=(255, 255, 255))
-                y += 70
-            
-            # Convert PIL image to numpy array
-            frame = np.array(img)
-            
-            # Create video writer
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            safe_quote = "".join(c for c in quote[:30] if c.isalnum() or c in (' ', '-', '_')).strip()
-            output_path = os.path.join(self.videos_folder, f"motivation_{timestamp}_{safe_quote}.mp4")
-            
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
-            
-            # Write frames
-            for _ in range(fps * duration):
-                out.write(frame)
-            
-            # Release video writer
-            out.release()
-            
-            print(f"Video saved to: {output_path}")
-            return output_path
-            
+            result = self._create_video(quote, profiles)
+            return result
+        finally:
+            session.stop()
+            session.save(self.get_profile_path(result))
+    
+    def _create_video(self, quote, profiles=None):
+        if profiles:
+            return self.create_video_set(quote, profiles)
+        try:
+            track = self.get_random_music() if self.add_music else None
+            width, height = self.video_size
+            return self.render_output(quote, width, height, track)
         except Exception as e:
             print(f"Error creating video: {e}")
             return None
     
-    def post_to_instagram(self, video_path, caption):
-        """Post the video to Instagram"""
-        try:
-            if not self.bot:
-                # Clean up any existing session files
-                if os.path.exists("config"):
-                    import shutil
-                    shutil.rmtree("config")
-                
-                self.bot = Bot()
-                config = self.load_config()
-                
-                if not config or 'instagram' not in config:
-                    print("Error: Instagram credentials not found in config.json")
-                    return False
-                
-                username = config['instagram']['username']
-                password = config['instagram']['password']
-                
-                if not username or not password:
-                    print("Error: Instagram credentials not found in config.json")
-                    return False
+    def get_profile_path(self, result):
+        """Profile file name (without extension) matching a create_video result"""
+        if isinstance(result, dict):
+            paths = [entry['path'] for entry in result['outputs'] if entry['path']]
+            result = paths[0] if paths else None
+        if result:
+            return os.path.splitext(result)[0]
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        return os.path.join(self.videos_folder, f"failed_render_{timestamp}")
+    
+    def create_video_set(self, quote, profiles):
+        """Render one quote for several output profiles; returns a manifest"""
+        resolved = []
+        for profile in profiles:
+            if isinstance(profile, str):
+                if profile not in OUTPUT_PROFILES:
+                    raise ValueError(f"Unknown output profile {profile!r}, expected one of {', '.join(OUTPUT_PROFILES)}")
+                resolved.append((profile,) + OUTPUT_PROFILES[profile])
+            else:
+                resolved.append(tuple(profile))
+        
+        track = self.get_random_music() if self.add_music else None
+        # One layout for every aspect, fitted to the shortest frame relative to its width
+        base_width = 1080
+        base_height = round(base_width * min(height / width for _, width, height in resolved))
+        with span('layout'):
+            layout = layout_text(quote, base_width, base_height, self.font_path, self.font_size)
+        layout_box = (base_width, base_height)
+        
+        # Create the shared stores before worker threads race to do it
+        self.get_render_cache()
+        self.get_video_catalog()
+        
+        manifest = {
+            'quote': quote,
+            'music': os.path.basename(track) if track else None,
+            'font_size': layout['font_size'],
+            'outputs': []
+        }
+        with ThreadPoolExecutor(max_workers=len(resolved)) as pool:
+            futures = [
+                # copy_context keeps the job id and profile session on the encoder threads
+                (name, width, height, pool.submit(
+                    contextvars.copy_context().run, profiled(self.render_output), quote, width, height, track,
+                    scale_layout(layout, base_width, base_height, width, height, self.font_path),
+                    f'_{name}', layout_box
+                ))
+                for name, width, height in resolved
+            ]
+            for name, width, height, future in futures:
+                entry = {'profile': name, 'width': width, 'height': height, 'path': None, 'error': None}
+                try:
+                    entry['path'] = future.result()
+                    entry['size_bytes'] = os.path.getsize(entry['path'])
+                except Exception as e:
+                    print(f"Error creating {name} video: {e}")
+                    entry['error'] = str(e)
+                manifest['outputs'].append(entry)
+        manifest['success'] = all(entry['path'] for entry in manifest['outputs'])
+        return manifest
+    
+    def render_output(self, quote, width, height, track=None, layout=None, suffix='', layout_box=None):
+        """Render and encode one output file (or reuse a cached one); returns its path"""
+        import numpy as np
+        from PIL import Image, ImageDraw
+        
+        # Identical quote and settings: reuse the finished file
+        cache = self.get_render_cache()
+        cache_key = self.get_render_key(quote, track, (width, height), layout_box)
+        cached_path = cache.lookup(cache_key)
+        if cached_path:
+            count('motivation_bot_render_cache_hits_total')
+            print(f"Using cached video: {cached_path}")
+            return cached_path
+        render_start = time.perf_counter()
+        
+        fps = self.fps
+        duration = self.duration
+        
+        # Fit the quote: cached fonts and word widths, linear wrap, auto-shrink
+        if layout is None:
+            with span('layout'):
+                layout = layout_text(quote, width, height, self.font_path, self.font_size)
+        
+        # Build output path
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        safe_quote = "".join(c for c in quote[:30] if c.isalnum() or c in (' ', '-', '_')).strip()
+        output_path = os.path.join(self.videos_folder, f"motivation_{timestamp}_{safe_quote}{suffix}.mp4")
+        
+        encoder = self.get_encoder()
+        # Set when OpenCV had to write the file instead of the configured encoder
+        fell_back = False
+        if self.template == 'static':
+            with span('render', template='static', width=width, height=height):
+                # Create a black background
+                background = np.zeros((height, width, 3), dtype=np.uint8)
                 
-                print(f"Logging in to Instagram as {username}...")
-                login_success = self.bot.login(username=username, password=password)
+                # Create PIL image for text
+                img = Image.fromarray(background)
+                draw = ImageDraw.Draw(img)
                 
-                if not login_success:
-                    print("Failed to log in to Instagram. Please check your credentials.")
-                    self.bot = None
-                    return False
+                # Draw text
+                for line, x, y in layout['lines']:
+                    draw.text((x, y), line, font=layout['font'], fill=(255, 255, 255))
                 
-                print("Successfully logged in to Instagram!")
+                # Convert PIL image to numpy array
+                frame = np.array(img)
+            
+            # Poster for the dashboard, taken from the frame already in memory
+            save_thumbnail(img, thumbnail_path(self.videos_folder, output_path))
+            
+            # Encode video, falling back to OpenCV when ffmpeg is missing or fails
+            with span('encode', codec=encoder.cache_tag(), width=width, height=height):
+                if not (encoder.available() and encoder.encode_still(frame, output_path, fps, duration)):
+                    fell_back = True
+                    if not OpenCVEncoder().encode_still(frame, output_path, fps, duration):
+                        raise RuntimeError("no encoder could write the video")
+        else:
+            # Animated: every frame is composited in NumPy into one reused buffer
+            renderer = TemplateRenderer.from_template(
+                self.template, quote, width, height, fps, duration, self.font_path, self.font_size,
+                background_image=self.background_image, layout=layout
+            )
+            save_thumbnail(Image.fromarray(renderer.poster()[:, :, ::-1]),
+                           thumbnail_path(self.videos_folder, output_path))
+            # Compositing runs in a producer thread, a few frames ahead of the encoder
+            render_seconds = [0.0]
+            
+            def render_frame(index, out):
+                started = time.perf_counter()
+                renderer.render_into(index, out)
+                render_seconds[0] += time.perf_counter() - started
+            
+            pipeline = FramePipeline(render_frame, width, height, renderer.frame_count)
+            # Encode time overlaps frame rendering, which is reported separately below
+            with span('encode', codec=encoder.cache_tag(), width=width, height=height):
+                if not (encoder.available() and encoder.encode_frames(pipeline.frames(), output_path, width, height, fps)):
+                    fell_back = True
+                    if not OpenCVEncoder().encode_frames(pipeline.frames(), output_path, width, height, fps):
+                        raise RuntimeError("no encoder could write the video")
+            observe('render', render_seconds[0], template=self.template, frames=renderer.frame_count)
+        
+        # Fallbacks (no music, or OpenCV instead of the configured encoder) must not be
+        # cached under a key that promises the real thing
+        muxed = not track or self.add_background_music(output_path, track)
+        if muxed and not fell_back:
+            cache.store(cache_key, output_path, time.perf_counter() - render_start)
+        self.get_video_catalog().add(output_path, quote)
+        count('motivation_bot_videos_rendered_total')
+        print(f"Video saved to: {output_path}")
+        return output_path
+    
+    def get_upload_client(self):
+        """Upload client for the account in config.json; its session is kept in sessions/<username>"""
+        if self.upload_client is None:
+            config = self.load_config()
+            instagram = (config or {}).get('instagram') or {}
+            username = instagram.get('username')
+            password = instagram.get('password')
+            if not username or not password:
+                print("Error: Instagram credentials not found in config.json")
+                return None
+            self.upload_client = UploadClient(
+                InstabotUploader(username, password, os.path.join('sessions', username))
+            )
+        return self.upload_client
+    
+    def post_to_instagram(self, video_path, caption, on_verified=None):
+        """Post the video to Instagram; on_verified(media_id, ok) follows the background check"""
+        try:
+            client = self.get_upload_client()
+            if not client:
+                return False
             
             # Verify video file exists and is readable
             if not os.path.exists(video_path):
@@ -198,129 +416,162 @@ class MotivationBot:
             print(f"Uploading video: {video_path}")
             print(f"Caption: {caption}")
             
-            # Try to upload with retries
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    print(f"Upload attempt {attempt + 1} of {max_retries}")
-                    upload_success = self.bot.upload_video(video_path, caption=caption)
-                    
-                    if upload_success:
-                        print("Video upload reported successful!")
-                        # Wait a bit to let Instagram process the upload
-                        time.sleep(10)
-                        
-                        # Verify the upload by checking the last media
-                        last_media = self.bot.get_last_user_medias(username, 1)
-                        if last_media:
-                            print("Successfully verified post on Instagram!")
-                            return True
-                        else:
-                            print("Warning: Upload reported successful but post not found on profile")
-                            if attempt < max_retries - 1:
-                                print("Retrying upload...")
-                                continue
-                            return False
-                    else:
-                        print(f"Upload attempt {attempt + 1} failed")
-                        if attempt < max_retries - 1:
-                            print("Retrying upload...")
-                            time.sleep(5)  # Wait before retry
-                            continue
-                        return False
-                        
-                except Exception as e:
-                    print(f"Error during upload attempt {attempt + 1}: {e}")
-                    if attempt < max_retries - 1:
-                        print("Retrying upload...")
-                        time.sleep(5)
-                        continue
-                    raise
-            
-            return False
+            # Retries back off with jitter; the post is verified in the background
+            with span('upload', size_mb=round(file_size, 2)):
+                media_id = client.upload(video_path, caption, on_verified=on_verified)
+            count('motivation_bot_posts_total', result='posted' if media_id is not None else 'failed')
+            if media_id is None:
+                return False
+            print("Video upload reported successful!")
+            return True
             
         except Exception as e:
             print(f"Error posting to Instagram: {e}")
-            # Reset bot instance on error
-            self.bot = None
             return False
     
     def update_csv(self, idea, source, posted=False):
-        """Update the CSV file with new ideas and posting status"""
-        with open(self.csv_file, 'a', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                datetime.now().strftime('%Y-%m-%d'),
-                idea,
-                source,
-                posted,
-                datetime.now().strftime('%Y-%m-%d') if posted else None
-            ])
+        """Record an idea and its posting status in the history store and CSV log"""
+        with span('history', op='add'):
+            self.history.add(idea, source, posted)
+        
+        # The CSV stays as a human-readable, append-only log
+        with span('csv'), self.csv_lock:
+            with open(self.csv_file, 'a', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow([
+                    datetime.now().strftime('%Y-%m-%d'),
+                    idea,
+                    source,
+                    posted,
+                    datetime.now().strftime('%Y-%m-%d') if posted else None
+                ])
     
     def is_quote_posted(self, quote):
         """Check if a quote has already been posted"""
-        if not os.path.exists(self.csv_file):
-            return False
-        with open(self.csv_file, 'r', newline='') as f:
-            reader = csv.reader(f)
-            next(reader)  # Skip header
-            for row in reader:
-                if row[1] == quote:  # Check the 'Idea' column
-                    return True
-        return False
+        with span('history', op='contains'):
+            return self.history.contains(quote)
     
-    def run(self):
-        """Main function to run the bot"""
-        while True:
-            try:
-                # Get trending quotes
-                quotes = self.get_trending_quotes()
-                
-                for quote in quotes:
-                    # Check if quote already exists in CSV
-                    if not self.is_quote_posted(quote):
-                        # Create video
-                        video_path = self.create_video(quote)
-                        if video_path:  # Only proceed if video creation was successful
-                            # Post to Instagram
-                            caption = f"💪 {quote}\n\n#motivation #inspiration #success #mindset"
-                            posted = self.post_to_instagram(video_path, caption)
-                            
-                            # Update CSV
-                            self.update_csv(quote, 'Ollama LLM', posted)
-                            
-                            # Wait for 1 hour before next post
-                            time.sleep(3600)
-                
-                # Wait for 6 hours before checking for new trends
-                time.sleep(21600)
-                
-            except Exception as e:
-                print(f"Error in main loop: {e}")
-                time.sleep(3600)  # Wait an hour before retrying
+    def get_scheduler(self, clock=None):
+        """Build the posting scheduler from the optional "schedule" block in config.json.
+        
+        {"schedule": {"cron": "0 9,13,18 * * *", "windows": [["08:00", "22:00"]],
+                      "lead_minutes": 10}}
+        Without it the bot posts hourly, like the original loop.
+        """
+        if self.scheduler is None or clock is not None:
+            schedule = (self.load_config() or {}).get('schedule', {})
+            cadence = Cadence(schedule.get('cron', '0 * * * *'), schedule.get('windows'))
+            store = SlotStore(self.schedule_db)
+            self.slot_stores = [known for known in self.slot_stores if known.db_path != store.db_path] + [store]
+            self.scheduler = PostScheduler(
+                store, cadence, self.prepare_post, self.publish_post,
+                clock=clock, lead_time=schedule.get('lead_minutes', 10) * 60
+            )
+        return self.scheduler
+    
+    def get_render_ahead(self):
+        """Get the buffer of videos rendered ahead of posting"""
+        if self.render_ahead is None:
+            self.render_ahead = RenderAheadBuffer(self.render_next, capacity=self.render_ahead_size)
+        return self.render_ahead
+    
+    def render_next(self, exclude=()):
+        """Render one video for a quote that is not posted, queued or in exclude"""
+        store = self.get_scheduler().store
+        for quote in self.get_trending_quotes():
+            if quote in exclude or self.is_quote_posted(quote) or store.has_quote(quote):
+                continue
+            video_path = self.create_video(quote)
+            if video_path:
+                return quote, video_path
+        return None
+    
+    def prepare_post(self, slot_time):
+        """Hand a posting slot a video from the render-ahead buffer, rendering one only if it ran dry"""
+        buffer = self.get_render_ahead()
+        store = self.get_scheduler().store
+        item = buffer.take()
+        while item:
+            # Buffered videos can be hours old: the quote may have been posted since
+            # (e.g. the fallback quote while Ollama was down) or the file deleted
+            quote, video_path = item
+            if os.path.exists(video_path) and not self.is_quote_posted(quote) and not store.has_quote(quote):
+                return item
+            print(f"Discarding stale pre-rendered video for: {quote}")
+            item = buffer.take()
+        return self.render_next(buffer.quotes())
+    
+    def publish_post(self, quote, video_path):
+        """Post a prepared video and record it"""
+        caption = f"💪 {quote}\n\n#motivation #inspiration #success #mindset"
+        store = self.get_scheduler().store
+        
+        def verified(media_id, ok):
+            if not ok:
+                store.mark_unverified(video_path, time.time())
+        
+        posted = self.post_to_instagram(video_path, caption, on_verified=verified)
+        self.update_csv(quote, 'Ollama LLM', posted)
+        return posted
+    
+    def run(self, stop_event=None, clock=None):
+        """Main function to run the bot: post on the schedule until stop_event is set"""
+        stop_event = stop_event or threading.Event()
+        scheduler = self.get_scheduler(clock)
+        print(f"Posting on schedule '{scheduler.cadence.cron}'")
+        # Generation runs ahead in its own thread; the scheduler thread only uploads
+        buffer = self.get_render_ahead()
+        buffer.start()
+        try:
+            scheduler.run(stop_event)
+        finally:
+            buffer.stop(timeout=5)
+
+    def status(self):
+        """What the posting loop is doing: stage, queued slots, next post and last error"""
+        scheduler = self.scheduler
+        if scheduler is None:
+            # Never started: don't read config.json or create the slot store for a status poll
+            return {'stage': 'stopped', 'queue_depth': 0, 'rendered_ahead': 0,
+                    'next_post': None, 'last_error': None, 'upcoming': []}
+        upcoming = scheduler.upcoming()
+        return {
+            'stage': scheduler.stage,
+            'queue_depth': scheduler.store.open_count(time.time()),
+            'rendered_ahead': self.render_ahead.ready_count() if self.render_ahead else 0,
+            'next_post': upcoming[0]['time'] if upcoming else None,
+            'last_error': scheduler.last_error,
+            'upcoming': upcoming
+        }
+
+    def get_batch_renderer(self):
+        """Get the process pool used for batch rendering"""
+        if self.batch_renderer is None:
+            from render_pool import BatchRenderer
+            self.batch_renderer = BatchRenderer(self)
+        return self.batch_renderer
 
-    def generate_videos_only(self, num_videos=5):
+    def generate_videos_only(self, num_videos=5, on_result=None):
         """Generate videos without posting to Instagram"""
         print(f"Generating {num_videos} motivational videos...")
         generated_videos = []
         
-        for i in range(num_videos):
-            quote = generate_quote_ollama()
-            print(f"\nGenerating video {i+1}/{num_videos}")
-            print(f"Quote: {quote}")
-            
-            video_path = self.create_video(quote)
-            if video_path:
+        # Quotes are generated concurrently and rendered as each one arrives
+        quotes = get_quote_client().iter_quotes(num_videos)
+        results = self.get_batch_renderer().render_batch(quotes, on_result)
+        
+        for result in results:
+            i = result['index']
+            print(f"\nVideo {i+1}/{num_videos}")
+            print(f"Quote: {result['quote']}")
+            if result['success']:
                 generated_videos.append({
-                    'quote': quote,
-                    'video_path': video_path
+                    'quote': result['quote'],
+                    'video_path': result['video_path']
                 })
                 print(f"Successfully generated video {i+1}")
             else:
-                print(f"Failed to generate video {i+1}")
-            
-            # Small delay between generations
-            time.sleep(1)
+                print(f"Failed to generate video {i+1}: {result['error']}")
         
         print("\nGenerated Videos Summary:")
         for i, video in enumerate(generated_videos, 1):
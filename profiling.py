@@ -0,0 +1,237 @@
+"""
+On-demand profiling for Motivation Bot
+Wraps a sampled fraction of create_video calls and Flask requests in cProfile
+(.pstats, for pstats/snakeviz; the render's worker threads are merged in) or a stack-sampling profiler (.speedscope.json,
+for https://www.speedscope.app). Off unless PROFILE_RATE is set; a rate of
+0.01 profiles about 1% of renders and requests.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import threading
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime
+
+MODES = ('cprofile', 'sampling')
+
+# cProfile sessions run one at a time: from Python 3.12 there is one profiler slot per process
+_cprofile_lock = threading.Lock()
+# The cProfile session of the render or request running in this context; its
+# worker threads join it through profile_thread()
+current_session = contextvars.ContextVar('current_profile_session', default=None)
+
+class SamplingProfiler:
+    """Samples the Python stack of every thread each `interval` seconds"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.samples = {}  # thread name -> list of stacks (outermost frame first)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                    frame = frame.f_back
+                stack.reverse()
+                self.samples.setdefault(names.get(ident, str(ident)), []).append(stack)
+
+    def to_speedscope(self, name):
+        """The samples as a speedscope file: one sampled profile per thread"""
+        frames = []
+        index = {}
+        profiles = []
+        for thread_name, stacks in sorted(self.samples.items()):
+            encoded = []
+            for stack in stacks:
+                ids = []
+                for frame in stack:
+                    if frame not in index:
+                        index[frame] = len(frames)
+                        frames.append({'name': frame[0], 'file': frame[1], 'line': frame[2]})
+                    ids.append(index[frame])
+                encoded.append(ids)
+            profiles.append({
+                'type': 'sampled',
+                'name': thread_name,
+                'unit': 'seconds',
+                'startValue': 0,
+                'endValue': len(encoded) * self.interval,
+                'samples': encoded,
+                'weights': [self.interval] * len(encoded)
+            })
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': name,
+            'exporter': 'motivation_bot',
+            'shared': {'frames': frames},
+            'profiles': profiles
+        }
+
+class ProfileSession:
+    def __init__(self, mode='cprofile', interval=0.005):
+        self.mode = mode
+        self.interval = interval
+        self.profiler = None
+        self.started = None
+        self.elapsed = None
+        self.thread_profilers = []
+        self._token = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Begin profiling; False if another cProfile session is running"""
+        if self.mode == 'cprofile':
+            import cProfile
+            if not _cprofile_lock.acquire(blocking=False):
+                print("Profiling skipped: another cProfile session is running")
+                return False
+            self.profiler = cProfile.Profile()
+            try:
+                self.profiler.enable()
+            except Exception as e:
+                # Another tool (a debugger, coverage) holds the profiler slot
+                print(f"Profiling skipped: {e}")
+                _cprofile_lock.release()
+                return False
+            self._token = current_session.set(self)
+        else:
+            self.profiler = SamplingProfiler(self.interval)
+            self.profiler.start()
+        self.started = time.perf_counter()
+        return True
+
+    def stop(self):
+        self.elapsed = time.perf_counter() - self.started
+        if self.mode == 'cprofile':
+            self.profiler.disable()
+            _cprofile_lock.release()
+            try:
+                current_session.reset(self._token)
+            except ValueError:
+                # Stopped from another context than the one it started in
+                current_session.set(None)
+        else:
+            self.profiler.stop()
+
+    def enable_thread(self):
+        """A cProfile profiler running in the calling worker thread, or None"""
+        if self.mode != 'cprofile' or self.elapsed is not None:
+            return None
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except Exception:
+            # From Python 3.12 the session's own profiler already sees every thread
+            return None
+        return profiler
+
+    def add_thread(self, profiler):
+        """Merge a finished worker thread's profile into the session"""
+        profiler.disable()
+        with self._lock:
+            self.thread_profilers.append(profiler)
+
+    def save(self, base_path):
+        """Write the profile as base_path + .pstats or .speedscope.json; returns the file"""
+        os.makedirs(os.path.dirname(base_path) or '.', exist_ok=True)
+        if self.mode == 'cprofile':
+            import pstats
+            path = base_path + '.pstats'
+            stats = pstats.Stats(self.profiler)
+            with self._lock:
+                for profiler in self.thread_profilers:
+                    stats.add(profiler)
+            stats.dump_stats(path)
+        else:
+            path = base_path + '.speedscope.json'
+            with open(path, 'w') as f:
+                json.dump(self.profiler.to_speedscope(os.path.basename(base_path)), f)
+        print(f"Profile ({self.elapsed:.2f} s) saved to: {path}")
+        return path
+
+@contextmanager
+def profile_thread():
+    """Profile this worker thread into the context's cProfile session, if there is one.
+
+    cProfile only sees the thread that enabled it, so threads doing work for a
+    profiled render (the frame producer, encoder pool tasks) run under this.
+    """
+    session = current_session.get()
+    profiler = session.enable_thread() if session is not None else None
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            session.add_thread(profiler)
+
+def profiled(func):
+    """func wrapped in profile_thread(), to submit to a thread pool"""
+    def run(*args, **kwargs):
+        with profile_thread():
+            return func(*args, **kwargs)
+    return run
+
+class Profiler:
+    def __init__(self, rate=0.0, mode='cprofile', interval=0.005, folder='profiles', rng=None):
+        """rate is the fraction of calls profiled (0 = off, 1 = every call)"""
+        if mode not in MODES:
+            raise ValueError(f"Unknown profile mode {mode!r}, expected one of {', '.join(MODES)}")
+        self.rate = rate
+        self.mode = mode
+        self.interval = interval
+        self.folder = folder
+        self.rng = rng or random.Random()
+
+    @property
+    def enabled(self):
+        return self.rate > 0
+
+    def sample(self, force=False):
+        """A started session for this call, or None if it is not sampled"""
+        if not (force or (self.rate > 0 and self.rng.random() < self.rate)):
+            return None
+        session = ProfileSession(self.mode, self.interval)
+        return session if session.start() else None
+
+    def request_path(self, endpoint):
+        """Base path (no extension) for a request profile"""
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        return os.path.join(self.folder, f"request_{timestamp}_{endpoint or 'unknown'}")
+
+_default_profiler = None
+_default_profiler_lock = threading.Lock()
+
+def get_profiler():
+    """The shared profiler, configured from PROFILE_RATE / PROFILE_MODE / PROFILE_INTERVAL_MS / PROFILE_DIR"""
+    global _default_profiler
+    with _default_profiler_lock:
+        if _default_profiler is None:
+            _default_profiler = Profiler(
+                rate=float(os.getenv('PROFILE_RATE', '0')),
+                mode=os.getenv('PROFILE_MODE', 'cprofile'),
+                interval=float(os.getenv('PROFILE_INTERVAL_MS', '5')) / 1000,
+                folder=os.getenv('PROFILE_DIR', 'profiles')
+            )
+        return _default_profiler
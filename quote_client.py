@@ -0,0 +1,271 @@
+"""
+Ollama quote client for Motivation Bot
+Pooled HTTP session, request timeouts, batched and concurrent generation and a
+prefetch buffer. keep_alive keeps the model loaded between posting cycles.
+"""
+
+import os
+import json
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+from requests.adapters import HTTPAdapter
+from quote_dedup import canonicalize_quote, normalize_quote
+from metrics import span
+
+DEFAULT_PROMPT = "Generate a short, original motivational quote."
+BATCH_PROMPT = ("Generate {count} short, original, distinct motivational quotes. "
+                'Respond with JSON only, in the form {{"quotes": ["first quote", "second quote"]}}.')
+# num_predict budget per quote in a batch, so a rambling answer is cut off early
+TOKENS_PER_QUOTE = 60
+# Consecutive unusable batch answers before falling back to per-quote calls for good
+MAX_BATCH_FAILURES = 3
+FALLBACK_QUOTE = "Success is not final, failure is not fatal: it is the courage to continue that counts."
+
+class QuoteClient:
+    def __init__(self, base_url="http://localhost:11434", model="llama3", prompt=DEFAULT_PROMPT,
+                 connect_timeout=3.05, read_timeout=120, max_concurrency=4, prefetch_size=5,
+                 batch_size=5, keep_alive='30m', options=None):
+        """batch_size > 1 asks for that many quotes per request (0 or 1 disables batching).
+
+        keep_alive is how long Ollama keeps the model loaded after a request;
+        options are Ollama model options such as temperature or num_ctx.
+        """
+        self.base_url = base_url.rstrip('/')
+        self.model = model
+        self.prompt = prompt
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_concurrency = max_concurrency
+        self.batch_size = batch_size
+        self.keep_alive = keep_alive
+        self.options = dict(options or {})
+        self._batch_failures = 0
+        self._batch_lock = threading.Lock()
+
+        # One keep-alive connection per concurrent generation
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+        self._buffer = queue.Queue(maxsize=prefetch_size)
+        self._prefetch_thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def request_quote(self):
+        """Ask Ollama for one quote, raising on any HTTP or parsing error.
+
+        The answer is canonicalized so "Here's a quote: ..." preambles and
+        sign-offs never reach the renderer or the history.
+        """
+        return self._accept(self._generate(self.prompt))
+
+    def _generate(self, prompt, options=None, **fields):
+        """POST one non-streaming generation and return Ollama's response text"""
+        payload = {"model": self.model, "prompt": prompt, "stream": False}
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        merged = dict(self.options, **(options or {}))
+        if merged:
+            payload["options"] = merged
+        payload.update(fields)
+        with span('ollama', model=self.model, batch=fields.get('format') == 'json' or None):
+            response = self.session.post(f"{self.base_url}/api/generate", json=payload, timeout=self.timeout)
+            response.raise_for_status()
+        return response.json()['response']
+
+    def _accept(self, text):
+        quote = canonicalize_quote(text)
+        if not quote:
+            raise ValueError("Ollama returned an empty quote")
+        return quote
+
+    def request_quotes(self, count):
+        """Ask Ollama for count quotes in one JSON-format request.
+
+        Returns the distinct, canonicalized quotes it parsed (possibly fewer
+        than count); raises on HTTP errors or an answer with no usable quotes.
+        """
+        text = self._generate(BATCH_PROMPT.format(count=count), format='json',
+                              options={'num_predict': TOKENS_PER_QUOTE * count + 40})
+        return parse_quote_batch(text)[:count]
+
+    def _request_batch(self, count):
+        """Quotes from one batched request, or [] if it failed.
+
+        Unusable answers count towards MAX_BATCH_FAILURES; requests run on
+        several threads at once, so that state is only touched under a lock.
+        """
+        try:
+            quotes = self.request_quotes(count)
+        except requests.exceptions.RequestException as e:
+            print(f"Batched quote request failed: {e}")
+            return []
+        except (KeyError, ValueError) as e:
+            print(f"Unusable batched quote answer ({e}); generating one at a time")
+            with self._batch_lock:
+                self._batch_failures += 1
+                if self._batch_failures >= MAX_BATCH_FAILURES and self.batch_size:
+                    print("Model does not follow the batch format; batching disabled")
+                    self.batch_size = 0
+            return []
+        with self._batch_lock:
+            self._batch_failures = 0
+        return quotes
+
+    def _submit(self, count):
+        """Send the requests for count quotes at once: batches of batch_size when batching is on"""
+        size = self.batch_size
+        if size > 1 and count > 1:
+            return [self._executor.submit(self._request_batch, min(size, count - start))
+                    for start in range(0, count, size)]
+        return [self._executor.submit(lambda: [self.generate_quote()]) for _ in range(count)]
+
+    def _collect(self, futures, count):
+        """Yield quotes as each request completes, topping up short batches one quote at a time"""
+        produced = 0
+        for future in as_completed(futures):
+            for quote in future.result():
+                produced += 1
+                yield quote
+        for future in as_completed([self._executor.submit(self.generate_quote) for _ in range(count - produced)]):
+            yield future.result()
+
+    def generate_batch(self, count):
+        """count quotes from concurrent batched requests, topped up with per-quote calls if they fall short"""
+        return list(self._collect(self._submit(count), count))
+
+    def generate_quote(self):
+        """Generate one quote, falling back to a stock quote on failure"""
+        try:
+            return self.request_quote()
+        except requests.exceptions.HTTPError as e:
+            print(f"Error from Ollama API: {e.response.status_code}")
+        except requests.exceptions.RequestException as e:
+            print(f"Error contacting Ollama: {e}")
+        except (KeyError, ValueError, json.JSONDecodeError) as e:
+            print(f"Error parsing Ollama response: {e}")
+        return FALLBACK_QUOTE
+
+    def iter_quotes(self, count):
+        """Yield count quotes: prefetched ones first, the rest as their requests complete.
+
+        Every request is sent before the first quote is yielded, so a caller
+        rendering each quote as it arrives overlaps the renders with the
+        remaining generations.
+        """
+        ready = []
+        while len(ready) < count:
+            try:
+                ready.append(self._buffer.get_nowait())
+            except queue.Empty:
+                break
+        missing = count - len(ready)
+        futures = self._submit(missing)
+        yield from ready
+        yield from self._collect(futures, missing)
+
+    def generate_quotes(self, count):
+        """Generate count quotes concurrently"""
+        return list(self.iter_quotes(count))
+
+    def get_quote(self):
+        """Take a prefetched quote if one is ready, otherwise generate one now"""
+        try:
+            return self._buffer.get_nowait()
+        except queue.Empty:
+            return self.generate_quote()
+
+    def start_prefetch(self):
+        """Keep the prefetch buffer topped up from a background thread"""
+        with self._lock:
+            if self._prefetch_thread and self._prefetch_thread.is_alive():
+                return
+            self._stop.clear()
+            self._prefetch_thread = threading.Thread(target=self._prefetch_loop, daemon=True)
+            self._prefetch_thread.start()
+
+    def stop_prefetch(self):
+        """Stop the background prefetch thread"""
+        self._stop.set()
+        if self._prefetch_thread:
+            self._prefetch_thread.join(timeout=5)
+
+    def prefetched_count(self):
+        """Number of quotes ready in the prefetch buffer"""
+        return self._buffer.qsize()
+
+    def _prefetch_loop(self):
+        """Fill the buffer with real Ollama quotes, backing off while it is unreachable"""
+        backoff = 1
+        while not self._stop.is_set():
+            if self._buffer.full():
+                self._stop.wait(0.5)
+                continue
+            free = self._buffer.maxsize - self._buffer.qsize()
+            try:
+                # Refill the buffer with a single batched request when the model plays along
+                size = self.batch_size
+                quotes = self._request_batch(min(free, size)) if size > 1 and free > 1 else []
+                if not quotes:
+                    quotes = [self.request_quote()]
+                backoff = 1
+            except Exception as e:
+                print(f"Quote prefetch failed, retrying in {backoff}s: {e}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 60)
+                continue
+            for quote in quotes:
+                try:
+                    self._buffer.put_nowait(quote)
+                except queue.Full:
+                    break
+
+    def close(self):
+        """Stop prefetching and release pooled connections"""
+        self.stop_prefetch()
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+def parse_quote_batch(text):
+    """Quotes from a batched answer: {"quotes": [...]}, a bare list, or objects with a "quote" field"""
+    data = json.loads(text)
+    if isinstance(data, dict):
+        # Models sometimes pick their own key name
+        data = data.get('quotes', next((value for value in data.values() if isinstance(value, list)), []))
+    if not isinstance(data, list):
+        raise ValueError("batched answer is not a list of quotes")
+    quotes = []
+    seen = set()
+    for item in data:
+        if isinstance(item, dict):
+            item = item.get('quote') or item.get('text') or ''
+        if not isinstance(item, str):
+            continue
+        quote = canonicalize_quote(item)
+        key = normalize_quote(quote)
+        if quote and key not in seen:
+            seen.add(key)
+            quotes.append(quote)
+    if not quotes:
+        raise ValueError("batched answer contained no quotes")
+    return quotes
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+def get_quote_client():
+    """Get the shared QuoteClient, configured from OLLAMA_URL / OLLAMA_MODEL / OLLAMA_BATCH_SIZE / OLLAMA_KEEP_ALIVE"""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = QuoteClient(
+                base_url=os.environ.get('OLLAMA_URL', 'http://localhost:11434'),
+                model=os.environ.get('OLLAMA_MODEL', 'llama3'),
+                batch_size=int(os.environ.get('OLLAMA_BATCH_SIZE', '5')),
+                keep_alive=os.environ.get('OLLAMA_KEEP_ALIVE', '30m')
+            )
+        return _default_client
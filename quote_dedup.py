@@ -0,0 +1,122 @@
+"""
+Quote canonicalization and near-duplicate detection for Motivation Bot
+Strips LLM boilerplate and indexes quotes with MinHash/LSH for fast fuzzy lookups.
+"""
+
+import re
+import zlib
+
+# Opening/closing quote pairs the LLM wraps its answer in
+QUOTE_PAIRS = (('"', '"'), ('“', '”'), ('«', '»'))
+
+# "Here's a short, original motivational quote:" and friends
+PREAMBLE_PATTERN = re.compile(
+    r"^\s*(here('s| is| are)|sure|okay|ok|certainly|of course|absolutely)\b[^\n]*?:\s*",
+    re.IGNORECASE
+)
+
+# "I hope you find it inspiring!" and similar sign-offs
+SIGNOFF_PATTERN = re.compile(
+    r"\n\s*(i hope|hope this|feel free|let me know|enjoy|remember,? this)\b[^\n]*$",
+    re.IGNORECASE
+)
+
+def canonicalize_quote(text):
+    """Extract the quote itself from an LLM answer"""
+    if not text:
+        return ''
+    cleaned = text.strip()
+
+    # Prefer an explicitly quoted passage of at least a few words
+    candidates = []
+    for opening, closing in QUOTE_PAIRS:
+        pattern = re.escape(opening) + r'([^' + re.escape(opening + closing) + r']+)' + re.escape(closing)
+        candidates.extend(match.strip() for match in re.findall(pattern, cleaned))
+    candidates = [c for c in candidates if len(c.split()) >= 4]
+    if candidates:
+        return max(candidates, key=len)
+
+    # Otherwise peel off the preamble and sign-off lines
+    cleaned = PREAMBLE_PATTERN.sub('', cleaned, count=1)
+    previous = None
+    while previous != cleaned:
+        previous = cleaned
+        cleaned = SIGNOFF_PATTERN.sub('', cleaned).strip()
+    cleaned = cleaned.strip(' \n"\'“”')
+    return cleaned or text.strip()
+
+def normalize_quote(text):
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return ' '.join(re.findall(r"[a-z0-9]+", text.lower().replace("'", '').replace('’', '')))
+
+class MinHashIndex:
+    """Locality-sensitive index over character shingles.
+
+    Signatures use num_perm universal hashes of 5-character shingles; LSH
+    buckets split each signature into bands of rows_per_band values so only
+    quotes that collide in some band are compared. With 16 bands of 4 rows,
+    a quote pair with Jaccard similarity 0.7 collides with ~99% probability
+    while unrelated quotes almost never do.
+    """
+
+    PRIME = (1 << 31) - 1
+
+    def __init__(self, threshold=0.7, num_perm=64, rows_per_band=4, shingle_size=5, seed=1):
+        if num_perm % rows_per_band:
+            raise ValueError("num_perm must be a multiple of rows_per_band")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.rows_per_band = rows_per_band
+        self.shingle_size = shingle_size
+        import numpy as np
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, self.PRIME, size=num_perm).astype(np.int64)
+        self._b = rng.randint(0, self.PRIME, size=num_perm).astype(np.int64)
+        self._buckets = [dict() for _ in range(num_perm // rows_per_band)]
+        self._signatures = {}
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def signature(self, text):
+        """MinHash signature of a quote's normalized text"""
+        import numpy as np
+        normalized = normalize_quote(text)
+        size = self.shingle_size
+        if len(normalized) <= size:
+            shingles = {normalized}
+        else:
+            shingles = {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles),
+                             dtype=np.int64, count=len(shingles)) % self.PRIME
+        # (a * x + b) mod p for every (permutation, shingle) pair; fits in int64
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % self.PRIME
+        return permuted.min(axis=1)
+
+    def _band_keys(self, signature):
+        rows = self.rows_per_band
+        return [signature[i:i + rows].tobytes() for i in range(0, self.num_perm, rows)]
+
+    def add(self, key, text):
+        """Index text under key"""
+        signature = self.signature(text)
+        self._signatures[key] = signature
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            bucket.setdefault(band_key, []).append(key)
+
+    def query(self, text):
+        """Return (key, estimated similarity) of the closest indexed quote above threshold"""
+        import numpy as np
+        signature = self.signature(text)
+        candidates = set()
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(bucket.get(band_key, ()))
+
+        best_key, best_score = None, 0.0
+        for key in candidates:
+            score = float(np.count_nonzero(self._signatures[key] == signature)) / self.num_perm
+            if score > best_score:
+                best_key, best_score = key, score
+        if best_score >= self.threshold:
+            return best_key, best_score
+        return None
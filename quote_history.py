@@ -0,0 +1,186 @@
+"""
+Quote history store for Motivation Bot
+SQLite (WAL mode) replacement for scanning motivation_ideas.csv on every check.
+Quotes are keyed by their canonical text and near-duplicates are caught by a
+MinHash index kept in sync with the table.
+"""
+
+import os
+import csv
+import hashlib
+import threading
+from datetime import datetime
+from quote_dedup import canonicalize_quote, normalize_quote, MinHashIndex
+from sqlite_store import SQLiteStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS quotes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    quote_hash TEXT NOT NULL,
+    idea TEXT NOT NULL,
+    canonical TEXT,
+    source TEXT,
+    posted INTEGER NOT NULL DEFAULT 0,
+    date TEXT,
+    post_date TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_quotes_hash ON quotes (quote_hash);
+CREATE TABLE IF NOT EXISTS imports (
+    path TEXT PRIMARY KEY,
+    imported_at TEXT NOT NULL,
+    rows INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+SCHEMA_VERSION = 1
+
+def quote_key(quote):
+    """Stable lookup key for a quote, ignoring LLM boilerplate, case and punctuation"""
+    return hashlib.sha1(normalize_quote(canonicalize_quote(quote)).encode('utf-8')).hexdigest()
+
+def _parse_posted(value):
+    """Read the Posted column written by csv/pandas ('True', 'False', 1, '')"""
+    if isinstance(value, str):
+        return value.strip().lower() in ('true', '1', 'yes')
+    return bool(value)
+
+class QuoteHistory(SQLiteStore):
+    def __init__(self, db_path='motivation_history.db'):
+        super().__init__(db_path)
+        self._known = set()
+        self._known_lock = threading.Lock()
+        self._index = None  # Built on the first fuzzy lookup
+        self._indexed_id = 0
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        """Bring databases created by older versions up to SCHEMA_VERSION"""
+        conn = self._connect()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+            if version >= SCHEMA_VERSION:
+                return
+            columns = [row[1] for row in conn.execute('PRAGMA table_info(quotes)')]
+            if 'canonical' not in columns:
+                conn.execute('ALTER TABLE quotes ADD COLUMN canonical TEXT')
+            # Version 0 keyed quotes on their raw text
+            rows = conn.execute('SELECT id, idea FROM quotes').fetchall()
+            conn.executemany(
+                'UPDATE quotes SET canonical = ?, quote_hash = ? WHERE id = ?',
+                [(canonicalize_quote(idea), quote_key(idea), row_id) for row_id, idea in rows]
+            )
+            conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def contains(self, quote):
+        """Check whether a quote, or a near-duplicate of it, is already in the history"""
+        return self.find_duplicate(quote) is not None
+
+    def find_duplicate(self, quote):
+        """Return the recorded quote matching this one exactly or fuzzily, else None"""
+        key = quote_key(quote)
+        if key in self._known:
+            return quote
+        row = self._connect().execute(
+            'SELECT idea FROM quotes WHERE quote_hash = ? LIMIT 1', (key,)
+        ).fetchone()
+        if row:
+            with self._known_lock:
+                self._known.add(key)
+            return row[0]
+
+        with self._known_lock:
+            self._refresh_index()
+            match = self._index.query(canonicalize_quote(quote))
+        if match:
+            return self._connect().execute(
+                'SELECT idea FROM quotes WHERE id = ?', (match[0],)
+            ).fetchone()[0]
+        return None
+
+    def _refresh_index(self):
+        """Index rows added since the last lookup, including ones from other processes"""
+        if self._index is None:
+            self._index = MinHashIndex()
+        rows = self._connect().execute(
+            'SELECT id, canonical FROM quotes WHERE id > ? ORDER BY id', (self._indexed_id,)
+        ).fetchall()
+        for row_id, canonical in rows:
+            self._index.add(row_id, canonical or '')
+            self._indexed_id = row_id
+
+    def add(self, idea, source, posted=False, date=None, post_date=None):
+        """Record a quote and its posting status"""
+        today = datetime.now().strftime('%Y-%m-%d')
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT INTO quotes (quote_hash, idea, canonical, source, posted, date, post_date) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (quote_key(idea), idea, canonicalize_quote(idea), source, int(bool(posted)),
+                 date or today, post_date or (today if posted else None))
+            )
+        with self._known_lock:
+            self._known.add(quote_key(idea))
+
+    def count(self):
+        """Total number of recorded quotes"""
+        return self._connect().execute('SELECT COUNT(*) FROM quotes').fetchone()[0]
+
+    def is_imported(self, path):
+        """Check whether a legacy file has already been imported"""
+        return self._connect().execute(
+            'SELECT 1 FROM imports WHERE path = ?', (os.path.abspath(path),)
+        ).fetchone() is not None
+
+    def _import_rows(self, path, rows):
+        """Insert legacy rows once per file, even with several importers racing"""
+        conn = self._connect()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            claimed = conn.execute(
+                'INSERT OR IGNORE INTO imports (path, imported_at) VALUES (?, ?)',
+                (os.path.abspath(path), datetime.now().isoformat())
+            ).rowcount
+            if not claimed:
+                return 0
+            records = [
+                (quote_key(idea), idea, canonicalize_quote(idea), source, int(_parse_posted(posted)),
+                 date or None, post_date or None)
+                for date, idea, source, posted, post_date in rows
+                if idea
+            ]
+            conn.executemany(
+                'INSERT INTO quotes (quote_hash, idea, canonical, source, posted, date, post_date) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                records
+            )
+            conn.execute('UPDATE imports SET rows = ? WHERE path = ?', (len(records), os.path.abspath(path)))
+        return len(records)
+
+    def import_csv(self, csv_path):
+        """One-time import of the legacy motivation_ideas.csv"""
+        if not os.path.exists(csv_path) or self.is_imported(csv_path):
+            return 0
+        with open(csv_path, 'r', newline='') as f:
+            reader = csv.reader(f)
+            next(reader, None)  # Skip header
+            rows = [(row + [''] * 5)[:5] for row in reader if row]
+        return self._import_rows(csv_path, rows)
+
+    def import_xlsx(self, xlsx_path):
+        """One-time import of the legacy motivation_ideas.xlsx"""
+        if not os.path.exists(xlsx_path) or self.is_imported(xlsx_path):
+            return 0
+        from openpyxl import load_workbook
+        workbook = load_workbook(xlsx_path, read_only=True)
+        try:
+            sheet = workbook.active
+            rows = [
+                tuple('' if value is None else str(value) for value in (list(row) + [None] * 5)[:5])
+                for row in sheet.iter_rows(min_row=2, values_only=True)
+            ]
+        finally:
+            workbook.close()
+        return self._import_rows(xlsx_path, rows)
@@ -0,0 +1,89 @@
+"""
+Render-ahead buffer for Motivation Bot
+A background thread keeps up to `capacity` rendered, deduplicated videos on
+disk so a posting slot only has to upload. The producer stops rendering while
+the buffer is full, so slow consumers never let it grow without limit.
+"""
+
+import threading
+from collections import deque
+
+class RenderAheadBuffer:
+    def __init__(self, produce, capacity=2, retry_delay=60):
+        """produce(exclude) -> (quote, video_path) or None; exclude holds the quotes already buffered"""
+        self.produce = produce
+        self.capacity = capacity
+        self.retry_delay = retry_delay
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._stopped = True
+        # True until the producer has decided to exit, which it only does holding _cond
+        self._producing = False
+        self._thread = None
+
+    def start(self):
+        """Start the producer thread, or keep a stopping one (still finishing a render) running"""
+        with self._cond:
+            self._stopped = False
+            if self._producing:
+                self._cond.notify_all()
+                return
+            self._producing = True
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop producing; a render already in progress is allowed to finish"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                # Backpressure: only start a render when there is room for it
+                self._cond.wait_for(lambda: self._stopped or len(self._items) < self.capacity)
+                if self._stopped:
+                    # Decided under the lock start() takes, so a restart never races an exit
+                    self._producing = False
+                    return
+                exclude = {quote for quote, _ in self._items}
+            try:
+                item = self.produce(exclude)
+            except Exception as e:
+                print(f"Render-ahead failed: {e}")
+                item = None
+            with self._cond:
+                if item:
+                    self._items.append(item)
+                    self._cond.notify_all()
+                else:
+                    # Nothing new to render (or an error): back off without spinning
+                    self._cond.wait_for(lambda: self._stopped, timeout=self.retry_delay)
+
+    def take(self, timeout=0):
+        """Oldest buffered (quote, video_path), waiting up to timeout seconds; None if empty"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items or self._stopped, timeout=timeout):
+                return None
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def quotes(self):
+        """Quotes currently buffered"""
+        with self._cond:
+            return {quote for quote, _ in self._items}
+
+    def video_paths(self):
+        """Videos currently buffered"""
+        with self._cond:
+            return {video_path for _, video_path in self._items}
+
+    def ready_count(self):
+        with self._cond:
+            return len(self._items)
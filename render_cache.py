@@ -0,0 +1,124 @@
+"""
+Render cache for Motivation Bot
+Maps a hash of the quote and every style parameter to a finished MP4, with
+LRU eviction by total size and hit/miss counters shared across processes.
+"""
+
+import os
+import json
+import time
+import hashlib
+
+from thumbnails import thumbnail_path
+from sqlite_store import SQLiteStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS renders (
+    key TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    render_seconds REAL NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_renders_last_used ON renders (last_used);
+CREATE TABLE IF NOT EXISTS stats (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    hits INTEGER NOT NULL DEFAULT 0,
+    misses INTEGER NOT NULL DEFAULT 0,
+    evictions INTEGER NOT NULL DEFAULT 0,
+    seconds_saved REAL NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO stats (id) VALUES (1);
+"""
+
+def render_key(quote, **params):
+    """Content address for a render: the quote plus every parameter that changes the output"""
+    payload = json.dumps({'quote': quote, **params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class RenderCache(SQLiteStore):
+    def __init__(self, folder, max_bytes=2 * 1024 ** 3, in_use=None):
+        """in_use() returns the video paths that must survive eviction (queued for posting)"""
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.in_use = in_use
+        super().__init__(os.path.join(folder, '.render_cache.db'))
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def lookup(self, key):
+        """Return the cached video path for key, or None on a miss"""
+        conn = self._connect()
+        with conn:
+            row = conn.execute('SELECT path, render_seconds FROM renders WHERE key = ?', (key,)).fetchone()
+            if row and os.path.exists(row[0]):
+                conn.execute('UPDATE renders SET last_used = ? WHERE key = ?', (time.time(), key))
+                conn.execute('UPDATE stats SET hits = hits + 1, seconds_saved = seconds_saved + ? WHERE id = 1',
+                             (row[1],))
+                return row[0]
+            if row:
+                # The file was deleted behind our back
+                conn.execute('DELETE FROM renders WHERE key = ?', (key,))
+            conn.execute('UPDATE stats SET misses = misses + 1 WHERE id = 1')
+        return None
+
+    def store(self, key, path, render_seconds=0.0):
+        """Record a finished render and evict least recently used ones over max_bytes"""
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO renders (key, path, size, render_seconds, created, last_used) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, path, os.path.getsize(path), render_seconds, now, now)
+            )
+        self.evict(keep=key)
+
+    def evict(self, keep=None):
+        """Delete least recently used renders until the cache fits in max_bytes, sparing those in use"""
+        conn = self._connect()
+        removed = []
+        in_use = self.in_use() if self.in_use else set()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM renders').fetchone()[0]
+            if total <= self.max_bytes:
+                return removed
+            for key, path, size in conn.execute(
+                'SELECT key, path, size FROM renders WHERE key != ? ORDER BY last_used', (keep or '',)
+            ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                if path in in_use:
+                    continue
+                conn.execute('DELETE FROM renders WHERE key = ?', (key,))
+                total -= size
+                removed.append(path)
+            conn.execute('UPDATE stats SET evictions = evictions + ? WHERE id = 1', (len(removed),))
+        for path in removed:
+            # The video, its poster and any profile saved next to it
+            base = os.path.splitext(path)[0]
+            for stale in (path, thumbnail_path(self.folder, path), base + '.pstats', base + '.speedscope.json'):
+                if os.path.exists(stale):
+                    os.remove(stale)
+        return removed
+
+    def stats(self):
+        """Hit/miss counters and current cache size"""
+        conn = self._connect()
+        hits, misses, evictions, seconds_saved = conn.execute(
+            'SELECT hits, misses, evictions, seconds_saved FROM stats WHERE id = 1'
+        ).fetchone()
+        entries, total_bytes = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM renders').fetchone()
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+            'evictions': evictions,
+            'seconds_saved': round(seconds_saved, 2),
+            'entries': entries,
+            'bytes': total_bytes,
+            'max_bytes': self.max_bytes
+        }
@@ -0,0 +1,114 @@
+"""
+Parallel batch rendering for Motivation Bot
+Renders videos in a process pool while quotes are still being fetched.
+"""
+
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from metrics import replay
+
+# Per-process renderer, created once by the pool initializer
+_worker_bot = None
+
+def _init_worker(settings):
+    """Create the MotivationBot used by this worker process"""
+    global _worker_bot
+    from motivation_bot import MotivationBot
+    _worker_bot = MotivationBot()
+    for name, value in settings.items():
+        setattr(_worker_bot, name, value)
+
+def _render_quote(quote):
+    """Render a single quote inside a worker process.
+
+    Returns the video path and the render's spans and counts: the worker's
+    own metrics registry is never scraped, so the parent replays them.
+    """
+    from metrics import recording
+    with recording() as events:
+        video_path = _worker_bot.create_video(quote)
+    return video_path, events
+
+class BatchRenderer:
+    # MotivationBot attributes copied into every worker process
+    WORKER_SETTINGS = ('videos_folder', 'music_folder', 'video_size', 'fps', 'duration',
+                       'font_path', 'font_size', 'still_encoding', 'render_cache_max_mb',
+                       'add_music', 'music_fade', 'codec', 'codec_preset', 'codec_crf', 'codec_command',
+                       'template', 'background_image')
+
+    def __init__(self, bot, max_workers=None):
+        self.bot = bot
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = None
+        self._settings = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        """Start the process pool on first use, and restart it when the bot's settings change"""
+        settings = {name: getattr(self.bot, name) for name in self.WORKER_SETTINGS}
+        with self._lock:
+            if self._executor is not None and settings != self._settings:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            if self._executor is None:
+                # Spawned, not forked: forking a process with running threads can deadlock the child
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(settings,)
+                )
+                self._settings = settings
+            return self._executor
+
+    def render_batch(self, quotes, on_result=None):
+        """Render one video per quote from the (possibly lazy) quotes iterable.
+
+        Each render is submitted as soon as its quote arrives, so the pool is
+        encoding earlier videos while later quotes are still being fetched.
+        Returns one result per video, in the order quotes arrived, with a
+        success flag. on_result(result) is called as each result is collected.
+        """
+        executor = self._get_executor()
+
+        pending = []
+        for index, quote in enumerate(quotes):
+            pending.append((index, quote, executor.submit(_render_quote, quote)))
+
+        results = []
+        for index, quote, future in pending:
+            video_path = None
+            error = None
+            try:
+                video_path, events = future.result()
+                replay(events)
+            except Exception as e:
+                error = f"Error rendering video: {e}"
+                if isinstance(e, BrokenProcessPool):
+                    self.shutdown()
+            if not video_path and not error:
+                error = 'Failed to generate video'
+
+            result = {
+                'index': index,
+                'quote': quote,
+                'video_path': video_path,
+                'success': bool(video_path),
+                'error': error
+            }
+            results.append(result)
+            if on_result:
+                on_result(result)
+
+        return results
+
+    def shutdown(self):
+        """Stop the worker processes; the pool is restarted on next use"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
@@ -0,0 +1,371 @@
+"""
+Posting scheduler for Motivation Bot
+Cron-like cadences with posting windows, a SQLite queue of posting slots that
+survives restarts, just-in-time renders ahead of each slot and immediate
+cancellation through a threading.Event. The clock is injectable for tests.
+"""
+
+import time
+from datetime import datetime, timedelta
+from metrics import job_context
+from sqlite_store import SQLiteStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS slots (
+    slot_time REAL PRIMARY KEY,
+    status TEXT NOT NULL DEFAULT 'pending',
+    quote TEXT,
+    video_path TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_slots_status ON slots (status, slot_time);
+"""
+
+# pending -> rendering -> ready -> posting -> posted | failed
+# skipped: the slot passed while the bot was down, or prepare/post raised SkipSlot
+# unknown: the process died mid-upload, or the post could not be verified;
+#          never retried, so never double-posted
+OPEN_STATUSES = ('pending', 'rendering', 'ready')
+
+class SkipSlot(Exception):
+    """Raised by prepare or post to give up on a slot without it counting as a failure"""
+
+def parse_field(field, low, high):
+    """One cron field ('*', '*/15', '1-5', '0,30', '9-17/2') as a sorted list"""
+    values = set()
+    for part in field.split(','):
+        step = 1
+        if '/' in part:
+            part, step_text = part.split('/', 1)
+            step = int(step_text)
+            if step < 1:
+                raise ValueError(f"Invalid cron step in {field!r}")
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = (int(value) for value in part.split('-', 1))
+        else:
+            start = end = int(part)
+        if start < low or end > high or start > end:
+            raise ValueError(f"Cron field {field!r} out of range {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return sorted(values)
+
+def parse_clock_time(text):
+    """'HH:MM' as minutes after midnight"""
+    hours, minutes = text.split(':')
+    return int(hours) * 60 + int(minutes)
+
+class Cadence:
+    """A five-field cron expression (minute hour day month weekday) plus optional posting windows"""
+
+    def __init__(self, cron='0 * * * *', windows=None):
+        fields = cron.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields, got {cron!r}")
+        self.cron = cron
+        self.minutes = parse_field(fields[0], 0, 59)
+        self.hours = parse_field(fields[1], 0, 23)
+        self.days = set(parse_field(fields[2], 1, 31))
+        self.months = set(parse_field(fields[3], 1, 12))
+        # Cron weekdays: 0 and 7 are Sunday
+        self.weekdays = {day % 7 for day in parse_field(fields[4], 0, 7)}
+        self.any_day = fields[2] == '*'
+        self.any_weekday = fields[4] == '*'
+        # [('08:00', '22:00')] -> minute ranges; a window may wrap past midnight
+        self.windows = [(parse_clock_time(start), parse_clock_time(end)) for start, end in windows or []]
+
+    def matches_day(self, day):
+        if day.month not in self.months:
+            return False
+        day_match = day.day in self.days
+        weekday_match = (day.weekday() + 1) % 7 in self.weekdays
+        # Standard cron: when both are restricted, either one may match
+        if self.any_day:
+            return weekday_match
+        if self.any_weekday:
+            return day_match
+        return day_match or weekday_match
+
+    def in_window(self, moment):
+        if not self.windows:
+            return True
+        minute = moment.hour * 60 + moment.minute
+        for start, end in self.windows:
+            if start <= end and start <= minute < end:
+                return True
+            if start > end and (minute >= start or minute < end):
+                return True
+        return False
+
+    def next_after(self, timestamp):
+        """First matching local time strictly after timestamp, or None within ~4 years"""
+        start = datetime.fromtimestamp(timestamp).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.date()
+        for _ in range(366 * 4):
+            if self.matches_day(day):
+                for hour in self.hours:
+                    for minute in self.minutes:
+                        moment = datetime(day.year, day.month, day.day, hour, minute)
+                        if moment >= start and self.in_window(moment):
+                            return moment.timestamp()
+            day += timedelta(days=1)
+        return None
+
+class SystemClock:
+    def now(self):
+        return time.time()
+
+    def wait(self, event, timeout):
+        """Sleep up to timeout seconds; returns True as soon as event is set"""
+        return event.wait(max(0.0, timeout))
+
+class FakeClock:
+    """Manual clock for tests: waiting advances time instantly"""
+
+    def __init__(self, start=0.0):
+        self.time = start
+        self.waits = []
+
+    def now(self):
+        return self.time
+
+    def advance(self, seconds):
+        self.time += seconds
+
+    def wait(self, event, timeout):
+        self.waits.append(timeout)
+        self.time += max(0.0, timeout)
+        return event.is_set()
+
+class SlotStore(SQLiteStore):
+    """SQLite queue of posting slots"""
+
+    def __init__(self, db_path):
+        super().__init__(db_path)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def add_slot(self, slot_time, now):
+        with self._connect() as conn:
+            conn.execute('INSERT OR IGNORE INTO slots (slot_time, updated) VALUES (?, ?)', (slot_time, now))
+
+    def last_slot_time(self):
+        return self._connect().execute('SELECT MAX(slot_time) FROM slots').fetchone()[0]
+
+    def open_count(self, after):
+        placeholders = ','.join('?' * len(OPEN_STATUSES))
+        return self._connect().execute(
+            f'SELECT COUNT(*) FROM slots WHERE slot_time > ? AND status IN ({placeholders})',
+            (after,) + OPEN_STATUSES
+        ).fetchone()[0]
+
+    def next_slot(self):
+        """The earliest slot still waiting to be rendered or posted, as a dict"""
+        placeholders = ','.join('?' * len(OPEN_STATUSES))
+        row = self._connect().execute(
+            f'SELECT slot_time, status, quote, video_path, attempts FROM slots '
+            f'WHERE status IN ({placeholders}) ORDER BY slot_time LIMIT 1',
+            OPEN_STATUSES
+        ).fetchone()
+        if not row:
+            return None
+        return dict(zip(('slot_time', 'status', 'quote', 'video_path', 'attempts'), row))
+
+    def claim(self, slot_time, from_status, to_status, now):
+        """Atomically move a slot between states; False if someone else got there first"""
+        conn = self._connect()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            cursor = conn.execute(
+                'UPDATE slots SET status = ?, updated = ? WHERE slot_time = ? AND status = ?',
+                (to_status, now, slot_time, from_status)
+            )
+            return cursor.rowcount == 1
+
+    def update(self, slot_time, now, **fields):
+        fields['updated'] = now
+        assignments = ', '.join(f'{name} = ?' for name in fields)
+        with self._connect() as conn:
+            conn.execute(f'UPDATE slots SET {assignments} WHERE slot_time = ?',
+                         list(fields.values()) + [slot_time])
+
+    def recover(self, now):
+        """After a restart: redo interrupted renders, never repeat an interrupted upload"""
+        with self._connect() as conn:
+            conn.execute("UPDATE slots SET status = 'pending', updated = ? WHERE status = 'rendering'", (now,))
+            conn.execute("UPDATE slots SET status = 'unknown', updated = ? WHERE status = 'posting'", (now,))
+
+    def skip_missed(self, before, now):
+        """Give up on slots that passed while the bot was not running"""
+        placeholders = ','.join('?' * len(OPEN_STATUSES))
+        with self._connect() as conn:
+            return conn.execute(
+                f"UPDATE slots SET status = 'skipped', updated = ? "
+                f"WHERE slot_time < ? AND status IN ({placeholders})",
+                (now, before) + OPEN_STATUSES
+            ).rowcount
+
+    def has_quote(self, quote):
+        """True if a slot already holds or posted this quote"""
+        return self._connect().execute(
+            "SELECT 1 FROM slots WHERE quote = ? AND status IN ('ready', 'posting', 'posted', 'unknown') LIMIT 1",
+            (quote,)
+        ).fetchone() is not None
+
+    def mark_unverified(self, video_path, now):
+        """A post that never showed up: 'unknown' rather than posted, and never uploaded again"""
+        with self._connect() as conn:
+            return conn.execute(
+                "UPDATE slots SET status = 'unknown', error = 'post could not be verified', updated = ? "
+                "WHERE video_path = ? AND status IN ('posting', 'posted')",
+                (now, video_path)
+            ).rowcount
+
+    def video_paths(self):
+        """Videos of slots that are ready or being posted"""
+        return {row[0] for row in self._connect().execute(
+            "SELECT video_path FROM slots WHERE status IN ('ready', 'posting') AND video_path IS NOT NULL"
+        )}
+
+    def posted_times(self, since):
+        """When each post since `since` went out (for rate limits)"""
+        return [row[0] for row in self._connect().execute(
+            "SELECT updated FROM slots WHERE status = 'posted' AND updated >= ? ORDER BY updated", (since,)
+        )]
+
+    def slots(self, statuses=None, limit=20):
+        query = 'SELECT slot_time, status, quote, video_path, attempts, error FROM slots'
+        params = []
+        if statuses:
+            query += f" WHERE status IN ({','.join('?' * len(statuses))})"
+            params.extend(statuses)
+        query += ' ORDER BY slot_time LIMIT ?'
+        rows = self._connect().execute(query, params + [limit]).fetchall()
+        return [dict(zip(('slot_time', 'status', 'quote', 'video_path', 'attempts', 'error'), row))
+                for row in rows]
+
+class PostScheduler:
+    def __init__(self, store, cadence, prepare, post, clock=None,
+                 lead_time=600, grace=900, horizon=3, max_attempts=3, retry_delay=60, max_wait=300):
+        """prepare(slot_time) -> (quote, video_path) or None; post(quote, video_path) -> bool
+
+        Renders start lead_time seconds before their slot. Slots more than
+        grace seconds in the past are skipped instead of posted late.
+        """
+        self.store = store
+        self.cadence = cadence
+        self.prepare = prepare
+        self.post = post
+        self.clock = clock or SystemClock()
+        self.lead_time = lead_time
+        self.grace = grace
+        self.horizon = horizon
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        # Re-check at least this often so wall-clock jumps (suspend, NTP) are noticed
+        self.max_wait = max_wait
+        # What the loop is doing right now, for status pages
+        self.stage = 'stopped'
+        self.last_error = None
+
+    def plan(self, now):
+        """Keep `horizon` future slots queued"""
+        missing = self.horizon - self.store.open_count(now)
+        last = max(self.store.last_slot_time() or now, now)
+        for _ in range(missing):
+            last = self.cadence.next_after(last)
+            if last is None:
+                break
+            self.store.add_slot(last, now)
+
+    def step(self):
+        """Do whatever is due now; returns seconds until something is due next"""
+        now = self.clock.now()
+        skipped = self.store.skip_missed(now - self.grace, now)
+        if skipped:
+            print(f"Skipped {skipped} posting slot(s) missed while the bot was stopped")
+        self.plan(now)
+
+        slot = self.store.next_slot()
+        if slot is None:
+            return self.max_wait
+        slot_time = slot['slot_time']
+
+        if slot['status'] == 'pending':
+            render_at = slot_time - self.lead_time
+            if now < render_at:
+                return render_at - now
+            if not self.store.claim(slot_time, 'pending', 'rendering', now):
+                return 0
+            self.stage = 'rendering'
+            try:
+                with job_context(f'slot-{int(slot_time)}'):
+                    prepared = self.prepare(slot_time)
+                error = None if prepared else 'nothing to post'
+            except SkipSlot as e:
+                return self.skip(slot_time, str(e))
+            except Exception as e:
+                prepared, error = None, str(e)
+            now = self.clock.now()
+            if prepared:
+                quote, video_path = prepared
+                self.store.update(slot_time, now, status='ready', quote=quote, video_path=video_path, error=None)
+                return 0
+            attempts = slot['attempts'] + 1
+            status = 'failed' if attempts >= self.max_attempts else 'pending'
+            self.last_error = error
+            print(f"Preparing slot {datetime.fromtimestamp(slot_time)} failed: {error}")
+            self.store.update(slot_time, now, status=status, attempts=attempts, error=error)
+            return 0 if status == 'failed' else self.retry_delay
+
+        if slot['status'] == 'ready':
+            if now < slot_time:
+                return slot_time - now
+            if not self.store.claim(slot_time, 'ready', 'posting', now):
+                return 0
+            self.stage = 'posting'
+            try:
+                with job_context(f'slot-{int(slot_time)}'):
+                    posted = self.post(slot['quote'], slot['video_path'])
+                error = None if posted else 'upload failed'
+            except SkipSlot as e:
+                return self.skip(slot_time, str(e))
+            except Exception as e:
+                posted, error = False, str(e)
+            if error:
+                self.last_error = error
+            # Only from 'posting': a failed verification may already have marked it unknown
+            if self.store.claim(slot_time, 'posting', 'posted' if posted else 'failed', self.clock.now()):
+                self.store.update(slot_time, self.clock.now(), error=error)
+            return 0
+
+        # Another worker is rendering this slot
+        return self.retry_delay
+
+    def skip(self, slot_time, reason):
+        """Give up on a slot that should not be posted, e.g. over a rate limit"""
+        print(f"Skipping slot {datetime.fromtimestamp(slot_time)}: {reason}")
+        self.store.update(slot_time, self.clock.now(), status='skipped', error=reason)
+        return 0
+
+    def run(self, stop_event):
+        """Serve slots until stop_event is set; returns immediately once it is"""
+        self.store.recover(self.clock.now())
+        try:
+            while not stop_event.is_set():
+                delay = self.step()
+                self.stage = 'waiting'
+                if delay > 0 and self.clock.wait(stop_event, min(delay, self.max_wait)):
+                    break
+        finally:
+            self.stage = 'stopped'
+
+    def upcoming(self, limit=5):
+        """Queued slots with readable times, for status pages"""
+        slots = self.store.slots(OPEN_STATUSES, limit)
+        for slot in slots:
+            slot['time'] = datetime.fromtimestamp(slot['slot_time']).isoformat(timespec='minutes')
+        return slots
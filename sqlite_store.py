@@ -0,0 +1,25 @@
+"""
+SQLite connection handling shared by Motivation Bot's stores
+One connection per thread, in WAL mode with synchronous=NORMAL.
+"""
+
+import sqlite3
+import threading
+
+class SQLiteStore:
+    """Base for the SQLite-backed stores (history, render cache, catalog, slots, lease)"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+
+    def _connect(self):
+        """Get this thread's connection (sqlite3 connections are not shareable)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            # WAL lets the web app and bot thread/process read while one writes
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
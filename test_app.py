@@ -81,6 +81,823 @@ def test_motivation_bot():
         print(f"❌ MotivationBot test failed: {e}")
         return False
 
+def test_still_video_encoding():
+    """Test the still-frame fast path produces a full-length video"""
+    print("\n🎬 Testing Still-Frame Encoding...")
+    
+    try:
+        import tempfile
+        import cv2
+        from motivation_bot import MotivationBot, find_ffmpeg
+        
+        if not find_ffmpeg():
+            print("⚠️  ffmpeg not found - still-frame encoding falls back to OpenCV")
+            return True
+        
+        bot = MotivationBot()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            bot.videos_folder = temp_dir
+            video_path = bot.create_video("Small steps every day add up to big results.")
+            if not video_path or not os.path.exists(video_path):
+                print("❌ Still-frame encoding did not produce a video")
+                return False
+            
+            capture = cv2.VideoCapture(video_path)
+            frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+            fps = capture.get(cv2.CAP_PROP_FPS)
+            capture.release()
+            
+            if frames == 240 and round(fps) == 24:
+                print("✅ Still-frame video has 240 frames at 24 fps")
+            else:
+                print(f"❌ Unexpected video shape: {frames} frames at {fps} fps")
+                return False
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Still-frame encoding test failed: {e}")
+        return False
+
+def test_codec_backends():
+    """Test every encoder backend writes the expected output"""
+    print("\n🎞️  Testing Codec Backends...")
+    
+    try:
+        import tempfile
+        import cv2
+        import numpy as np
+        from video_encoders import get_encoder, RawPipeEncoder, VideoEncoder, find_ffmpeg
+        
+        width, height, fps = 64, 96, 12
+        frames = [np.full((height, width, 3), i * 20, dtype=np.uint8) for i in range(fps)]
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            raw_path = os.path.join(temp_dir, 'frames.bgr24')
+            if not RawPipeEncoder().encode_frames(frames, raw_path, width, height, fps):
+                print("❌ Raw backend failed")
+                return False
+            if os.path.getsize(raw_path) != width * height * 3 * fps:
+                print("❌ Raw backend wrote the wrong number of bytes")
+                return False
+            print("✅ Raw backend writes bgr24 frames untouched")
+            
+            names = ['mp4v'] + (['x264'] if find_ffmpeg() else [])
+            for name in names:
+                encoder = get_encoder(name, preset='ultrafast', crf=30, still_gop=False)
+                video_path = os.path.join(temp_dir, f'{name}.mp4')
+                if not encoder.encode_frames(frames, video_path, width, height, fps):
+                    print(f"❌ {name} backend failed")
+                    return False
+                capture = cv2.VideoCapture(video_path)
+                count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+                capture.release()
+                if count != fps:
+                    print(f"❌ {name} backend wrote {count} frames instead of {fps}")
+                    return False
+                print(f"✅ {name} backend encodes {fps} frames")
+            
+            if find_ffmpeg():
+                # Raw frames piped into an external command that produces the file
+                command = [find_ffmpeg(), '-y', '-loglevel', 'error', '-f', 'rawvideo', '-pix_fmt', 'bgr24',
+                           '-s', '{width}x{height}', '-r', '{fps}', '-i', '-', '-c:v', 'libx264', '{output}']
+                piped_path = os.path.join(temp_dir, 'piped.mp4')
+                if not get_encoder('raw', command=command).encode_frames(frames, piped_path, width, height, fps) \
+                        or not os.path.exists(piped_path):
+                    print("❌ Raw pipe to an external command failed")
+                    return False
+                print("✅ Raw frames piped to an external command")
+        
+        try:
+            get_encoder('x264', preset='instant')
+            print("❌ Unknown preset accepted")
+            return False
+        except ValueError:
+            print("✅ Unknown presets are rejected")
+        
+        # A command that logs more than a pipe buffer to stderr must not deadlock the writer
+        import threading
+        chatty = [sys.executable, '-c',
+                  'import sys\n'
+                  'for chunk in iter(lambda: sys.stdin.buffer.read(65536), b""):\n'
+                  '    sys.stderr.write("x" * 65536)\n'
+                  'open(sys.argv[1], "wb").write(b"done")',
+                  '{output}']
+        with tempfile.TemporaryDirectory() as temp_dir:
+            chatty_path = os.path.join(temp_dir, 'chatty.out')
+            big_frames = [np.zeros((480, 640, 3), dtype=np.uint8)] * 8
+            outcome = []
+            worker = threading.Thread(target=lambda: outcome.append(
+                get_encoder('raw', command=chatty).encode_frames(big_frames, chatty_path, 640, 480, 8)), daemon=True)
+            worker.start()
+            worker.join(20)
+            if outcome != [True] or not os.path.exists(chatty_path):
+                print("❌ Raw pipe deadlocked on a command writing to stderr")
+                return False
+        print("✅ Raw pipe survives commands that log heavily to stderr")
+        
+        try:
+            VideoEncoder()
+            print("❌ The abstract encoder base could be instantiated")
+            return False
+        except TypeError:
+            pass
+        
+        # Raw frames dumped to disk are not a video: the bot must not catalog them as one
+        try:
+            get_encoder('raw')
+            print("❌ Raw codec accepted without a command")
+            return False
+        except ValueError:
+            pass
+        if RawPipeEncoder().available():
+            print("❌ Raw file sink reported itself available for renders")
+            return False
+        from motivation_bot import MotivationBot
+        bot = MotivationBot()
+        bot.codec = 'raw'
+        if bot.get_encoder().name != 'mp4v':
+            print("❌ Bot with a raw codec and no command did not fall back to OpenCV")
+            return False
+        print("✅ Raw codec without a command falls back to OpenCV")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Codec backend test failed: {e}")
+        return False
+
+def test_video_templates():
+    """Test animated templates composite into one buffer and render to video"""
+    print("\n🌈 Testing Video Templates...")
+    
+    try:
+        import tempfile
+        import cv2
+        import numpy as np
+        from motivation_bot import MotivationBot
+        from video_templates import TEMPLATES, TemplateRenderer
+        
+        quote = "Every sunrise is an invitation to begin again."
+        for name in TEMPLATES:
+            renderer = TemplateRenderer.from_template(name, quote, 216, 384, 12, 1, 'arial.ttf', 24)
+            buffers = {id(frame) for frame in renderer.frames()}
+            if buffers != {id(renderer.frame)}:
+                print(f"❌ {name} allocated new frames instead of reusing its buffer")
+                return False
+        print(f"✅ {len(TEMPLATES)} templates composite into a single preallocated buffer")
+        
+        reveal = TemplateRenderer.from_template('word_reveal', quote, 216, 384, 12, 1, 'arial.ttf', 24)
+        first = reveal.render_frame(0).copy()
+        last = reveal.render_frame(reveal.frame_count - 1).copy()
+        if not (first.max(axis=2) > 200).sum() < (last.max(axis=2) > 200).sum():
+            print("❌ Word reveal does not add words over time")
+            return False
+        print("✅ Word reveal shows more text as the video plays")
+        
+        gradient = TemplateRenderer.from_template('gradient', quote, 216, 384, 12, 1, 'arial.ttf', 24)
+        if np.array_equal(gradient.render_frame(0).copy(), gradient.render_frame(6)):
+            print("❌ Gradient background does not move")
+            return False
+        print("✅ Gradient background animates")
+        
+        bot = MotivationBot()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            bot.videos_folder = temp_dir
+            bot.video_size = (216, 384)
+            bot.fps = 12
+            bot.duration = 2
+            bot.template = 'ken_burns'
+            video_path = bot.create_video(quote)
+            if not video_path:
+                print("❌ Ken Burns video was not created")
+                return False
+            capture = cv2.VideoCapture(video_path)
+            frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+            capture.release()
+            if frames != 24:
+                print(f"❌ Ken Burns video has {frames} frames instead of 24")
+                return False
+            print("✅ create_video renders animated templates")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Video template test failed: {e}")
+        return False
+
+def test_frame_pipeline():
+    """Test the streaming pipeline keeps peak memory flat as videos get longer"""
+    print("\n🧵 Testing Frame Pipeline...")
+    
+    try:
+        import tracemalloc
+        from frame_pipeline import FramePipeline, fade
+        from video_encoders import RawPipeEncoder
+        from video_templates import TemplateRenderer
+        
+        width, height, fps = 540, 960, 24
+        frame_bytes = width * height * 3
+        
+        peaks = {}
+        for duration in (1, 5):
+            renderer = TemplateRenderer.from_template('gradient', "Keep going.", width, height,
+                                                      fps, duration, 'arial.ttf', 40)
+            tracemalloc.start()
+            pipeline = FramePipeline(renderer.render_into, width, height, renderer.frame_count,
+                                     effects=[fade(renderer.frame_count, 6)], buffers=3)
+            ok = RawPipeEncoder().encode_frames(pipeline.frames(), os.devnull, width, height, fps)
+            peaks[duration] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            if not ok:
+                print("❌ Pipeline encode failed")
+                return False
+        
+        print(f"✅ Peak traced memory: {peaks[1] / 2**20:.1f} MB for 1 s, {peaks[5] / 2**20:.1f} MB for 5 s")
+        if peaks[5] > peaks[1] * 1.2 or peaks[5] > 4 * frame_bytes:
+            print("❌ Peak memory grows with duration")
+            return False
+        print("✅ Memory bounded by the buffer pool, not the video length")
+        
+        seen = []
+        pipeline = FramePipeline(lambda index, out: out.fill(index), 4, 4, 10, buffers=2)
+        for frame in pipeline.frames():
+            seen.append(int(frame[0, 0, 0]))
+            if len(seen) == 5:
+                break
+        if seen != [0, 1, 2, 3, 4]:
+            print(f"❌ Frames out of order: {seen}")
+            return False
+        print("✅ Frames arrive in order and stopping early releases the producer")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Frame pipeline test failed: {e}")
+        return False
+
+def test_output_profiles():
+    """Test one create_video call renders every aspect from a shared layout"""
+    print("\n📐 Testing Output Profiles...")
+    
+    try:
+        import tempfile
+        import cv2
+        from motivation_bot import MotivationBot
+        
+        bot = MotivationBot()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            bot.videos_folder = temp_dir
+            bot.fps = 12
+            bot.duration = 1
+            manifest = bot.create_video("Consistency beats intensity when intensity quits.",
+                                        profiles=['reel', 'portrait', 'square', 'preview'])
+            if not manifest['success'] or len(manifest['outputs']) != 4:
+                print(f"❌ Profile render failed: {manifest}")
+                return False
+            
+            for output in manifest['outputs']:
+                capture = cv2.VideoCapture(output['path'])
+                size = (int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)), int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+                capture.release()
+                if size != (output['width'], output['height']):
+                    print(f"❌ {output['profile']} is {size}, expected {(output['width'], output['height'])}")
+                    return False
+            print("✅ Reel, 4:5, 1:1 and preview outputs have the right sizes")
+            
+            if len({output['path'] for output in manifest['outputs']}) != 4:
+                print("❌ Profiles overwrote each other")
+                return False
+            print("✅ Manifest lists one file per profile")
+            
+            again = bot.create_video("Consistency beats intensity when intensity quits.", profiles=['square'])
+            if again['outputs'][0]['path'] != manifest['outputs'][2]['path']:
+                print("❌ Repeated profile render was not served from the cache")
+                return False
+            print("✅ Repeated profiles are served from the render cache")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Output profile test failed: {e}")
+        return False
+
+def test_background_music():
+    """Test music is looped to length, muxed in and its encoded segment reused"""
+    print("\n🎵 Testing Background Music...")
+    
+    try:
+        import math
+        import wave
+        import struct
+        import tempfile
+        import subprocess
+        from motivation_bot import MotivationBot, find_ffmpeg
+        
+        ffmpeg = find_ffmpeg()
+        if not ffmpeg:
+            print("⚠️  ffmpeg not found - videos stay silent")
+            return True
+        
+        bot = MotivationBot()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            bot.videos_folder = os.path.join(temp_dir, 'videos')
+            bot.music_folder = os.path.join(temp_dir, 'music')
+            os.makedirs(bot.music_folder)
+            bot.duration = 3
+            
+            # One second of tone, shorter than the video so it has to loop
+            with wave.open(os.path.join(bot.music_folder, 'tone.wav'), 'wb') as track:
+                track.setnchannels(1)
+                track.setsampwidth(2)
+                track.setframerate(22050)
+                track.writeframes(b''.join(struct.pack('<h', int(8000 * math.sin(i / 10)))
+                                           for i in range(22050)))
+            
+            first = bot.create_video("Music makes the message stick.")
+            second = bot.create_video("Rhythm turns effort into habit.")
+            if not first or not second:
+                print("❌ Video with music was not created")
+                return False
+            
+            probe = subprocess.run([ffmpeg, '-i', first], capture_output=True, text=True).stderr
+            if 'Audio: aac' not in probe or 'Video: h264' not in probe:
+                print(f"❌ Expected H.264 video plus AAC audio, got: {probe}")
+                return False
+            print("✅ Music muxed as AAC next to the untouched H.264 stream")
+            
+            duration_line = next(line for line in probe.splitlines() if 'Duration:' in line)
+            hours, minutes, seconds = duration_line.split('Duration:')[1].split(',')[0].strip().split(':')
+            if abs(float(seconds) - bot.duration) > 0.2:
+                print(f"❌ Muxed video length is off: {duration_line.strip()}")
+                return False
+            print("✅ Short track looped to the video length")
+            
+            segments = os.listdir(os.path.join(bot.music_folder, '.audio_cache'))
+            if len(segments) != 1:
+                print(f"❌ Expected one cached audio segment, found {segments}")
+                return False
+            print("✅ Trimmed audio segment encoded once and reused")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Background music test failed: {e}")
+        return False
+
+def test_batch_rendering():
+    """Test the batch renderer returns ordered per-video results"""
+    print("\n🏭 Testing Batch Rendering...")
+    
+    try:
+        import tempfile
+        import metrics
+        from motivation_bot import MotivationBot
+        from render_pool import BatchRenderer
+        
+        quotes = [
+            "Start where you are.",
+            "Use what you have.",
+            "Do what you can."
+        ]
+        
+        rendered = metrics.REGISTRY.counter_value('motivation_bot_videos_rendered_total')
+        encodes = metrics.REGISTRY.histogram_count(metrics.SPAN_SECONDS, span='encode')
+        bot = MotivationBot()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            bot.videos_folder = temp_dir
+            renderer = BatchRenderer(bot, max_workers=2)
+            try:
+                results = renderer.render_batch(quotes)
+                # Workers are rebuilt when the bot's settings change
+                bot.fps = 12
+                bot.duration = 1
+                changed = renderer.render_batch(["Keep the settings in sync."])
+            finally:
+                renderer.shutdown()
+            
+            if [r['quote'] for r in results] != quotes:
+                print("❌ Batch results are out of order")
+                return False
+            
+            if not all(r['success'] and os.path.exists(r['video_path']) for r in results):
+                print(f"❌ Batch rendering failed: {[r['error'] for r in results]}")
+                return False
+            
+            print("✅ Batch rendered 3 videos in order")
+            
+            import cv2
+            capture = cv2.VideoCapture(changed[0]['video_path'] or '')
+            fps = capture.get(cv2.CAP_PROP_FPS)
+            capture.release()
+            if round(fps) != 12:
+                print(f"❌ Worker pool kept its old settings after they changed ({fps} fps)")
+                return False
+            print("✅ Worker pool picks up changed settings")
+        
+        # Worker processes have their own registries; their renders must reach this one
+        if (metrics.REGISTRY.counter_value('motivation_bot_videos_rendered_total') != rendered + 4
+                or metrics.REGISTRY.histogram_count(metrics.SPAN_SECONDS, span='encode') != encodes + 4):
+            print("❌ Pool renders are missing from the metrics registry")
+            return False
+        import app as web
+        body = web.app.test_client().get('/metrics').get_data(as_text=True)
+        if f'motivation_bot_videos_rendered_total {rendered + 4}' not in body:
+            print("❌ /metrics does not count the pool's renders")
+            return False
+        print("✅ /metrics counts renders done in the process pool")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Batch rendering test failed: {e}")
+        return False
+
+def start_ollama_stub(delay=0.0):
+    """Start a local HTTP server that mimics Ollama's /api/generate"""
+    import threading
+    import time
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    class OllamaStubHandler(BaseHTTPRequestHandler):
+        requests_served = 0
+        
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            time.sleep(delay)
+            OllamaStubHandler.requests_served += 1
+            payload = json.dumps({
+                'model': body.get('model'),
+                'response': f"Stub quote number {OllamaStubHandler.requests_served}.",
+                'done': True
+            }).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), OllamaStubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}", OllamaStubHandler
+
+def test_quote_client():
+    """Test the pooled Ollama client against a local stub server"""
+    print("\n💬 Testing Quote Client...")
+    
+    try:
+        import time
+        from quote_client import QuoteClient, FALLBACK_QUOTE
+        
+        server, url, handler = start_ollama_stub(delay=0.2)
+        client = QuoteClient(base_url=url, max_concurrency=4, prefetch_size=3)
+        try:
+            start = time.perf_counter()
+            quotes = client.generate_quotes(4)
+            elapsed = time.perf_counter() - start
+            if len(quotes) != 4 or not all(q.startswith("Stub quote") for q in quotes):
+                print(f"❌ Unexpected quotes: {quotes}")
+                return False
+            if elapsed > 0.6:
+                print(f"❌ Generations did not run concurrently ({elapsed:.2f}s)")
+                return False
+            print(f"✅ 4 concurrent generations took {elapsed:.2f}s")
+            
+            client.start_prefetch()
+            deadline = time.time() + 5
+            while client.prefetched_count() < 3 and time.time() < deadline:
+                time.sleep(0.05)
+            start = time.perf_counter()
+            quote = client.get_quote()
+            if not quote.startswith("Stub quote") or time.perf_counter() - start > 0.05:
+                print("❌ Prefetched quote was not served from the buffer")
+                return False
+            print("✅ Prefetch buffer serves quotes instantly")
+        finally:
+            client.close()
+            server.shutdown()
+        
+        # Unreachable server falls back quickly thanks to the connect timeout
+        offline = QuoteClient(base_url="http://127.0.0.1:9", connect_timeout=0.5)
+        if offline.generate_quote() != FALLBACK_QUOTE:
+            print("❌ Offline client did not fall back")
+            return False
+        offline.close()
+        print("✅ Unreachable Ollama falls back to the stock quote")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Quote client test failed: {e}")
+        return False
+
+def test_quote_batching():
+    """Test batched quote generation, its parsing and the per-quote fallback"""
+    print("\n📚 Testing Batched Quote Generation...")
+    
+    try:
+        import time
+        from benchmark import OllamaStub
+        from quote_client import QuoteClient, parse_quote_batch
+        
+        parsed = [
+            parse_quote_batch('{"quotes": ["Start where you are.", "Start where you are!", "Here is a quote: \\"Small steps still move you forward.\\""]}'),
+            parse_quote_batch('["Rest, then rise again."]'),
+            parse_quote_batch('{"items": [{"quote": "Doubt kills more dreams than failure."}]}'),
+        ]
+        expected = [
+            ["Start where you are.", "Small steps still move you forward."],
+            ["Rest, then rise again."],
+            ["Doubt kills more dreams than failure."],
+        ]
+        if parsed != expected:
+            print(f"❌ Batched answers parsed wrongly: {parsed}")
+            return False
+        print("✅ JSON answers parsed into clean, distinct quotes")
+        
+        with OllamaStub(latency=0.05) as stub:
+            client = QuoteClient(base_url=stub.url, batch_size=5, keep_alive='1h', options={'temperature': 0.9})
+            try:
+                quotes = client.generate_quotes(5)
+            finally:
+                client.close()
+            request = stub.requests[-1]
+            if len(stub.requests) != 1 or len(set(quotes)) != 5:
+                print(f"❌ Expected one request for 5 quotes, got {len(stub.requests)}: {quotes}")
+                return False
+            if (request.get('format') != 'json' or request.get('keep_alive') != '1h'
+                    or request['options'].get('temperature') != 0.9 or 'num_predict' not in request['options']):
+                print(f"❌ Batched request missing format/keep_alive/options: {request}")
+                return False
+            print("✅ Five quotes from one JSON-format request with keep_alive and options")
+        
+        # Each batch is handed out as soon as it parses, not after the last one
+        with OllamaStub(latency=0.05, per_quote=0.04) as stub:
+            client = QuoteClient(base_url=stub.url, batch_size=5)
+            try:
+                start = time.perf_counter()
+                arrivals = [time.perf_counter() - start for _ in client.iter_quotes(15)]
+            finally:
+                client.close()
+            if len(stub.requests) != 3 or len(arrivals) != 15 or arrivals[0] > arrivals[-1] * 0.6:
+                print(f"❌ First of 15 batched quotes took {arrivals[0]:.2f}s of {arrivals[-1]:.2f}s")
+                return False
+            print(f"✅ First of 15 batched quotes after {arrivals[0]:.2f}s, all after {arrivals[-1]:.2f}s")
+        
+        server, url, handler = start_ollama_stub()
+        client = QuoteClient(base_url=url, batch_size=5)
+        try:
+            quotes = client.generate_quotes(3)
+            if len(quotes) != 3 or not all(quote.startswith("Stub quote") for quote in quotes):
+                print(f"❌ Plain-text model did not fall back to per-quote calls: {quotes}")
+                return False
+            for _ in range(2):
+                client.generate_quotes(2)
+            if client.batch_size != 0:
+                print("❌ Batching stayed on for a model that never answers in JSON")
+                return False
+        finally:
+            client.close()
+            server.shutdown()
+        print("✅ Falls back to per-quote calls, and stops batching for models that ignore the format")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Batched quote test failed: {e}")
+        return False
+
+def test_quote_history():
+    """Test the SQLite quote history store"""
+    print("\n🗄️  Testing Quote History...")
+    
+    try:
+        import csv
+        import tempfile
+        import threading
+        from quote_history import QuoteHistory
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            csv_path = os.path.join(temp_dir, 'ideas.csv')
+            with open(csv_path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['Date', 'Idea', 'Source', 'Posted', 'Post_Date'])
+                writer.writerow(['2025-06-16', 'Keep going.', 'Ollama LLM', 'True', '2025-06-16'])
+                writer.writerow(['2025-06-16', 'Stay hungry.', 'Ollama LLM', 'False', ''])
+            
+            history = QuoteHistory(os.path.join(temp_dir, 'history.db'))
+            if history.import_csv(csv_path) != 2 or history.import_csv(csv_path) != 0:
+                print("❌ CSV import is not one-time")
+                return False
+            if not history.contains('Keep going.') or history.contains('Never give up.'):
+                print("❌ Dedup lookup returned the wrong answer")
+                return False
+            print("✅ Legacy CSV imported once and deduplicated")
+            
+            def writer_thread(n):
+                for i in range(25):
+                    history.add(f"Quote {n}-{i}", 'test')
+            
+            threads = [threading.Thread(target=writer_thread, args=(n,)) for n in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            
+            if history.count() != 102 or not history.contains('Quote 3-24'):
+                print(f"❌ Concurrent writes lost rows: {history.count()}")
+                return False
+            print("✅ Concurrent writers recorded all quotes")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Quote history test failed: {e}")
+        return False
+
+def test_quote_dedup():
+    """Test LLM boilerplate stripping and near-duplicate detection"""
+    print("\n🧹 Testing Quote Deduplication...")
+    
+    try:
+        import tempfile
+        from quote_dedup import canonicalize_quote
+        from quote_history import QuoteHistory
+        
+        raw = ("Here's a short, original motivational quote:\n\n"
+               "\"Believe in the fire that fuels your soul, not just the flame that flickers on the outside.\"\n\n"
+               "I hope you find it inspiring!")
+        canonical = canonicalize_quote(raw)
+        if canonical != "Believe in the fire that fuels your soul, not just the flame that flickers on the outside.":
+            print(f"❌ Unexpected canonical quote: {canonical!r}")
+            return False
+        print("✅ LLM preamble and sign-off stripped")
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            history = QuoteHistory(os.path.join(temp_dir, 'history.db'))
+            history.add(raw, 'Ollama LLM')
+            
+            variants = [
+                "Here is a short, original motivational quote:\n\n\"Believe in the fire that fuels your soul, not just the flame that flickers on the outside.\"",
+                "believe in the fire that fuels your soul - not just the flame that flickers outside!"
+            ]
+            if not all(history.contains(v) for v in variants):
+                print("❌ Near-duplicate quote was not detected")
+                return False
+            if history.contains("Discipline is choosing what you want most over what you want now."):
+                print("❌ Unrelated quote flagged as duplicate")
+                return False
+            print("✅ Reworded duplicates detected, new quotes allowed")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Quote dedup test failed: {e}")
+        return False
+
+def test_startup_budget(budget_seconds=1.0):
+    """Test that importing app stays offline, lazy and within a time budget"""
+    print("\n⏱️  Testing Startup Budget...")
+    
+    try:
+        import subprocess
+        
+        heavy_modules = ('cv2', 'numpy', 'PIL', 'nltk', 'instabot', 'bs4', 'requests', 'openpyxl')
+        check = "import app, sys; print(','.join(m for m in %r if m in sys.modules))" % (heavy_modules,)
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', check],
+            capture_output=True, text=True, timeout=60,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        if result.returncode != 0:
+            print(f"❌ import app failed: {result.stderr.strip().splitlines()[-1:]}")
+            return False
+        
+        loaded = result.stdout.strip()
+        if loaded:
+            print(f"❌ Heavy modules imported at startup: {loaded}")
+            return False
+        print("✅ No heavy or network-bound modules imported at startup")
+        
+        # -X importtime lines look like "import time: self [us] | cumulative | name"
+        cumulative_us = None
+        for line in result.stderr.splitlines():
+            parts = line.split('|')
+            if len(parts) == 3 and parts[2].strip() == 'app':
+                cumulative_us = int(parts[1])
+        if cumulative_us is None:
+            print("❌ Could not find app in -X importtime output")
+            return False
+        
+        seconds = cumulative_us / 1_000_000
+        if seconds > budget_seconds:
+            print(f"❌ import app took {seconds:.3f}s (budget {budget_seconds:.1f}s)")
+            return False
+        print(f"✅ import app took {seconds:.3f}s (budget {budget_seconds:.1f}s)")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Startup budget test failed: {e}")
+        return False
+
+def test_render_cache():
+    """Test render cache hits, counters and size-based eviction"""
+    print("\n🗃️  Testing Render Cache...")
+    
+    try:
+        import tempfile
+        from motivation_bot import MotivationBot
+        
+        bot = MotivationBot()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            bot.videos_folder = temp_dir
+            first = bot.create_video("Discipline beats motivation.")
+            second = bot.create_video("Discipline beats motivation.")
+            stats = bot.get_render_cache().stats()
+            if not first or first != second or stats['hits'] != 1 or stats['misses'] != 1:
+                print(f"❌ Repeated render was not served from the cache: {stats}")
+                return False
+            print("✅ Repeated render returned the cached file")
+            
+            # Shrink the budget so only the newest render fits
+            bot.get_render_cache().max_bytes = os.path.getsize(first) + 1
+            third = bot.create_video("Consistency compounds.")
+            if os.path.exists(first) or not os.path.exists(third):
+                print("❌ Least recently used render was not evicted")
+                return False
+            print("✅ Least recently used render evicted over the size budget")
+            
+            # A video waiting in a ready slot outlives the budget
+            from scheduler import SlotStore
+            store = SlotStore(os.path.join(temp_dir, 'schedule.db'))
+            store.add_slot(1, 0)
+            store.update(1, 0, status='ready', quote="Consistency compounds.", video_path=third)
+            bot.slot_stores.append(store)
+            fourth = bot.create_video("Small wins add up.")
+            if not os.path.exists(third) or not os.path.exists(fourth):
+                print("❌ Eviction deleted a video queued for posting")
+                return False
+            print("✅ Videos queued for posting are never evicted")
+            
+            # A file written by the OpenCV fallback is not cached under the x264 key
+            bot.codec = 'x264'
+            bot.codec_preset = 'veryfast'
+            from video_encoders import FFmpegEncoder
+            original = FFmpegEncoder.encode_still
+            FFmpegEncoder.encode_still = lambda self, *args: False
+            try:
+                fallback = bot.create_video("Fallbacks are not the real thing.")
+            finally:
+                FFmpegEncoder.encode_still = original
+            if not fallback or bot.create_video("Fallbacks are not the real thing.") == fallback:
+                print("❌ OpenCV fallback output was cached under the configured encoder's key")
+                return False
+            print("✅ Encoder fallbacks are not cached")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Render cache test failed: {e}")
+        return False
+
+def test_text_layout():
+    """Test that quotes are wrapped inside the frame and long ones shrink to fit"""
+    print("\n🔤 Testing Text Layout...")
+    
+    try:
+        from text_layout import layout_text, get_font
+        
+        if get_font('arial.ttf', 60) is not get_font('arial.ttf', 60):
+            print("❌ Fonts are not cached per (path, size)")
+            return False
+        
+        short = layout_text("Dream big. Start small. Act now.", 1080, 1920, 'arial.ttf', 60)
+        if short['font_size'] != 60:
+            print(f"❌ Short quote was shrunk to {short['font_size']}")
+            return False
+        
+        long_quote = ' '.join(["Believe in the fire that fuels your soul, not just the flame outside."] * 15)
+        layout = layout_text(long_quote, 1080, 1920, 'arial.ttf', 60)
+        top = layout['lines'][0][2]
+        bottom = layout['lines'][-1][2] + layout['line_height']
+        if layout['font_size'] >= 60 or top < 50 or bottom > 1920 - 50:
+            print(f"❌ Long quote overflows the frame ({top}..{bottom} at {layout['font_size']}px)")
+            return False
+        if any(x < 50 for _, x, _ in layout['lines']):
+            print("❌ A wrapped line is wider than the frame")
+            return False
+        print(f"✅ Long quote fitted at {layout['font_size']}px in {len(layout['lines'])} lines")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Text layout test failed: {e}")
+        return False
+
 def test_web_app():
     """Test the Flask web application"""
     print("\n🌐 Testing Web Application...")
@@ -111,6 +928,1012 @@ def test_web_app():
         print(f"❌ Web app test failed: {e}")
         return False
 
+def test_job_queue():
+    """Test that generation endpoints return a job id and stream progress"""
+    print("\n📋 Testing Job Queue...")
+    
+    try:
+        import tempfile
+        import app as web
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            original_folder = web.bot.videos_folder
+            web.bot.videos_folder = temp_dir
+            try:
+                with web.app.test_client() as client:
+                    response = client.post('/generate_video', json={'quote': 'Progress, not perfection.'})
+                    data = response.get_json()
+                    if response.status_code != 202 or not data.get('job_id'):
+                        print(f"❌ /generate_video did not queue a job: {data}")
+                        return False
+                    print("✅ /generate_video returned a job id immediately")
+                    
+                    events = client.get(f"/jobs/{data['job_id']}/events").get_data(as_text=True)
+                    updates = [json.loads(line[6:]) for line in events.splitlines() if line.startswith('data: ')]
+                    if not updates or updates[-1]['status'] != 'done':
+                        print(f"❌ Job did not finish: {updates[-1:] }")
+                        return False
+                    print(f"✅ Job streamed {len(updates)} progress events and finished")
+                    
+                    job = client.get(f"/jobs/{data['job_id']}").get_json()
+                    if not os.path.exists(job['result']['video_path']):
+                        print("❌ Finished job has no video")
+                        return False
+                    print("✅ /jobs/<id> reports the rendered video")
+                    
+                    if client.get('/jobs/missing').status_code != 404:
+                        print("❌ Unknown job id did not return 404")
+                        return False
+            finally:
+                web.bot.videos_folder = original_folder
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Job queue test failed: {e}")
+        return False
+
+def test_download_all_stream():
+    """Test that /download_all streams a valid stored-mode zip and honours filters"""
+    print("\n📦 Testing Streaming Zip Download...")
+    
+    try:
+        import io
+        import tempfile
+        import zipfile
+        import app as web
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            payloads = {'a.mp4': os.urandom(300000), 'b.mp4': os.urandom(1000), 'notes.txt': b'skip me'}
+            for name, payload in payloads.items():
+                with open(os.path.join(temp_dir, name), 'wb') as f:
+                    f.write(payload)
+            
+            original_folder = web.bot.videos_folder
+            web.bot.videos_folder = temp_dir
+            try:
+                with web.app.test_client() as client:
+                    response = client.get('/download_all')
+                    if not response.is_streamed:
+                        print("❌ /download_all response is not streamed")
+                        return False
+                    archive = zipfile.ZipFile(io.BytesIO(response.get_data()))
+                    if archive.testzip() is not None or sorted(archive.namelist()) != ['a.mp4', 'b.mp4']:
+                        print(f"❌ Unexpected archive contents: {archive.namelist()}")
+                        return False
+                    if any(info.compress_type != zipfile.ZIP_STORED for info in archive.infolist()):
+                        print("❌ Archive entries are compressed")
+                        return False
+                    if archive.read('a.mp4') != payloads['a.mp4']:
+                        print("❌ Archive data does not match the video")
+                        return False
+                    print("✅ Streamed stored-mode zip with all videos")
+                    
+                    response = client.get('/download_all?files=b.mp4')
+                    archive = zipfile.ZipFile(io.BytesIO(response.get_data()))
+                    if archive.namelist() != ['b.mp4']:
+                        print(f"❌ File filter ignored: {archive.namelist()}")
+                        return False
+                    print("✅ File filter limits the archive")
+            finally:
+                web.bot.videos_folder = original_folder
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Streaming zip test failed: {e}")
+        return False
+
+def test_video_catalog():
+    """Test catalog reconciliation, pagination and ETag handling for /get_videos"""
+    print("\n🗂️  Testing Video Catalog...")
+    
+    try:
+        import tempfile
+        import app as web
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for i in range(5):
+                with open(os.path.join(temp_dir, f'video_{i}.mp4'), 'wb') as f:
+                    f.write(b'\0' * (i + 1) * 1000)
+            
+            original_folder = web.bot.videos_folder
+            web.bot.videos_folder = temp_dir
+            try:
+                with web.app.test_client() as client:
+                    response = client.get('/get_videos?per_page=2&sort=size&order=desc')
+                    data = response.get_json()
+                    if data['total'] != 5 or [v['filename'] for v in data['videos']] != ['video_4.mp4', 'video_3.mp4']:
+                        print(f"❌ Unexpected first page: {data}")
+                        return False
+                    print("✅ Existing files reconciled and paginated")
+                    
+                    etag = response.headers.get('ETag')
+                    cached = client.get('/get_videos?per_page=2&sort=size&order=desc',
+                                        headers={'If-None-Match': etag})
+                    if cached.status_code != 304:
+                        print(f"❌ Unchanged list returned {cached.status_code} instead of 304")
+                        return False
+                    print("✅ Unchanged list returns 304 Not Modified")
+
+                    catalog = web.bot.get_video_catalog()
+                    writes = catalog._connect().total_changes
+                    for name in ('other.db', 'other.db-wal', 'render.mp4.part'):
+                        with open(os.path.join(temp_dir, name), 'wb') as f:
+                            f.write(b'\0')
+                    if catalog.reconcile() or catalog._connect().total_changes != writes:
+                        print("❌ Non-video files in the folder triggered a rescan")
+                        return False
+                    print("✅ Databases and partial renders don't trigger a rescan")
+
+                    os.remove(os.path.join(temp_dir, 'video_4.mp4'))
+                    changed = client.get('/get_videos?per_page=2&sort=size&order=desc',
+                                         headers={'If-None-Match': etag})
+                    if changed.status_code != 200 or changed.get_json()['total'] != 4:
+                        print("❌ Deleted file still listed")
+                        return False
+                    print("✅ Deleted files drop out of the catalog")
+            finally:
+                web.bot.videos_folder = original_folder
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Video catalog test failed: {e}")
+        return False
+
+def test_video_serving():
+    """Test Range requests, conditional responses and lazy thumbnails"""
+    print("\n🎞️  Testing Video Serving...")
+    
+    try:
+        import tempfile
+        import cv2
+        import numpy as np
+        import app as web
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            filename = 'motivation_test.mp4'
+            writer = cv2.VideoWriter(os.path.join(temp_dir, filename),
+                                     cv2.VideoWriter_fourcc(*'mp4v'), 24, (108, 192))
+            for _ in range(24):
+                writer.write(np.full((192, 108, 3), 128, dtype=np.uint8))
+            writer.release()
+            size = os.path.getsize(os.path.join(temp_dir, filename))
+            
+            original_folder = web.bot.videos_folder
+            web.bot.videos_folder = temp_dir
+            try:
+                with web.app.test_client() as client:
+                    partial = client.get(f'/video/{filename}', headers={'Range': 'bytes=0-99'})
+                    if (partial.status_code != 206 or len(partial.data) != 100
+                            or partial.headers.get('Content-Range') != f'bytes 0-99/{size}'):
+                        print(f"❌ Range request returned {partial.status_code} {partial.headers.get('Content-Range')}")
+                        return False
+                    print("✅ Range requests return 206 Partial Content")
+                    
+                    etag = partial.headers.get('ETag')
+                    cached = client.get(f'/video/{filename}', headers={'If-None-Match': etag})
+                    if cached.status_code != 304:
+                        print(f"❌ Conditional request returned {cached.status_code} instead of 304")
+                        return False
+                    print("✅ Unchanged video returns 304 Not Modified")
+                    
+                    thumbnail = client.get(f'/thumbnail/{filename}')
+                    if thumbnail.status_code != 200 or not thumbnail.data.startswith(b'\xff\xd8'):
+                        print(f"❌ Thumbnail request returned {thumbnail.status_code}")
+                        return False
+                    if not os.path.exists(os.path.join(temp_dir, 'thumbnails', 'motivation_test.jpg')):
+                        print("❌ Thumbnail was not cached on disk")
+                        return False
+                    print("✅ Missing thumbnails are extracted once and cached")
+                    
+                    if client.get('/video/../app.py').status_code != 404:
+                        print("❌ Path traversal was not rejected")
+                        return False
+                    print("✅ Unknown paths return 404")
+            finally:
+                web.bot.videos_folder = original_folder
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Video serving test failed: {e}")
+        return False
+
+def test_scheduler():
+    """Test cron cadences, just-in-time renders, cancellation and restart safety"""
+    print("\n📅 Testing Scheduler...")
+    
+    import time
+    import tempfile
+    import threading
+    from scheduler import Cadence, PostScheduler, SlotStore, FakeClock
+    
+    start = datetime(2026, 3, 2, 7, 30).timestamp()  # a Monday
+    windowed = Cadence('0 * * * *', windows=[('08:00', '10:00')])
+    times = []
+    moment = start
+    for _ in range(3):
+        moment = windowed.next_after(moment)
+        times.append(datetime.fromtimestamp(moment).strftime('%a %H:%M'))
+    assert times == ['Mon 08:00', 'Mon 09:00', 'Tue 08:00'], f"Windowed cadence produced {times}"
+    weekly = datetime.fromtimestamp(Cadence('30 18 * * 5').next_after(start))
+    assert weekly.strftime('%a %H:%M') == 'Fri 18:30', f"Weekly cadence produced {weekly}"
+    print("✅ Cron cadences respect posting windows")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = SlotStore(os.path.join(temp_dir, 'schedule.db'))
+        clock = FakeClock(start)
+        stop = threading.Event()
+        prepared = []
+        posted = []
+        
+        def prepare(slot_time):
+            prepared.append(slot_time - clock.now())
+            return f"quote {len(prepared)}", f"video_{len(prepared)}.mp4"
+        
+        def post(quote, video_path):
+            posted.append((quote, clock.now()))
+            if len(posted) == 2:
+                stop.set()
+            return True
+        
+        scheduler = PostScheduler(store, Cadence('0 9,18 * * *'), prepare, post, clock=clock, lead_time=600)
+        scheduler.run(stop)
+        slot_times = [datetime.fromtimestamp(t).strftime('%H:%M') for _, t in posted]
+        assert slot_times == ['09:00', '18:00'] and all(lead <= 600 for lead in prepared), \
+            f"Posted at {slot_times}, rendered {prepared} s ahead"
+        print("✅ Videos rendered just in time and posted on their slots")
+        
+        # Simulate a crash in the middle of the next upload
+        next_slot = store.next_slot()
+        while next_slot['status'] != 'ready':
+            clock.advance(scheduler.step())
+            next_slot = store.next_slot()
+        store.claim(next_slot['slot_time'], 'ready', 'posting', clock.now())
+        clock.advance(next_slot['slot_time'] - clock.now())
+        
+        before = len(posted)
+        restart_stop = threading.Event()
+        
+        def post_and_stop(quote, video_path):
+            restart_stop.set()
+            return post(quote, video_path)
+        
+        restarted = PostScheduler(store, Cadence('0 9,18 * * *'), prepare, post_and_stop,
+                                  clock=clock, lead_time=600)
+        restarted.run(restart_stop)
+        statuses = {slot['slot_time']: slot['status'] for slot in store.slots(limit=100)}
+        assert statuses[next_slot['slot_time']] == 'unknown' and posted[before][0] != next_slot['quote'], \
+            "Interrupted upload was posted again after the restart"
+        print("✅ Restart resumes the queue without double-posting")
+        
+        # A real clock an hour away from the next slot must still stop at once
+        live = PostScheduler(SlotStore(os.path.join(temp_dir, 'live.db')), Cadence('0 * * * *'),
+                             prepare, post, lead_time=0)
+        live_stop = threading.Event()
+        thread = threading.Thread(target=live.run, args=(live_stop,))
+        thread.start()
+        time.sleep(0.2)
+        stopped_at = time.perf_counter()
+        live_stop.set()
+        thread.join(timeout=5)
+        assert not thread.is_alive() and time.perf_counter() - stopped_at <= 1, \
+            "Stopping the scheduler did not interrupt its wait"
+        print("✅ Stop event cancels the wait immediately")
+    
+    return True
+
+def test_render_ahead():
+    """Test the render-ahead buffer stays bounded and keeps slots upload-only"""
+    print("\n📦 Testing Render-Ahead Pipeline...")
+    
+    import time
+    import tempfile
+    import threading
+    from render_ahead import RenderAheadBuffer
+    from scheduler import Cadence, PostScheduler, SlotStore, FakeClock
+    
+    calls = []
+    
+    def produce(exclude):
+        time.sleep(0.05)  # a slow Ollama call plus encode
+        quote = next(q for q in ('alpha', 'beta', 'gamma', 'delta', 'epsilon') if q not in exclude and q not in uploaded)
+        calls.append(quote)
+        return quote, f'{quote}.mp4'
+    
+    class FakeUploader:
+        def __init__(self):
+            self.uploads = []
+        
+        def upload(self, quote, video_path):
+            self.uploads.append(video_path)
+            uploaded.add(quote)
+            return True
+    
+    uploaded = set()
+    buffer = RenderAheadBuffer(produce, capacity=2, retry_delay=0.1)
+    buffer.start()
+    try:
+        deadline = time.time() + 5
+        while buffer.ready_count() < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.2)
+        assert len(calls) == 2 and len(buffer.quotes()) == 2, f"Buffer grew past its capacity: {calls}"
+        print("✅ Producer pauses while the buffer is full")
+        
+        uploader = FakeUploader()
+        prepare_times = []
+        
+        def prepare(slot_time):
+            started = time.perf_counter()
+            item = buffer.take()
+            prepare_times.append(time.perf_counter() - started)
+            return item
+        
+        stop = threading.Event()
+        
+        def post(quote, video_path):
+            uploader.upload(quote, video_path)
+            if len(uploader.uploads) == 2:
+                stop.set()
+            return True
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            clock = FakeClock(datetime(2026, 3, 2, 8, 0).timestamp())
+            scheduler = PostScheduler(SlotStore(os.path.join(temp_dir, 'schedule.db')),
+                                      Cadence('0 9,18 * * *'), prepare, post, clock=clock, lead_time=60)
+            scheduler.run(stop)
+        
+        assert uploader.uploads == ['alpha.mp4', 'beta.mp4'] and max(prepare_times) <= 0.02, \
+            f"Slots waited on rendering: {uploader.uploads}, {prepare_times}"
+        print("✅ Posting slots only upload videos that were already rendered")
+        
+        deadline = time.time() + 5
+        while buffer.ready_count() < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert not buffer.quotes() & uploaded, "Refilled buffer repeats posted quotes"
+        print("✅ Buffer refills with new quotes after uploads")
+    finally:
+        buffer.stop(timeout=5)
+    
+    # /stop_bot then /start_bot while a render is still in flight
+    rendering = threading.Event()
+    release = threading.Event()
+    renders = []
+    
+    def slow_produce(exclude):
+        renders.append(len(renders))
+        rendering.set()
+        release.wait(5)
+        return f'quote {len(renders)}', f'video_{len(renders)}.mp4'
+    
+    restarted = RenderAheadBuffer(slow_produce, capacity=2, retry_delay=0.1)
+    restarted.start()
+    try:
+        rendering.wait(5)
+        restarted.stop(timeout=0.05)
+        restarted.start()
+        release.set()
+        deadline = time.time() + 5
+        while restarted.ready_count() < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert restarted.ready_count() == 2 and restarted._thread.is_alive(), \
+            f"Buffer died after a restart during a render: {restarted.ready_count()} ready"
+        print("✅ Restarting during a render keeps the producer running")
+    finally:
+        restarted.stop(timeout=5)
+    
+    # Buffered videos are re-checked when a slot takes them
+    from motivation_bot import MotivationBot
+    from quote_history import QuoteHistory
+    with tempfile.TemporaryDirectory() as temp_dir:
+        bot = MotivationBot()
+        bot.history = QuoteHistory(os.path.join(temp_dir, 'history.db'))
+        bot.schedule_db = os.path.join(temp_dir, 'schedule.db')
+        paths = {}
+        for name in ('posted', 'fresh', 'rendered'):
+            paths[name] = os.path.join(temp_dir, f'{name}.mp4')
+            with open(paths[name], 'wb') as f:
+                f.write(b'\0')
+        bot.history.add("Already posted while this waited.", 'Ollama LLM', True)
+        bot.render_next = lambda exclude=(): ("Rendered on demand.", paths['rendered'])
+        stale = bot.get_render_ahead()
+        stale._items.extend([
+            ("Already posted while this waited.", paths['posted']),
+            ("Its file was deleted.", os.path.join(temp_dir, 'missing.mp4')),
+        ])
+        assert bot.prepare_post(0) == ("Rendered on demand.", paths['rendered']) and not stale.ready_count(), \
+            "A stale pre-rendered video was handed to a slot"
+        stale._items.append(("Still fresh.", paths['fresh']))
+        assert bot.prepare_post(0) == ("Still fresh.", paths['fresh']), "A valid pre-rendered video was discarded"
+        print("✅ Posted quotes and deleted files are dropped from the buffer")
+    
+    return True
+
+def test_uploader():
+    """Test upload retries, session reuse and background verification against a fake server"""
+    print("\n📤 Testing Upload Client...")
+    
+    try:
+        import time
+        import random
+        import tempfile
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from uploader import HttpUploader, UploadClient
+        
+        state = {'logins': 0, 'uploads': 0, 'polls': 0}
+        
+        class FakeInstagram(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+            
+            def reply(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if self.path == '/login':
+                    state['logins'] += 1
+                    return self.reply(200, {'token': 'token-1'})
+                if self.headers.get('Authorization') != 'Bearer token-1':
+                    return self.reply(401, {})
+                state['uploads'] += 1
+                if state['uploads'] == 1:
+                    return self.reply(503, {})  # the first upload hits a server hiccup
+                self.reply(200, {'media_id': f"m{state['uploads']}"})
+            
+            def do_GET(self):
+                state['polls'] += 1
+                # Instagram takes a moment before the post shows as published
+                self.reply(200, {'status': 'published' if state['polls'] >= 2 else 'processing'})
+        
+        server = ThreadingHTTPServer(('127.0.0.1', 0), FakeInstagram)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f'http://127.0.0.1:{server.server_address[1]}'
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            video_path = os.path.join(temp_dir, 'clip.mp4')
+            with open(video_path, 'wb') as f:
+                f.write(b'\0' * 1024)
+            session_file = os.path.join(temp_dir, 'session.json')
+            sleeps = []
+            verified = []
+            
+            def sleep(seconds):
+                sleeps.append((threading.current_thread().name, seconds))
+            
+            client = UploadClient(HttpUploader(base_url, 'user', 'pass', session_file),
+                                  base_delay=2.0, verify_delays=(1, 1, 1), sleep=sleep,
+                                  rng=random.Random(7))
+            try:
+                media_id = client.upload(video_path, 'caption', on_verified=lambda m, ok: verified.append((m, ok)))
+                retry_sleeps = [seconds for name, seconds in sleeps if not name.startswith('verify')]
+                if media_id != 'm2' or len(retry_sleeps) != 1 or not 0 <= retry_sleeps[0] <= 2.0:
+                    print(f"❌ Transient failure was not retried with jittered backoff: {media_id}, {retry_sleeps}")
+                    return False
+                print(f"✅ 503 retried after a {retry_sleeps[0]:.2f} s jittered backoff")
+                
+                if client.last_verification.result(timeout=10) is not True or verified != [('m2', True)]:
+                    print(f"❌ Background verification did not finish: {verified}")
+                    return False
+                print("✅ Post verified in the background instead of a fixed sleep")
+                
+                client.upload(video_path, 'caption')
+                client.last_verification.result(timeout=10)
+            finally:
+                client.close()
+            
+            # A fresh process reuses the stored session instead of logging in again
+            HttpUploader(base_url, 'user', 'pass', session_file).upload(video_path, 'caption')
+            if state['logins'] != 1:
+                print(f"❌ Session was not reused: {state['logins']} logins")
+                return False
+            print("✅ One login shared by every upload, including after a restart")
+            
+            # Verification polls share the session, so they wait for an upload in flight
+            class SessionUploader:
+                def __init__(self, published):
+                    self.published = published
+                    self.busy = False
+                    self.overlaps = 0
+                
+                def upload(self, video_path, caption):
+                    self.busy = True
+                    time.sleep(0.1)
+                    self.busy = False
+                    return 'm1'
+                
+                def verify(self, media_id):
+                    self.overlaps += self.busy
+                    return self.published
+            
+            session = SessionUploader(published=False)
+            client = UploadClient(session, verify_delays=(0.005,) * 40)
+            try:
+                client.upload(video_path, 'caption')
+                client.upload(video_path, 'caption')
+                client.last_verification.result(timeout=10)
+            finally:
+                client.close()
+            if session.overlaps:
+                print(f"❌ Verification used the session during an upload {session.overlaps} times")
+                return False
+            print("✅ Verification and uploads take turns on the session")
+            
+            # A post that never shows up leaves its slot 'unknown', not 'posted'
+            from motivation_bot import MotivationBot
+            from quote_history import QuoteHistory
+            from scheduler import FakeClock
+            bot = MotivationBot()
+            bot.schedule_db = os.path.join(temp_dir, 'schedule.db')
+            bot.history = QuoteHistory(os.path.join(temp_dir, 'history.db'))
+            bot.csv_file = os.path.join(temp_dir, 'ideas.csv')
+            bot.upload_client = UploadClient(SessionUploader(published=False), verify_delays=(0,), sleep=lambda s: None)
+            slot_time = datetime(2026, 3, 2, 9, 0).timestamp()
+            scheduler = bot.get_scheduler(FakeClock(slot_time))
+            scheduler.store.add_slot(slot_time, slot_time)
+            scheduler.store.update(slot_time, slot_time, status='ready', quote="Verify, then trust.", video_path=video_path)
+            scheduler.step()
+            bot.upload_client.last_verification.result(timeout=5)
+            bot.upload_client.close()
+            slot = {entry['slot_time']: entry for entry in scheduler.store.slots(limit=10)}[slot_time]
+            if slot['status'] != 'unknown' or 'verified' not in (slot['error'] or ''):
+                print(f"❌ Unverified post left its slot as {slot['status']}")
+                return False
+            print("✅ Failed verification marks the slot unknown")
+        
+        server.shutdown()
+        server.server_close()
+        return True
+        
+    except Exception as e:
+        print(f"❌ Upload client test failed: {e}")
+        return False
+
+def test_multi_account():
+    """Test per-account isolation, rate limits and the shared render pool"""
+    print("\n👥 Testing Multi-Account Posting...")
+    
+    try:
+        import time
+        import tempfile
+        import threading
+        from accounts import AccountManager, load_accounts
+        from scheduler import FakeClock
+        
+        class FakeBot:
+            def __init__(self, folder):
+                self.folder = folder
+                self.slot_stores = []
+                self.render_threads = set()
+                self.renders = 0
+            
+            def create_video(self, quote):
+                self.renders += 1
+                self.render_threads.add(threading.current_thread().name)
+                path = os.path.join(self.folder, f'{abs(hash(quote))}.mp4')
+                with open(path, 'wb') as f:
+                    f.write(b'\0')
+                return path
+        
+        class FakeUploadClient:
+            def __init__(self):
+                self.captions = []
+            
+            def upload(self, video_path, caption, on_verified=None):
+                self.captions.append(caption)
+                return f'media{len(self.captions)}'
+        
+        try:
+            load_accounts({'accounts': [{'name': 'a', 'username': 'u', 'password': 'p'},
+                                        {'name': 'a', 'username': 'v', 'password': 'p'}]})
+            print("❌ Duplicate account names were accepted")
+            return False
+        except ValueError:
+            pass
+        if [account['name'] for account in load_accounts({'instagram': {'username': 'u', 'password': 'p'}})] != ['default']:
+            print("❌ Legacy instagram config was not turned into an account")
+            return False
+        print("✅ Account config validated; legacy config becomes one account")
+        
+        words = ['courage', 'patience', 'discipline', 'kindness', 'focus', 'gratitude', 'effort', 'curiosity']
+        quotes = iter(f'{a} grows wherever {b} is practiced daily' for a in words for b in words if a != b)
+        accounts = load_accounts({'accounts': [
+            {'name': 'fitness', 'username': 'fit', 'password': 'p', 'hashtags': '#fitness', 'max_posts_per_day': 1},
+            {'name': 'business', 'username': 'biz', 'password': 'p', 'hashtags': '#business'},
+        ]})
+        uploaders = {}
+        
+        def uploader_factory(account):
+            uploaders[account['name']] = FakeUploadClient()
+            return uploaders[account['name']]
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            bot = FakeBot(temp_dir)
+            clock = FakeClock(1_700_000_000)
+            manager = AccountManager(bot, accounts, render_workers=2, quote_source=lambda: next(quotes),
+                                     uploader_factory=uploader_factory, clock=clock,
+                                     folder=os.path.join(temp_dir, 'accounts'))
+            try:
+                fitness, business = manager.workers['fitness'], manager.workers['business']
+                for name in ('fitness', 'business'):
+                    for filename in ('history.db', 'schedule.db'):
+                        if not os.path.exists(os.path.join(temp_dir, 'accounts', name, filename)):
+                            print(f"❌ {name} has no {filename} of its own")
+                            return False
+                
+                for worker in (fitness, business):
+                    quote, video_path = worker.prepare(0)
+                    if not worker.publish(quote, video_path):
+                        print(f"❌ {worker.name} could not post")
+                        return False
+                if fitness.history.count() != 1 or business.history.count() != 1:
+                    print("❌ Quote histories are not kept per account")
+                    return False
+                if '#fitness' not in uploaders['fitness'].captions[0] or '#business' not in uploaders['business'].captions[0]:
+                    print("❌ Captions did not use each account's hashtags")
+                    return False
+                if not all(name.startswith('render') for name in bot.render_threads):
+                    print(f"❌ Renders did not use the shared pool: {bot.render_threads}")
+                    return False
+                print("✅ Separate history, schedule and uploader per account; renders on the shared pool")
+                
+                # Over the daily limit the slot is skipped before anything is rendered
+                renders = bot.renders
+                fitness.scheduler.plan(clock.now())
+                slot = fitness.store.next_slot()
+                for _ in range(20):
+                    if fitness.store.next_slot()['slot_time'] != slot['slot_time']:
+                        break
+                    clock.advance(fitness.scheduler.step())
+                skipped = {entry['slot_time']: entry for entry in fitness.store.slots(limit=100)}[slot['slot_time']]
+                if skipped['status'] != 'skipped' or not skipped['error'].startswith('rate limited'):
+                    print(f"❌ Rate-limited slot was not skipped: {skipped}")
+                    return False
+                if bot.renders != renders or skipped['attempts'] != 0:
+                    print("❌ Rate-limited slot was rendered or counted as a failed attempt")
+                    return False
+                if len(uploaders['fitness'].captions) != 1 or not business.publish(*business.prepare(clock.now())):
+                    print("❌ Rate limit leaked between accounts")
+                    return False
+                print("✅ Rate limits apply per account and skip slots before rendering")
+            finally:
+                manager.close()
+            
+            # Real clocks: both account threads start and stop promptly
+            manager = AccountManager(bot, accounts, quote_source=lambda: next(quotes),
+                                     uploader_factory=uploader_factory, folder=os.path.join(temp_dir, 'accounts'))
+            manager.start()
+            started = time.perf_counter()
+            manager.close()
+            if any(worker.thread.is_alive() for worker in manager.workers.values()) or time.perf_counter() - started > 5:
+                print("❌ Account threads did not stop")
+                return False
+            print("✅ Account threads stop together")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Multi-account test failed: {e}")
+        return False
+
+def test_bot_controller():
+    """Test the controller starts one loop, elects one leader and reports its state"""
+    print("\n🎛️  Testing Bot Controller...")
+    
+    import time
+    import tempfile
+    import threading
+    from bot_controller import BotController, LeaderLease
+    
+    class FakeBot:
+        active = 0
+        peak = 0
+        runs = 0
+        lock = threading.Lock()
+        
+        def load_config(self):
+            return {'instagram': {'username': 'user', 'password': 'pass'}}
+        
+        def run(self, stop_event):
+            with FakeBot.lock:
+                FakeBot.runs += 1
+                FakeBot.active += 1
+                FakeBot.peak = max(FakeBot.peak, FakeBot.active)
+            try:
+                stop_event.wait()
+            finally:
+                with FakeBot.lock:
+                    FakeBot.active -= 1
+        
+        def status(self):
+            return {'stage': 'waiting', 'queue_depth': 3, 'next_post': '2026-03-02T09:00', 'last_error': None}
+    
+    def wait_for(condition, timeout=5):
+        deadline = time.time() + timeout
+        while not condition() and time.time() < deadline:
+            time.sleep(0.01)
+        return condition()
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        lease_path = os.path.join(temp_dir, 'lease.db')
+        lease = LeaderLease(lease_path, ttl=10)
+        assert lease.acquire('a', 100) and not lease.acquire('b', 105) and lease.acquire('b', 111), \
+            "Lease was shared or never expired"
+        print("✅ Lease has one holder and passes on after it expires")
+        
+        # Two "processes" sharing one lease file
+        first = BotController(FakeBot(), lease_path, ttl=0.3, holder='worker-1')
+        second = BotController(FakeBot(), lease_path, ttl=0.3, holder='worker-2')
+        try:
+            results = []
+            threads = [threading.Thread(target=lambda: results.append(first.start()[0])) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert results.count(True) == 1 and wait_for(lambda: first.state == 'running'), \
+                f"Concurrent starts were not serialised: {results}, {first.state}"
+            print("✅ Concurrent start requests start a single loop")
+            
+            second.start()
+            assert wait_for(lambda: second.state == 'standby'), f"Second process did not go on standby: {second.state}"
+            time.sleep(0.3)
+            status = second.status()
+            assert (FakeBot.peak == 1 and status['running'] and status['leader'] == 'worker-1'
+                    and status['stage'] == 'waiting' and status['queue_depth'] == 3), \
+                f"Followers disagree about the bot: peak {FakeBot.peak}, {status}"
+            print("✅ One leader posts; other processes report its stage and queue")
+            
+            # Stopping through any process stops the leader and its standby
+            second.stop()
+            assert wait_for(lambda: first.state == 'stopped' and second.state == 'stopped') and not FakeBot.active, \
+                f"Stop did not reach the leader: {first.state}, {second.state}"
+            assert not first.status()['running'], "Stopped bot still reported as running"
+            print("✅ Stop from any process stops the leader")
+        finally:
+            first.stop()
+            second.stop()
+        
+        # A posting loop stuck in a long upload must not hold up the lease thread
+        release = threading.Event()
+        
+        class StuckBot(FakeBot):
+            def run(self, stop_event):
+                release.wait(10)
+        
+        stuck = BotController(StuckBot(), os.path.join(temp_dir, 'stuck.db'), ttl=0.3, holder='stuck')
+        try:
+            stuck.start()
+            wait_for(lambda: stuck.state == 'running')
+            started = time.perf_counter()
+            stuck.stop()
+            assert stuck.state == 'stopped' and time.perf_counter() - started <= 2, \
+                f"Lease thread waited on a stuck posting loop: {stuck.state}"
+            print("✅ Stopping does not wait on a posting loop stuck mid-upload")
+        finally:
+            release.set()
+        
+        # Dashboard polls must not build the scheduler of a bot that never started
+        from motivation_bot import MotivationBot
+        bot = MotivationBot()
+        bot.schedule_db = os.path.join(temp_dir, 'schedule.db')
+        status = bot.status()
+        assert bot.scheduler is None and not os.path.exists(bot.schedule_db) and status['stage'] == 'stopped', \
+            "Status of a stopped bot built its scheduler"
+        print("✅ Stopped bot status does not read config or create the slot store")
+    
+    return True
+
+def test_metrics():
+    """Test timing spans, the /metrics endpoint and JSON logs carrying job ids"""
+    print("\n📈 Testing Metrics...")
+    
+    try:
+        import io
+        import time
+        import tempfile
+        import metrics
+        from jobs import JobQueue
+        from motivation_bot import MotivationBot
+        
+        stream = io.StringIO()
+        handler = metrics.configure_logging(stream=stream)
+        try:
+            before = metrics.REGISTRY.histogram_count(metrics.SPAN_SECONDS, span='layout')
+            bot = MotivationBot()
+            bot.add_music = False
+            queue = JobQueue(max_workers=1)
+            with tempfile.TemporaryDirectory() as temp_dir:
+                bot.videos_folder = temp_dir
+                bot.fps = 12
+                bot.duration = 1
+                job = queue.submit('generate', lambda progress: bot.create_video(f"Measure what matters {time.time()}"))
+                deadline = time.time() + 30
+                while not queue.snapshot(job.id)['status'] in ('done', 'failed') and time.time() < deadline:
+                    time.sleep(0.02)
+                if queue.snapshot(job.id)['status'] != 'done':
+                    print(f"❌ Render job did not finish: {queue.snapshot(job.id)}")
+                    return False
+            
+            entries = [json.loads(line) for line in stream.getvalue().splitlines()]
+            spans = {entry['span'] for entry in entries if entry.get('job_id') == job.id}
+            if not {'layout', 'render', 'encode', 'job'} <= spans:
+                print(f"❌ Job spans missing from the JSON log: {sorted(spans)}")
+                return False
+            if metrics.REGISTRY.histogram_count(metrics.SPAN_SECONDS, span='layout') != before + 1:
+                print("❌ Layout span was not recorded in the histogram")
+                return False
+            print(f"✅ JSON log lines for {', '.join(sorted(spans))} carry the job id")
+            
+            try:
+                with metrics.span('upload'):
+                    raise RuntimeError("boom")
+            except RuntimeError:
+                pass
+            if metrics.REGISTRY.counter_value(metrics.SPAN_ERRORS, span='upload') < 1:
+                print("❌ Failing span was not counted")
+                return False
+            print("✅ Failing spans are timed and counted as errors")
+        finally:
+            metrics.logger.removeHandler(handler)
+        
+        import app as web
+        response = web.app.test_client().get('/metrics')
+        body = response.get_data(as_text=True)
+        if (response.status_code != 200 or 'text/plain' not in response.content_type
+                or '# TYPE motivation_bot_span_seconds histogram' not in body
+                or 'motivation_bot_span_seconds_bucket{span="encode",le="+Inf"}' not in body
+                or 'motivation_bot_jobs_total{kind="generate",status="done"}' not in body):
+            print(f"❌ /metrics output is not valid Prometheus text:\n{body[:500]}")
+            return False
+        print("✅ /metrics serves span histograms and counters in Prometheus format")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Metrics test failed: {e}")
+        return False
+
+def test_benchmark_harness():
+    """Test the benchmark harness runs offline and writes comparable JSON"""
+    print("\n⏱️  Testing Benchmark Harness...")
+    
+    try:
+        import tempfile
+        import benchmark
+        from motivation_bot import get_quote_client
+        
+        with benchmark.OllamaStub(latency=0):
+            quote = get_quote_client().request_quote()
+        if not quote.endswith('(1).'):
+            print(f"❌ Ollama stub was not used: {quote}")
+            return False
+        print("✅ Ollama is stubbed locally")
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output = os.path.join(temp_dir, 'bench.json')
+            if not benchmark.main(['--quick', '--only', 'layout,create_video', '--output', output]):
+                print("❌ Quick benchmark run failed")
+                return False
+            with open(output, 'r') as f:
+                report = json.load(f)
+        
+        if set(report['results']) != {'layout', 'create_video'} or '360x640_1s' not in report['results']['create_video']:
+            print(f"❌ Unexpected benchmark report: {report['results']}")
+            return False
+        print("✅ Results written to JSON with commit and environment")
+        
+        slower = json.loads(json.dumps(report))
+        slower['results']['create_video']['360x640_1s']['seconds_per_video'] *= 2
+        regressions = benchmark.compare_results(report, slower)
+        if [regression['metric'] for regression in regressions] != ['create_video.360x640_1s.seconds_per_video']:
+            print(f"❌ Regression not detected: {regressions}")
+            return False
+        print("✅ Comparing two runs flags the slower metric")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Benchmark harness test failed: {e}")
+        return False
+
+def test_profiling():
+    """Test sampled cProfile / stack-sampling profiles of renders and requests"""
+    print("\n🔬 Testing Profiling Hooks...")
+    
+    try:
+        import time
+        import random
+        import pstats
+        import tempfile
+        import profiling
+        from motivation_bot import MotivationBot
+        
+        sampler = profiling.Profiler(rate=0.01, rng=random.Random(3))
+        hits = 0
+        for _ in range(10000):
+            session = sampler.sample()
+            if session:
+                hits += 1
+                session.stop()
+        if not 60 <= hits <= 140 or profiling.Profiler().sample() is not None:
+            print(f"❌ Sampling rate not respected: {hits} of 10000 at 1%")
+            return False
+        print(f"✅ 1% sampling profiled {hits} of 10000 calls; rate 0 profiles nothing")
+        
+        bot = MotivationBot()
+        bot.add_music = False
+        with tempfile.TemporaryDirectory() as temp_dir:
+            bot.videos_folder = temp_dir
+            bot.fps = 12
+            bot.duration = 1
+            video_path = bot.create_video(f"Profile before you optimize {time.time()}", profile=True)
+            profile_path = os.path.splitext(video_path)[0] + '.pstats'
+            if not os.path.exists(profile_path):
+                print("❌ No .pstats written next to the video")
+                return False
+            functions = {name for _, _, name in pstats.Stats(profile_path).stats}
+            if not {'layout_text', 'encode_still'} <= functions:
+                print("❌ Profile does not cover layout and encoding")
+                return False
+            print("✅ cProfile .pstats next to the video covers layout and encoding")
+            
+            # Frames are rendered on the pipeline's producer thread, profile sets on encoder threads
+            bot.template = 'ken_burns'
+            video_path = bot.create_video(f"Profile every frame {time.time()}", profile=True)
+            stats = pstats.Stats(os.path.splitext(video_path)[0] + '.pstats').stats
+            calls = sum(entry[1] for (_, _, name), entry in stats.items() if name == 'render_into')
+            if calls < bot.fps * bot.duration:
+                print(f"❌ cProfile saw render_into {calls} times for {bot.fps * bot.duration} frames")
+                return False
+            bot.template = 'static'
+            manifest = bot.create_video(f"Profile the set {time.time()}", profiles=['preview', 'square'], profile=True)
+            stats = pstats.Stats(os.path.splitext(manifest['outputs'][0]['path'])[0] + '.pstats').stats
+            calls = {name: entry[1] for (_, _, name), entry in stats.items()}
+            if calls.get('render_output') != 2 or 'encode_still' not in calls:
+                print("❌ cProfile missed the profile set's encoder threads")
+                return False
+            print("✅ cProfile merges the frame producer and encoder threads")
+            
+            original = profiling._default_profiler
+            profiling._default_profiler = profiling.Profiler(rate=1.0, mode='sampling', interval=0.001,
+                                                             folder=os.path.join(temp_dir, 'profiles'))
+            try:
+                bot.template = 'ken_burns'
+                video_path = bot.create_video(f"Sample the slow parts {time.time()}")
+                with open(os.path.splitext(video_path)[0] + '.speedscope.json', 'r') as f:
+                    speedscope = json.load(f)
+                names = {frame['name'] for frame in speedscope['shared']['frames']}
+                if not speedscope['profiles'] or 'render_into' not in names:
+                    print("❌ Sampling profile missed the frame renderer")
+                    return False
+                print("✅ Sampling profiler writes speedscope files including pipeline threads")
+                
+                import app as web
+                response = web.app.test_client().get('/bot_status')
+                profiles = os.listdir(os.path.join(temp_dir, 'profiles'))
+                if response.status_code != 200 or not any('bot_status' in name for name in profiles):
+                    print(f"❌ Request was not profiled: {profiles}")
+                    return False
+                print("✅ Sampled Flask requests are profiled per endpoint")
+            finally:
+                profiling._default_profiler = original
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Profiling test failed: {e}")
+        return False
+
 def test_config():
     """Test configuration setup"""
     print("\n⚙️  Testing Configuration...")
@@ -187,7 +2010,33 @@ def main():
     tests = [
         test_imports,
         test_motivation_bot,
+        test_still_video_encoding,
+        test_codec_backends,
+        test_video_templates,
+        test_frame_pipeline,
+        test_output_profiles,
+        test_background_music,
+        test_batch_rendering,
+        test_quote_client,
+        test_quote_batching,
+        test_quote_history,
+        test_quote_dedup,
+        test_startup_budget,
+        test_render_cache,
+        test_text_layout,
         test_web_app,
+        test_job_queue,
+        test_download_all_stream,
+        test_video_catalog,
+        test_video_serving,
+        test_scheduler,
+        test_render_ahead,
+        test_uploader,
+        test_multi_account,
+        test_bot_controller,
+        test_metrics,
+        test_benchmark_harness,
+        test_profiling,
         test_config,
         test_directories,
         test_ollama
@@ -0,0 +1,108 @@
+"""
+Text layout for Motivation Bot videos
+Cached fonts, memoized word widths, linear-time greedy wrapping and
+automatic font-size fitting so long quotes never overflow the frame.
+"""
+
+from functools import lru_cache
+
+# Tried in order when the configured font is not installed
+FALLBACK_FONTS = ('DejaVuSans.ttf', 'LiberationSans-Regular.ttf')
+
+# Line height relative to font size (70 px lines for the original 60 px font)
+LINE_SPACING = 70 / 60
+
+@lru_cache(maxsize=32)
+def get_font(font_path, size):
+    """Load a font once per (path, size)"""
+    from PIL import ImageFont
+    for path in (font_path,) + FALLBACK_FONTS:
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:
+        # Pillow < 10.1 only has the fixed-size bitmap font
+        return ImageFont.load_default()
+
+@lru_cache(maxsize=65536)
+def measure_word(font_path, size, word):
+    """Advance width of a word (or the space character) in pixels"""
+    return get_font(font_path, size).getlength(word)
+
+def wrap_words(words, widths, space_width, max_width):
+    """Greedy wrap in one pass; returns lines as (words, width) pairs.
+
+    Each word width is looked up once, so the cost is linear in the number
+    of words instead of re-measuring the growing line after every word.
+    """
+    lines = []
+    current = []
+    current_width = 0.0
+    for word, width in zip(words, widths):
+        candidate = current_width + space_width + width if current else width
+        if current and candidate > max_width:
+            lines.append((current, current_width))
+            current = [word]
+            current_width = width
+        else:
+            current.append(word)
+            current_width = candidate
+    if current:
+        lines.append((current, current_width))
+    return lines
+
+def layout_text(text, width, height, font_path, font_size, margin=50, min_font_size=24):
+    """Fit text into the frame and return font, line positions and line height.
+
+    Starts at font_size and shrinks by 10% steps until every line fits the
+    width and the block fits the height (keeping margin on each side), or
+    min_font_size is reached.
+    """
+    words = text.split()
+    max_width = width - 2 * margin
+    max_height = height - 2 * margin
+
+    size = font_size
+    while True:
+        widths = [measure_word(font_path, size, word) for word in words]
+        space_width = measure_word(font_path, size, ' ')
+        lines = wrap_words(words, widths, space_width, max_width)
+        line_height = round(size * LINE_SPACING)
+        fits = (len(lines) * line_height <= max_height
+                and all(line_width <= max_width for _, line_width in lines))
+        if fits or size <= min_font_size:
+            break
+        size = max(min_font_size, int(size * 0.9))
+
+    y = (height - len(lines) * line_height) // 2
+    positioned = []
+    for line_words, line_width in lines:
+        positioned.append((' '.join(line_words), int((width - line_width) // 2), y))
+        y += line_height
+
+    return {
+        'font': get_font(font_path, size),
+        'font_size': size,
+        'line_height': line_height,
+        'lines': positioned
+    }
+
+def scale_layout(layout, base_width, base_height, width, height, font_path):
+    """Fit a layout computed for base_width x base_height into another frame size.
+
+    Scales uniformly by the width ratio and centres the block vertically, so
+    every aspect ratio shows the same line breaks. base_height should be the
+    shortest frame (relative to its width) the layout will be used for.
+    """
+    scale = width / base_width
+    size = max(1, round(layout['font_size'] * scale))
+    offset = (height - base_height * scale) / 2
+    return {
+        'font': get_font(font_path, size),
+        'font_size': size,
+        'line_height': round(layout['line_height'] * scale),
+        'lines': [(text, round(x * scale), round(y * scale + offset)) for text, x, y in layout['lines']]
+    }
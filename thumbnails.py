@@ -0,0 +1,44 @@
+"""
+Poster thumbnails for Motivation Bot videos
+Small JPEGs written once at render time from the frame already in memory,
+with a lazy fallback that grabs the first frame of older videos.
+"""
+
+import os
+
+THUMBNAIL_FOLDER = 'thumbnails'
+THUMBNAIL_SIZE = (270, 480)  # Quarter of 1080x1920
+
+def thumbnail_path(videos_folder, video_filename):
+    """Where the poster for a video lives"""
+    name = os.path.splitext(os.path.basename(video_filename))[0]
+    return os.path.join(videos_folder, THUMBNAIL_FOLDER, f"{name}.jpg")
+
+def save_thumbnail(image, path, size=THUMBNAIL_SIZE):
+    """Write a PIL image as a small JPEG poster"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    poster = image.copy()
+    poster.thumbnail(size)
+    poster.convert('RGB').save(path, 'JPEG', quality=80, optimize=True)
+    return path
+
+def ensure_thumbnail(videos_folder, video_filename):
+    """Return the poster path, extracting it from the video's first frame if missing"""
+    path = thumbnail_path(videos_folder, video_filename)
+    if os.path.exists(path):
+        return path
+
+    video_path = os.path.join(videos_folder, os.path.basename(video_filename))
+    if not os.path.exists(video_path):
+        return None
+
+    import cv2
+    from PIL import Image
+    capture = cv2.VideoCapture(video_path)
+    try:
+        ok, frame = capture.read()
+    finally:
+        capture.release()
+    if not ok:
+        return None
+    return save_thumbnail(Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)), path)
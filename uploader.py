@@ -0,0 +1,193 @@
+"""
+Upload clients for Motivation Bot
+Uploaders keep their login session on disk and reuse it; UploadClient adds
+retries with exponential backoff and full jitter, and verifies posts in the
+background instead of sleeping after every upload. Any backend with
+login/upload/verify can stand in, including a local fake server for tests.
+"""
+
+import os
+import json
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class UploadError(Exception):
+    """An upload that will not succeed on retry (bad file, bad credentials)"""
+
+class TransientUploadError(UploadError):
+    """Rate limits, server errors and network trouble: worth retrying"""
+
+class InstabotUploader:
+    """instabot-backed uploader whose cookie lives in session_dir between runs"""
+
+    def __init__(self, username, password, session_dir='sessions/default'):
+        self.username = username
+        self.password = password
+        self.session_dir = session_dir
+        self.bot = None
+
+    def login(self):
+        if self.bot is not None:
+            return
+        from instabot import Bot
+        os.makedirs(self.session_dir, exist_ok=True)
+        # base_path keeps instabot's cookie per account; use_cookie reuses it instead of a fresh login
+        bot = Bot(base_path=self.session_dir)
+        if not bot.login(username=self.username, password=self.password, use_cookie=True):
+            raise UploadError(f"Instagram login failed for {self.username}")
+        self.bot = bot
+
+    def upload(self, video_path, caption):
+        self.login()
+        try:
+            result = self.bot.upload_video(video_path, caption=caption)
+        except Exception as e:
+            # Drop the session so the next attempt logs in again
+            self.bot = None
+            raise TransientUploadError(str(e))
+        if not result:
+            raise TransientUploadError("Instagram rejected the upload")
+        # instabot returns the media dict on success; fall back to the file name as an id
+        return (result.get('pk') if isinstance(result, dict) else None) or os.path.basename(video_path)
+
+    def verify(self, media_id):
+        """True once media_id shows up among the account's latest posts"""
+        self.login()
+        # instabot lists media as "<pk>_<user id>"
+        recent = {str(media).split('_')[0] for media in self.bot.get_last_user_medias(self.username, 5) or []}
+        if not str(media_id).isdigit():
+            # Older instabot gave no media id: a recent post is the only evidence there is
+            return bool(recent)
+        return str(media_id) in recent
+
+class HttpUploader:
+    """Uploader for a small JSON upload API (POST /login, POST /upload, GET /media/<id>).
+
+    The session token is stored in session_file and reused until the server
+    answers 401.
+    """
+
+    def __init__(self, base_url, username, password, session_file, timeout=(3.05, 60)):
+        import requests
+        self.base_url = base_url.rstrip('/')
+        self.username = username
+        self.password = password
+        self.session_file = session_file
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.token = self._load_token()
+
+    def _load_token(self):
+        try:
+            with open(self.session_file, 'r') as f:
+                return json.load(f).get('token')
+        except (OSError, ValueError):
+            return None
+
+    def login(self):
+        if self.token:
+            return
+        response = self._request('post', '/login', json={'username': self.username, 'password': self.password},
+                                 authenticated=False)
+        self.token = response.json()['token']
+        os.makedirs(os.path.dirname(self.session_file) or '.', exist_ok=True)
+        with open(self.session_file, 'w') as f:
+            json.dump({'token': self.token}, f)
+
+    def _request(self, method, path, authenticated=True, **kwargs):
+        import requests
+        headers = kwargs.pop('headers', {})
+        if authenticated:
+            self.login()
+            headers['Authorization'] = f'Bearer {self.token}'
+        try:
+            response = self.session.request(method, self.base_url + path, headers=headers,
+                                            timeout=self.timeout, **kwargs)
+        except requests.RequestException as e:
+            raise TransientUploadError(str(e))
+        if response.status_code == 401 and authenticated:
+            # Stale session: forget it and let the retry log in again
+            self.token = None
+            raise TransientUploadError("session expired")
+        if response.status_code == 429 or response.status_code >= 500:
+            raise TransientUploadError(f"HTTP {response.status_code}")
+        if response.status_code >= 400:
+            raise UploadError(f"HTTP {response.status_code}: {response.text[:200]}")
+        return response
+
+    def upload(self, video_path, caption):
+        with open(video_path, 'rb') as video:
+            response = self._request('post', '/upload', files={'video': video}, data={'caption': caption})
+        return response.json()['media_id']
+
+    def verify(self, media_id):
+        return self._request('get', f'/media/{media_id}').json().get('status') == 'published'
+
+class UploadClient:
+    def __init__(self, uploader, max_attempts=4, base_delay=2.0, max_delay=60.0,
+                 verify_delays=(5, 10, 20, 40), sleep=None, rng=None):
+        """verify_delays are the waits between post-verification polls"""
+        self.uploader = uploader
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.verify_delays = verify_delays
+        self.sleep = sleep or time.sleep
+        self.rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self.last_verification = None
+        self._verifier = ThreadPoolExecutor(max_workers=1, thread_name_prefix='verify')
+
+    def backoff(self, attempt):
+        """Full jitter: uniform in [0, min(max_delay, base_delay * 2**attempt)]"""
+        return self.rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def upload(self, video_path, caption, on_verified=None):
+        """Upload with retries; returns the media id or None.
+
+        Verification runs in the background; on_verified(media_id, ok) is
+        called when it finishes and last_verification holds its future.
+        """
+        media_id = None
+        # One upload at a time per account session
+        with self._lock:
+            for attempt in range(self.max_attempts):
+                try:
+                    media_id = self.uploader.upload(video_path, caption)
+                    break
+                except TransientUploadError as e:
+                    if attempt == self.max_attempts - 1:
+                        print(f"Upload failed after {self.max_attempts} attempts: {e}")
+                        return None
+                    delay = self.backoff(attempt)
+                    print(f"Upload attempt {attempt + 1} failed ({e}); retrying in {delay:.1f} s")
+                    self.sleep(delay)
+                except UploadError as e:
+                    print(f"Upload failed: {e}")
+                    return None
+        self.last_verification = self._verifier.submit(self._verify, media_id, on_verified)
+        return media_id
+
+    def _verify(self, media_id, on_verified):
+        """Poll until the post shows up, with growing gaps between checks"""
+        ok = False
+        for delay in self.verify_delays:
+            self.sleep(delay)
+            try:
+                # The check shares the uploader's session with uploads in flight
+                with self._lock:
+                    verified = self.uploader.verify(media_id)
+                if verified:
+                    ok = True
+                    break
+            except Exception as e:
+                print(f"Verification check failed: {e}")
+        print(f"Post {media_id} {'verified' if ok else 'could not be verified'}")
+        if on_verified:
+            on_verified(media_id, ok)
+        return ok
+
+    def close(self):
+        self._verifier.shutdown(wait=False)
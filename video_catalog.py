@@ -0,0 +1,135 @@
+"""
+Video catalog for Motivation Bot
+SQLite index of generated videos so /get_videos can sort, filter and paginate
+without listing and stat-ing the whole folder on every dashboard load.
+"""
+
+import hashlib
+import os
+from datetime import datetime
+
+from sqlite_store import SQLiteStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    filename TEXT PRIMARY KEY,
+    quote TEXT,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    mtime REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_videos_created ON videos (created);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('version', '0');
+INSERT OR IGNORE INTO meta (key, value) VALUES ('listing', '');
+"""
+
+SORT_COLUMNS = {'created': 'created', 'size': 'size', 'filename': 'filename'}
+
+class VideoCatalog(SQLiteStore):
+    def __init__(self, folder):
+        self.folder = folder
+        super().__init__(os.path.join(folder, '.catalog.db'))
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _bump_version(self, conn):
+        conn.execute("UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'version'")
+
+    def version(self):
+        """Changes whenever the catalog contents change (used for ETags)"""
+        return int(self._connect().execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0])
+
+    def add(self, path, quote=None):
+        """Record a freshly written video"""
+        stat = os.stat(path)
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO videos (filename, quote, size, created, mtime) VALUES (?, ?, ?, ?, ?)',
+                (os.path.basename(path), quote, stat.st_size, stat.st_mtime, stat.st_mtime)
+            )
+            self._bump_version(conn)
+
+    def reconcile(self, force=False):
+        """Sync with files added or removed outside create_video.
+
+        A fingerprint of the .mp4 names, sizes and mtimes is compared rather
+        than the folder's mtime, which the databases, their WAL files and
+        partial renders in the same folder bump on almost every write. An
+        unchanged listing costs one scandir; otherwise only new, changed or
+        missing files are touched. Returns True if anything changed.
+        """
+        if not os.path.isdir(self.folder):
+            return False
+        videos = {}
+        for entry in os.scandir(self.folder):
+            if entry.name.endswith('.mp4') and entry.is_file():
+                videos[entry.name] = entry.stat()
+        listing = hashlib.sha1(repr(sorted(
+            (name, stat.st_size, stat.st_mtime_ns) for name, stat in videos.items()
+        )).encode()).hexdigest()
+        conn = self._connect()
+        stored = conn.execute("SELECT value FROM meta WHERE key = 'listing'").fetchone()[0]
+        if stored == listing and not force:
+            return False
+
+        known = {name: (size, mtime) for name, size, mtime in
+                 conn.execute('SELECT filename, size, mtime FROM videos')}
+        upserts = [
+            (name, stat.st_size, stat.st_ctime, stat.st_mtime)
+            for name, stat in videos.items() if known.get(name) != (stat.st_size, stat.st_mtime)
+        ]
+        removed = [(name,) for name in known if name not in videos]
+
+        with conn:
+            conn.executemany(
+                'INSERT INTO videos (filename, size, created, mtime) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT(filename) DO UPDATE SET size = excluded.size, mtime = excluded.mtime',
+                upserts
+            )
+            conn.executemany('DELETE FROM videos WHERE filename = ?', removed)
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('listing', ?)", (listing,))
+            if upserts or removed:
+                self._bump_version(conn)
+        return bool(upserts or removed)
+
+    def query(self, sort='created', order='desc', page=1, per_page=50, since=None, until=None, search=None):
+        """Return (videos, total) for one page of the catalog.
+
+        since/until are datetimes (inclusive dates), search matches the quote
+        or filename.
+        """
+        clauses = []
+        params = []
+        if since:
+            clauses.append('created >= ?')
+            params.append(datetime.combine(since.date(), datetime.min.time()).timestamp())
+        if until:
+            clauses.append('created <= ?')
+            params.append(datetime.combine(until.date(), datetime.max.time()).timestamp())
+        if search:
+            clauses.append('(quote LIKE ? OR filename LIKE ?)')
+            params.extend([f'%{search}%'] * 2)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+
+        column = SORT_COLUMNS.get(sort, 'created')
+        direction = 'ASC' if order == 'asc' else 'DESC'
+        conn = self._connect()
+        total = conn.execute(f'SELECT COUNT(*) FROM videos {where}', params).fetchone()[0]
+        rows = conn.execute(
+            f'SELECT filename, quote, size, created FROM videos {where} '
+            f'ORDER BY {column} {direction}, filename {direction} LIMIT ? OFFSET ?',
+            params + [per_page, (page - 1) * per_page]
+        ).fetchall()
+
+        videos = [{
+            'filename': filename,
+            'quote': quote,
+            'size_mb': round(size / (1024 * 1024), 2),
+            'created': datetime.fromtimestamp(created).strftime('%Y-%m-%d %H:%M:%S')
+        } for filename, quote, size, created in rows]
+        return videos, total
@@ -0,0 +1,252 @@
+"""
+Video encoder backends for Motivation Bot
+Every backend takes BGR uint8 frames (OpenCV's layout) and writes a file:
+OpenCV's mp4v writer, an ffmpeg pipe with H.264 presets and CRF control,
+and a raw-frame pipe for handing frames to any external command.
+"""
+
+import os
+import abc
+import shutil
+import tempfile
+import subprocess
+
+# x264 speed presets, fastest first
+H264_PRESETS = ('ultrafast', 'superfast', 'veryfast', 'faster', 'fast', 'medium', 'slow')
+
+def find_ffmpeg():
+    """Locate an ffmpeg binary (system install or the one bundled with moviepy)"""
+    path = shutil.which('ffmpeg')
+    if path:
+        return path
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return None
+
+def frame_bytes(frame):
+    """Frame data as a buffer, without copying contiguous frames"""
+    return memoryview(frame).cast('B') if frame.flags['C_CONTIGUOUS'] else frame.tobytes()
+
+class PipeWriter:
+    """Feeds raw frames to a subprocess' stdin"""
+
+    def __init__(self, command):
+        self.command = command
+        self.bytes_written = 0
+        # stderr goes to a file: a chatty command filling a stderr pipe nobody reads
+        # would block, and then so would our writes to its stdin
+        self._stderr = tempfile.TemporaryFile()
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE,
+                                         stdout=subprocess.DEVNULL, stderr=self._stderr)
+
+    def write(self, frame):
+        data = frame_bytes(frame)
+        self._process.stdin.write(data)
+        self.bytes_written += len(data)
+
+    def close(self):
+        self._process.stdin.close()
+        self._process.wait()
+        self._stderr.seek(0)
+        stderr = self._stderr.read()
+        self._stderr.close()
+        if self._process.returncode != 0:
+            # The end of the log is where the error is
+            raise RuntimeError(f"{os.path.basename(self.command[0])} exited with "
+                               f"{self._process.returncode}: {stderr[-2000:].decode(errors='ignore').strip()}")
+
+class FileWriter:
+    """Writes raw frames straight to a file"""
+
+    def __init__(self, output_path):
+        self.bytes_written = 0
+        self._file = open(output_path, 'wb')
+
+    def write(self, frame):
+        self.bytes_written += self._file.write(frame_bytes(frame))
+
+    def close(self):
+        self._file.close()
+
+class OpenCVWriter:
+    def __init__(self, output_path, width, height, fps, fourcc):
+        import cv2
+        self._writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*fourcc), fps, (width, height))
+        if not self._writer.isOpened():
+            raise RuntimeError(f"OpenCV could not open a {fourcc} writer for {output_path}")
+
+    def write(self, frame):
+        self._writer.write(frame)
+
+    def close(self):
+        self._writer.release()
+
+class VideoEncoder(abc.ABC):
+    """Base backend: subclasses provide open(); still frames are written fps * duration times"""
+    name = None
+
+    def cache_tag(self):
+        """Everything about this backend that changes the output file"""
+        return self.name
+
+    def available(self):
+        return True
+
+    @abc.abstractmethod
+    def open(self, output_path, width, height, fps):
+        """A writer with write(frame) and close() for output_path"""
+
+    def encode_frames(self, frames, output_path, width, height, fps):
+        """Encode an iterable of frames; returns True on success"""
+        writer = None
+        try:
+            writer = self.open(output_path, width, height, fps)
+            for frame in frames:
+                writer.write(frame)
+            writer.close()
+            writer = None
+            return True
+        except (OSError, RuntimeError) as e:
+            print(f"{self.name} encode failed: {e}")
+            return False
+        finally:
+            if writer is not None:
+                try:
+                    writer.close()
+                except (OSError, RuntimeError):
+                    pass
+
+    def encode_still(self, frame, output_path, fps, duration):
+        """Encode one frame held for duration seconds; returns True on success"""
+        height, width = frame.shape[:2]
+        return self.encode_frames((frame for _ in range(fps * duration)), output_path, width, height, fps)
+
+class OpenCVEncoder(VideoEncoder):
+    """OpenCV VideoWriter (mp4v by default): no ffmpeg needed, large files"""
+    name = 'mp4v'
+
+    def __init__(self, fourcc='mp4v'):
+        self.fourcc = fourcc
+
+    def cache_tag(self):
+        return f'opencv-{self.fourcc}'
+
+    def open(self, output_path, width, height, fps):
+        return OpenCVWriter(output_path, width, height, fps, self.fourcc)
+
+class FFmpegEncoder(VideoEncoder):
+    """H.264 through an ffmpeg pipe with x264 preset and CRF control"""
+    name = 'x264'
+
+    def __init__(self, preset='veryfast', crf=23, still_gop=True, ffmpeg=None):
+        if preset not in H264_PRESETS:
+            raise ValueError(f"Unknown x264 preset {preset!r}, expected one of {', '.join(H264_PRESETS)}")
+        self.preset = preset
+        self.crf = int(crf)
+        self.still_gop = still_gop
+        self.ffmpeg = ffmpeg or find_ffmpeg()
+
+    def cache_tag(self):
+        return f"x264-{self.preset}-crf{self.crf}{'-gop' if self.still_gop else ''}"
+
+    def available(self):
+        return bool(self.ffmpeg)
+
+    def input_args(self, width, height, fps):
+        return ['-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f'{width}x{height}', '-r', str(fps), '-i', '-']
+
+    def output_args(self, tune=None):
+        args = ['-c:v', 'libx264', '-preset', self.preset, '-crf', str(self.crf)]
+        if tune:
+            args += ['-tune', tune]
+        return args + ['-pix_fmt', 'yuv420p']
+
+    def open(self, output_path, width, height, fps):
+        if not self.ffmpeg:
+            raise RuntimeError("ffmpeg not found")
+        command = ([self.ffmpeg, '-y', '-loglevel', 'error'] + self.input_args(width, height, fps)
+                   # faststart moves the moov atom up front, which Instagram expects
+                   + self.output_args() + ['-movflags', '+faststart', output_path])
+        return PipeWriter(command)
+
+    def encode_still(self, frame, output_path, fps, duration):
+        """Encode a still frame as a one-second H.264 GOP repeated for the duration.
+
+        The raw frame is piped to ffmpeg once and converted to yuv420p once; the
+        loop filter then repeats it so x264 codes one keyframe plus skip frames.
+        That one-second segment is stream-copied `duration` times into the final
+        file, so the cost no longer grows with fps * duration.
+        """
+        if not self.still_gop:
+            return super().encode_still(frame, output_path, fps, duration)
+        if not self.ffmpeg:
+            return False
+
+        height, width = frame.shape[:2]
+        segment_path = output_path + '.gop.part'
+        encode_segment = (
+            [self.ffmpeg, '-y', '-loglevel', 'error'] + self.input_args(width, height, fps)
+            + ['-vf', f'format=yuv420p,loop=loop={fps - 1}:size=1:start=0', '-frames:v', str(fps)]
+            + self.output_args(tune='stillimage') + ['-f', 'mp4', segment_path]
+        )
+        repeat_segment = [
+            self.ffmpeg, '-y', '-loglevel', 'error',
+            '-stream_loop', str(duration - 1), '-i', segment_path,
+            '-c', 'copy', '-movflags', '+faststart',
+            output_path
+        ]
+        try:
+            result = subprocess.run(encode_segment, input=frame.tobytes(),
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            if result.returncode == 0:
+                result = subprocess.run(repeat_segment, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        except OSError as e:
+            print(f"Error running ffmpeg: {e}")
+            return False
+        finally:
+            if os.path.exists(segment_path):
+                os.remove(segment_path)
+
+        if result.returncode != 0 or not os.path.exists(output_path):
+            print(f"ffmpeg still-frame encode failed: {result.stderr.decode(errors='ignore').strip()}")
+            return False
+        return True
+
+class RawPipeEncoder(VideoEncoder):
+    """Raw bgr24 frames to an external command's stdin, or to a file without one.
+
+    command is an argument list; {width}, {height}, {fps} and {output} are
+    filled in, e.g. a hardware encoder CLI or a streaming relay. The file sink
+    (no command) is for benchmarks and tests: its output is not an MP4.
+    """
+    name = 'raw'
+
+    def __init__(self, command=None):
+        self.command = list(command) if command else None
+
+    def cache_tag(self):
+        return 'raw-' + ' '.join(self.command) if self.command else 'raw'
+
+    def available(self):
+        # Without a command nothing turns the frames into a playable video
+        return bool(self.command)
+
+    def open(self, output_path, width, height, fps):
+        if not self.command:
+            return FileWriter(output_path)
+        values = {'width': width, 'height': height, 'fps': fps, 'output': output_path}
+        return PipeWriter([part.format(**values) for part in self.command])
+
+def get_encoder(name, preset='veryfast', crf=23, still_gop=True, command=None):
+    """Build a backend by name: 'mp4v', 'x264' or 'raw'"""
+    if name == 'mp4v':
+        return OpenCVEncoder()
+    if name == 'x264':
+        return FFmpegEncoder(preset=preset, crf=crf, still_gop=still_gop)
+    if name == 'raw':
+        if not command:
+            raise ValueError("The raw codec needs a command that encodes bgr24 frames to {output}")
+        return RawPipeEncoder(command)
+    raise ValueError(f"Unknown video codec {name!r}, expected mp4v, x264 or raw")
@@ -0,0 +1,192 @@
+"""
+Animated templates for Motivation Bot videos
+Backgrounds and the text layer are rendered once; every frame is then built
+with NumPy slicing and integer alpha blending into one preallocated BGR
+buffer, so there is no per-frame PIL drawing or allocation.
+"""
+
+from text_layout import layout_text
+
+# name -> renderer options; 'static' is the original white-on-black look
+TEMPLATES = {
+    'static': {'background': 'black', 'reveal': False},
+    'gradient': {'background': 'gradient', 'reveal': False},
+    'ken_burns': {'background': 'ken_burns', 'reveal': False},
+    'word_reveal': {'background': 'gradient', 'reveal': True},
+}
+
+# Gradient end colours (RGB)
+GRADIENT_COLORS = ((20, 30, 80), (110, 20, 70))
+
+# Ken Burns: how much larger than the frame the source is scaled, so it can pan
+KEN_BURNS_ZOOM = 1.15
+
+# Word reveal: share of the video over which the words appear
+REVEAL_FRACTION = 0.6
+
+def bgr(color):
+    return tuple(reversed(color))
+
+class TemplateRenderer:
+    def __init__(self, quote, width, height, fps, duration, font_path, font_size,
+                 background='black', reveal=False, background_image=None,
+                 text_color=(255, 255, 255), layout=None):
+        import numpy as np
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.duration = duration
+        self.frame_count = fps * duration
+        self.background = background
+        self.reveal = reveal
+        self.text_color = text_color
+        self.layout = layout or layout_text(quote, width, height, font_path, font_size)
+
+        # The one buffer every frame is written into
+        self.frame = np.zeros((height, width, 3), dtype=np.uint8)
+        self._prepare_text()
+        self._prepare_background(background_image)
+
+    @classmethod
+    def from_template(cls, name, quote, width, height, fps, duration, font_path, font_size, **options):
+        if name not in TEMPLATES:
+            raise ValueError(f"Unknown template {name!r}, expected one of {', '.join(TEMPLATES)}")
+        return cls(quote, width, height, fps, duration, font_path, font_size, **TEMPLATES[name], **options)
+
+    def _prepare_text(self):
+        """Draw the text mask once and keep only its bounding box"""
+        import numpy as np
+        from PIL import Image, ImageDraw
+
+        mask = Image.new('L', (self.width, self.height), 0)
+        draw = ImageDraw.Draw(mask)
+        font = self.layout['font']
+        word_boxes = []
+        for line, x, y in self.layout['lines']:
+            draw.text((x, y), line, font=font, fill=255)
+            if self.reveal:
+                space = font.getlength(' ')
+                cursor = x
+                for word in line.split(' '):
+                    word_boxes.append(draw.textbbox((cursor, y), word, font=font))
+                    cursor += font.getlength(word) + space
+
+        box = mask.getbbox() or (0, 0, 1, 1)
+        self.text_box = box
+        left, top, right, bottom = box
+        self.alpha = np.asarray(mask, dtype=np.uint16)[top:bottom, left:right]
+        self.word_count = len(word_boxes)
+
+        # Which word owns each pixel of the text box, for the reveal
+        self.word_map = None
+        if self.reveal:
+            self.word_map = np.full(self.alpha.shape, len(word_boxes), dtype=np.uint16)
+            for index, (x0, y0, x1, y1) in enumerate(word_boxes):
+                self.word_map[max(0, int(y0) - top):max(0, int(y1) - top),
+                              max(0, int(x0) - left):max(0, int(x1) - left)] = index
+
+        # Scratch space for blending, reused every frame
+        self._blend = np.empty(self.alpha.shape + (3,), dtype=np.uint16)
+        self._visible_words = None
+        self._set_visible_words(self.word_count)
+
+    def _set_visible_words(self, count):
+        """Precompute colour * alpha and 255 - alpha for the first count words"""
+        import numpy as np
+        if count == self._visible_words:
+            return
+        alpha = self.alpha if self.word_map is None else self.alpha * (self.word_map < count)
+        self._text_premultiplied = alpha[..., None] * np.array(bgr(self.text_color), dtype=np.uint16)
+        self._inverse_alpha = (255 - alpha)[..., None]
+        self._visible_words = count
+
+    def _prepare_background(self, background_image):
+        import numpy as np
+        if self.background == 'gradient':
+            # One full colour cycle, stacked twice so any H-row window is a plain slice
+            top, bottom = (np.array(bgr(c), dtype=np.float32) for c in GRADIENT_COLORS)
+            ramp = (1 - np.cos(np.linspace(0, 2 * np.pi, self.height, endpoint=False))) / 2
+            cycle = (top + (bottom - top) * ramp[:, None]).astype(np.uint8)
+            # Materialised at full width: a contiguous copy beats broadcasting per frame
+            self._source = np.ascontiguousarray(
+                np.broadcast_to(np.concatenate([cycle, cycle])[:, None, :], (2 * self.height, self.width, 3))
+            )
+        elif self.background == 'ken_burns':
+            self._source = self._load_ken_burns_source(background_image)
+        elif self.background != 'black':
+            raise ValueError(f"Unknown background {self.background!r}")
+
+    def _load_ken_burns_source(self, background_image):
+        """The pan source: the image scaled to cover the frame with room to move"""
+        import numpy as np
+        from PIL import Image
+        width = int(self.width * KEN_BURNS_ZOOM)
+        height = int(self.height * KEN_BURNS_ZOOM)
+        if background_image:
+            image = Image.open(background_image).convert('RGB')
+            scale = max(width / image.width, height / image.height)
+            image = image.resize((round(image.width * scale), round(image.height * scale)), Image.LANCZOS)
+            left = (image.width - width) // 2
+            top = (image.height - height) // 2
+            source = np.asarray(image.crop((left, top, left + width, top + height)))[:, :, ::-1]
+        else:
+            # No image configured: a soft radial glow over the gradient colours
+            yy, xx = np.mgrid[0:height, 0:width].astype(np.float32)
+            distance = np.hypot((xx - width * 0.3) / width, (yy - height * 0.35) / height)
+            glow = np.clip(1 - distance * 1.6, 0, 1)[..., None]
+            dark, light = (np.array(bgr(c), dtype=np.float32) for c in GRADIENT_COLORS)
+            source = (dark * (1 - glow) + light * glow * 1.8).clip(0, 255)
+        # Darkened so white text stays readable
+        return np.ascontiguousarray((source * 0.6).astype(np.uint8))
+
+    def _draw_background(self, index, out):
+        import numpy as np
+        progress = index / max(1, self.frame_count - 1)
+        if self.background == 'black':
+            out.fill(0)
+        elif self.background == 'gradient':
+            offset = int(progress * self.height) % self.height
+            np.copyto(out, self._source[offset:offset + self.height])
+        else:
+            # Pan diagonally across the oversized source
+            x = int(progress * (self._source.shape[1] - self.width))
+            y = int(progress * (self._source.shape[0] - self.height))
+            np.copyto(out, self._source[y:y + self.height, x:x + self.width])
+
+    def _draw_text(self, out):
+        """frame = (background * (255 - a) + colour * a) / 255, inside the text box only"""
+        import numpy as np
+        left, top, right, bottom = self.text_box
+        region = out[top:bottom, left:right]
+        blend = self._blend
+        np.multiply(region, self._inverse_alpha, out=blend)
+        np.add(blend, self._text_premultiplied, out=blend)
+        # (x + 255) >> 8 matches x / 255 at both ends of the range
+        np.add(blend, 255, out=blend)
+        np.right_shift(blend, 8, out=blend)
+        np.copyto(region, blend, casting='unsafe')
+
+    def render_into(self, index, out):
+        """Composite frame index into out (a frame pipeline source)"""
+        if self.reveal:
+            shown = int(index / (self.frame_count * REVEAL_FRACTION) * self.word_count) + 1
+            self._set_visible_words(min(self.word_count, shown))
+        self._draw_background(index, out)
+        self._draw_text(out)
+        return out
+
+    def render_frame(self, index):
+        """Composite frame index into the shared buffer and return it"""
+        return self.render_into(index, self.frame)
+
+    def frames(self):
+        """Yield every frame; each is the same buffer, so consume it before the next"""
+        for index in range(self.frame_count):
+            yield self.render_frame(index)
+
+    def poster(self):
+        """A copy of the final frame (full text) for thumbnails"""
+        return self.render_frame(self.frame_count - 1).copy()
+
+    def is_static(self):
+        return self.background == 'black' and not self.reveal
@@ -0,0 +1,54 @@
+"""
+Streaming ZIP writer for Motivation Bot downloads
+Builds a stored (uncompressed) archive chunk by chunk so the response starts
+immediately, memory stays bounded and nothing is written to disk.
+"""
+
+import io
+import zipfile
+
+class _ChunkBuffer(io.RawIOBase):
+    """Write-only, unseekable sink that hands back whatever was written since the last drain"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def stream_zip(files, chunk_size=1024 * 1024):
+    """Yield a ZIP archive of (path, arcname) pairs as byte chunks.
+
+    MP4s are already compressed, so entries use ZIP_STORED; with an
+    unseekable sink zipfile writes data descriptors after each entry, so no
+    byte has to be revisited once it has been sent.
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for path, arcname in files:
+            info = zipfile.ZipInfo.from_file(path, arcname)
+            info.compress_type = zipfile.ZIP_STORED
+            with open(path, 'rb') as source, archive.open(info, 'w') as entry:
+                while True:
+                    chunk = source.read(chunk_size)
+                    if not chunk:
+                        break
+                    entry.write(chunk)
+                    yield buffer.drain()
+            yield buffer.drain()
+    # Closing the archive writes the central directory
+    yield buffer.drain()